@@ -0,0 +1,112 @@
+# Author: Leslie Huang (lh1036)
+# Description: Address normalization and blocked fuzzy matching, used by datacleaning.py
+# to link restaurant inspections to sidewalk cafe licenses.
+#
+# The two datasets write the same address differently (e.g. "west 44 street" and "w 44th st"), so an
+# exact join on address strings loses most matches. Addresses are normalized first, then only pairs
+# of addresses in the same block (same zipcode and building number) are compared, by the overlap of
+# their street tokens. The number of compared pairs grows with the size of the data, not with the
+# product of the two datasets' sizes.
+
+import pandas as pd
+import numpy as np
+import re
+
+# addresses whose street tokens overlap this much or less (Jaccard similarity) are not matched, e.g.
+# "broadway" and "west broadway" (0.5)
+MIN_MATCH_SCORE = 0.5
+
+# abbreviations of street types and directions, spelled out
+STREET_TOKENS = {
+    "st": "street", "str": "street", "ave": "avenue", "av": "avenue", "avenu": "avenue", "blvd": "boulevard",
+    "rd": "road", "pl": "place", "plz": "plaza", "pkwy": "parkway", "pky": "parkway", "dr": "drive", "ln": "lane",
+    "ct": "court", "sq": "square", "hwy": "highway", "tpke": "turnpike", "expy": "expressway", "ter": "terrace",
+    "w": "west", "e": "east", "n": "north", "s": "south", "ext": "extension",
+}
+
+# spelled-out ordinals, as numbers
+ORDINALS = {
+    "first": "1", "second": "2", "third": "3", "fourth": "4", "fifth": "5",
+    "sixth": "6", "seventh": "7", "eighth": "8", "ninth": "9", "tenth": "10",
+}
+
+# streets that are commonly written under two names
+STREET_ALIASES = {
+    "avenue of the americas": "6 avenue",
+    "adam clayton powell jr boulevard": "7 avenue",
+    "frederick douglass boulevard": "8 avenue",
+    "malcolm x boulevard": "lenox avenue",
+}
+
+def normalize_street(street):
+    # returns the normalized form of one street name: lowercase, no punctuation, abbreviations and
+    # ordinals spelled out the same way (e.g. "W 44th St." and "west 44 street" -> "west 44 street")
+    tokens = re.sub(r"[^a-z0-9 ]", " ", street.lower()).split()
+    normalized = []
+
+    for i, token in enumerate(tokens):
+        # "st" before a name is "saint" (e.g. "st marks place"), otherwise "street"
+        if token == "st" and i == 0 and len(tokens) > 1:
+            token = "saint"
+        token = re.sub(r"^(\d+)(st|nd|rd|th)$", r"\1", token)
+        normalized.append(ORDINALS.get(token, STREET_TOKENS.get(token, token)))
+
+    street = " ".join(normalized)
+    return STREET_ALIASES.get(street, street)
+
+def normalize_building(building):
+    # returns the normalized form of one building number, e.g. "37-11" and "3711" -> "3711"
+    return re.sub(r"[^a-z0-9]", "", building.lower())
+
+def normalize_column(column, function):
+    # applies function to each distinct value of a string column (instead of to each row)
+    # missing values become ""
+    codes, uniques = pd.factorize(column)
+    normalized = np.array([function(value) for value in uniques] + [""], dtype = object)
+    return pd.Series(normalized[codes], index = column.index)
+
+def score_streets(streets, other_streets):
+    # returns an array of the Jaccard similarity of the token sets of each pair of normalized streets
+    # streets whose numbers differ score 0, however similar the rest ("west 4 street" and "west 44 street")
+    token_sets = {}
+
+    def tokens(street):
+        if street not in token_sets:
+            street_tokens = set(street.split())
+            token_sets[street] = (street_tokens, {token for token in street_tokens if token.isdigit()})
+        return token_sets[street]
+
+    scores = np.empty(len(streets))
+    for i, (street, other_street) in enumerate(zip(streets, other_streets)):
+        (first, first_numbers), (second, second_numbers) = tokens(street), tokens(other_street)
+        if first_numbers != second_numbers:
+            scores[i] = 0.
+        else:
+            scores[i] = len(first & second) / max(len(first | second), 1)
+    return scores
+
+def match_addresses(addresses, other_addresses, min_score = MIN_MATCH_SCORE):
+    # links each address in addresses to the best-matching address in other_addresses
+    # both DFs have the columns address_id, building, street and zipcode (one or several rows per address_id)
+    # returns a DF with one row per matched address_id (so at most one license address per address):
+    # columns address_id, match_address_id, match_score (1.0 when the normalized streets are identical)
+    # only candidates scoring more than min_score are matched
+    addresses, other_addresses = [
+        pd.DataFrame({
+            "address_id": df["address_id"].values,
+            "building": normalize_column(df["building"], normalize_building).values,
+            "street": normalize_column(df["street"], normalize_street).values,
+            "zipcode": df["zipcode"].str.strip().values
+        }).drop_duplicates("address_id")
+        for df in [addresses, other_addresses]
+    ]
+
+    # blocking: only addresses with the same zipcode and building number are compared
+    candidates = pd.merge(addresses, other_addresses, on = ["zipcode", "building"], suffixes = ("", "_other"))
+    candidates["match_score"] = score_streets(candidates["street"], candidates["street_other"])
+
+    # keep the best candidate of each address, if it is good enough
+    candidates = candidates[candidates["match_score"] > min_score]
+    candidates = candidates.sort_values(by = "match_score", ascending = False, kind = "mergesort").drop_duplicates("address_id")
+
+    return candidates.rename(columns = {"address_id_other": "match_address_id"})[["address_id", "match_address_id", "match_score"]].reset_index(drop = True)
@@ -0,0 +1,102 @@
+# Author: Leslie Huang (lh1036)
+# Description: Benchmark of linking restaurant addresses to sidewalk cafe licenses.
+# Uses the real sidewalk cafe licenses and synthetic restaurant addresses: one per license, rewritten
+# the way the inspection dataset writes addresses ("w 44th st" -> "west 44 street", "37-11" for
+# Queens buildings), plus addresses without a cafe. Reports the share of licenses linked and the
+# runtime of the exact join on address_id and of match_addresses, for increasing numbers of addresses.
+#
+# Usage: python benchmarks/bench_address_matching.py
+
+import os
+import sys
+import time
+import re
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from datacleaning import clean_colnames, convert_lowercase, strip_whitespace, concat_cols
+from addressmatching import match_addresses
+
+SIDEWALK_LICENSES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Sidewalk_Caf__Licenses_and_Applications.csv")
+
+# how the inspection dataset spells out the sidewalk cafe dataset's abbreviations
+SPELLED_OUT = {"st": "street", "ave": "avenue", "blvd": "boulevard", "pl": "place", "rd": "road", "w": "west", "e": "east"}
+
+def load_licenses():
+    '''
+    Returns the sidewalk cafe licenses, cleaned as in clean_data
+    '''
+    licenses = pd.read_csv(SIDEWALK_LICENSES, dtype = str, keep_default_na = False, na_values = [])
+    licenses = clean_colnames(licenses)
+    licenses = convert_lowercase(licenses)
+    licenses = strip_whitespace(licenses, ["street", "business_name", "business_name2"])
+    licenses = licenses.rename(columns = {"zip": "zipcode"})
+    return concat_cols(licenses, ["building", "street", "zipcode"], "address_id")
+
+def inspection_style(street, rng):
+    '''
+    Rewrites a sidewalk cafe street name the way the inspection dataset often writes it, with some randomness
+    '''
+    if rng.rand() < 0.2:
+        return street
+
+    tokens = [re.sub(r"^(\d+)(st|nd|rd|th)$", r"\1", token) for token in street.split()]
+    return " ".join(SPELLED_OUT.get(token, token) for token in tokens)
+
+def make_restaurant_addresses(licenses, n_copies, seed = 0):
+    '''
+    Returns restaurant addresses: n_copies rewritten copies of every license address (copy i in zipcodes
+    suffixed with -i, so that blocks don't grow with n_copies) plus as many addresses without a cafe
+    The has_cafe column marks the addresses that should be linked
+    '''
+    rng = np.random.RandomState(seed)
+    copies = []
+
+    for copy in range(n_copies):
+        addresses = licenses[["building", "street", "zipcode"]].copy()
+        addresses["street"] = [inspection_style(street, rng) for street in addresses["street"]]
+        queens = addresses["zipcode"].str.startswith("11") & (addresses["building"].str.len() == 4)
+        addresses.loc[queens, "building"] = addresses.loc[queens, "building"].str[:2] + "-" + addresses.loc[queens, "building"].str[2:]
+
+        no_cafe = addresses.copy()
+        no_cafe["building"] = rng.randint(1, 9999, len(no_cafe)).astype(str)
+
+        copies += [addresses.assign(has_cafe = True), no_cafe.assign(has_cafe = False)]
+
+    addresses = pd.concat(copies, ignore_index = True)
+    addresses["zipcode"] = addresses["zipcode"] + suffixes(n_copies, len(licenses) * 2)
+    return concat_cols(addresses, ["building", "street", "zipcode"], "address_id")
+
+def suffixes(n_copies, copy_length):
+    '''
+    Returns the zipcode suffixes of n_copies consecutive copies of copy_length rows ("" for the first copy)
+    '''
+    return np.repeat([""] + ["-{}".format(copy) for copy in range(1, n_copies)], copy_length).astype(object)
+
+if __name__ == "__main__":
+
+    licenses = load_licenses()
+
+    for n_copies in [1, 10, 100]:
+        all_licenses = pd.concat([licenses] * n_copies, ignore_index = True)
+        all_licenses["zipcode"] = all_licenses["zipcode"] + suffixes(n_copies, len(licenses))
+        all_licenses = concat_cols(all_licenses, ["building", "street", "zipcode"], "address_id")
+        restaurants = make_restaurant_addresses(licenses, n_copies)
+        linkable = restaurants.loc[restaurants["has_cafe"], "address_id"]
+
+        start = time.perf_counter()
+        exact = pd.merge(restaurants.drop_duplicates("address_id"), all_licenses[["address_id"]].drop_duplicates(), on = "address_id")
+        exact_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matches = match_addresses(restaurants, all_licenses)
+        fuzzy_seconds = time.perf_counter() - start
+
+        is_linkable = matches["address_id"].isin(linkable)
+        print("{} restaurant addresses, {} license addresses:".format(len(restaurants), len(all_licenses)))
+        print("    exact join: {:.1%} of the addresses with a cafe linked, {:.3f} s".format(
+            exact["address_id"].isin(linkable).sum() / linkable.nunique(), exact_seconds))
+        print("    match_addresses: {:.1%} linked ({:.1%} of them with score 1.0), {} addresses without a cafe linked, {:.3f} s".format(
+            is_linkable.sum() / linkable.nunique(), (matches.loc[is_linkable, "match_score"] == 1).mean(), (~is_linkable).sum(), fuzzy_seconds))
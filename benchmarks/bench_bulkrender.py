@@ -0,0 +1,67 @@
+# Author: Leslie Huang (lh1036)
+# Description: Benchmark of the bulk rendering scheduler.
+# Renders every cuisine and zipcode, and a sample of restaurants of every size, with bulkrender.BulkRenderer
+# in its default output mode (PDF, reused figures), then uses the measured time of each
+# job to compare the makespan (time until the last job finishes) of three ways to hand the jobs to
+# k workers: fixed chunks in key order (like Pool.map), a shared queue in key order, and the shared
+# queue largest estimated cost first. The makespans are replayed from the measured job times, so the
+# comparison does not depend on how many CPUs the benchmark machine has. Also reports how well the
+# row-count estimates rank the jobs, and the cost model fitted to the timings (see bulkrender.DEFAULT_COST_MODEL).
+#
+# Usage: python benchmarks/bench_bulkrender.py [rows]
+
+import os
+import sys
+import heapq
+import tempfile
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bulkrender import BulkRenderer, make_jobs, fit_cost_model
+from synthetic import make_restaurant_data
+
+def queue_makespan(seconds, workers):
+    '''
+    Returns the time at which the last job finishes when each job, in order, goes to the first idle worker
+    '''
+    finish = [0.] * workers
+    for duration in seconds:
+        heapq.heappush(finish, heapq.heappop(finish) + duration)
+    return max(finish)
+
+def chunked_makespan(seconds, workers):
+    '''
+    Returns the time at which the last job finishes when the jobs, in order, are split into one chunk per worker
+    '''
+    size = -(-len(seconds) // workers)
+    return max(sum(seconds[i:i + size]) for i in range(0, len(seconds), size))
+
+if __name__ == "__main__":
+
+    warnings.simplefilter("ignore")
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 450000
+    data = make_restaurant_data(n_rows = n_rows, n_restaurants = n_rows // 18)
+    os.chdir(tempfile.mkdtemp())
+
+    # every 100th restaurant job, which spans the restaurant sizes without rendering thousands of them
+    restaurants = make_jobs(data, ["restaurant"])
+    jobs = sorted(make_jobs(data, ["cuisine", "zipcode"]) + restaurants[::100], key = lambda job: -job.estimate)
+    timings = BulkRenderer(data, workers = 1, max_worker_bytes = None, notify = lambda message: None).run(jobs)
+    timings = timings.set_index(["kind", "key"])
+
+    measured = timings["seconds"]
+    print("{} jobs, {:.1f} s of rendering; largest job {:.2f} s, smallest {:.2f} s".format(len(measured), measured.sum(), measured.max(), measured.min()))
+    print("rank correlation of estimated and measured job times: {:.2f}".format(timings["estimate"].corr(measured, method = "spearman")))
+
+    # key order (alphabetical by kind and key), as a worker pool would get them from a loop over the groups
+    key_order = measured.sort_index().values
+    largest_first = [measured[(job.kind, job.key)] for job in jobs]
+
+    for workers in [2, 4, 8, 16]:
+        print("{} workers: fixed chunks {:.1f} s, queue in key order {:.1f} s, largest first {:.1f} s (lower bound {:.1f} s)".format(
+            workers, chunked_makespan(list(key_order), workers), queue_makespan(key_order, workers),
+            queue_makespan(largest_first, workers), max(measured.sum() / workers, measured.max())))
+
+    for kind, (fixed, per_row) in sorted(fit_cost_model(timings.reset_index()).items()):
+        print("fitted cost of a {} job: {:.3f} s + {:.2e} s per row".format(kind, fixed, per_row))
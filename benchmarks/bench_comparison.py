@@ -0,0 +1,56 @@
+# Author: Leslie Huang (lh1036)
+# Description: Benchmark of comparison queries.
+# Compares the aggregates behind the comparison graphs (mean score by borough, grade counts, mean
+# score by sidewalk cafe type, monthly mean score) computed for k cuisines by one CuisineComparison
+# (one isin filter and one grouped pass) with k separate CuisineGrades queries.
+#
+# Usage: python benchmarks/bench_comparison.py [rows]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from inspectiongrades import CuisineGrades
+from inspectiongrades.comparisonvisualizer import CuisineComparison
+from synthetic import make_restaurant_data
+
+CUISINES = ["pizza", "chinese", "thai", "american", "italian", "mexican"]
+
+def separate_queries(data, cuisines):
+    '''
+    Computes the aggregates of the comparison graphs with one CuisineGrades query per cuisine
+    '''
+    for cuisine in cuisines:
+        query = CuisineGrades(cuisine, data)
+        subset = query.filter_data(data)
+        subset.groupby("boro", observed = True)["score"].mean()
+        subset.groupby("grade", observed = True).size()
+        query.group_by_sidewalk()
+        subset.groupby(subset["inspectiondate"].dt.to_period("M"))["score"].mean()
+
+def comparison_query(data, cuisines):
+    '''
+    Computes the aggregates of the comparison graphs with one CuisineComparison
+    '''
+    query = CuisineComparison(cuisines, data)
+    for by in ["boro", "grade", "swc_type", "month"]:
+        query.aggregate(by)
+
+if __name__ == "__main__":
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+    data = make_restaurant_data(n_rows = n_rows, n_restaurants = n_rows // 20)
+
+    # the first selection on a new DF consolidates its blocks; don't count it in either timing
+    data[data["cuisine_primary"] == "pizza"]
+
+    for k in [1, 3, 6]:
+        timings = []
+        for function in [comparison_query, separate_queries]:
+            start = time.perf_counter()
+            function(data, CUISINES[:k])
+            timings.append(time.perf_counter() - start)
+
+        print("{} cuisines: one comparison {:.3f} s, {} separate queries {:.3f} s".format(k, timings[0], k, timings[1]))
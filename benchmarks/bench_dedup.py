@@ -0,0 +1,95 @@
+# Author: Leslie Huang (lh1036)
+# Description: Benchmark of the row deduplication in clean_data.
+# Compares DataFrame.drop_duplicates() with the hash-based drop_duplicate_rows() on all-string frames
+# shaped like the raw inspection extract at that step, checks that both keep the same rows, and reports times.
+# Uses the real extract if DOHMH_New_York_City_Restaurant_Inspection_Results.csv is in the working directory,
+# and synthetic frames of 450k and 5M rows.
+#
+# Usage: python benchmarks/bench_dedup.py [number of synthetic rows ...]
+
+import os
+import sys
+import time
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from datacleaning import clean_colnames, strip_whitespace, drop_duplicate_rows
+from synthetic import BOROS, STREETS, CUISINES
+
+RAW_EXTRACT = "DOHMH_New_York_City_Restaurant_Inspection_Results.csv"
+
+def load_raw_extract():
+    '''
+    Returns the raw extract as it is at the deduplication step of clean_data, or None if the file is not present
+    '''
+    if not os.path.exists(RAW_EXTRACT):
+        return None
+
+    restaurant_grades = pd.read_csv(RAW_EXTRACT, dtype = str, keep_default_na = False, na_values = [])
+    restaurant_grades = clean_colnames(restaurant_grades)
+    restaurant_grades = restaurant_grades.rename(columns = {"dba": "restaurant"})
+    restaurant_grades = strip_whitespace(restaurant_grades, ["street", "restaurant"])
+    return restaurant_grades.drop(["recorddate", "camis", "action", "phone"], axis = 1)
+
+def make_raw_data(n_rows, duplicate_share = 0.02, seed = 0):
+    '''
+    Returns an all-string frame shaped like the raw extract at the deduplication step, with n_rows distinct
+    violation rows (about 18 per restaurant, spread evenly) plus duplicate_share copies of random rows
+    '''
+    rng = np.random.RandomState(seed)
+    n_restaurants = max(n_rows // 18, 1)
+    restaurant = rng.randint(0, n_restaurants, n_rows)
+    violation_codes = np.array(["{:02d}{}".format(number, letter) for number in range(2, 20) for letter in "abcdefg"], dtype = object)
+    violation = rng.randint(0, len(violation_codes), n_rows)
+    inspectiondate = pd.Timestamp("1/1/2012") + pd.to_timedelta(rng.randint(0, 1800, n_rows), unit = "D")
+
+    data = pd.DataFrame({
+        "restaurant": np.array(["restaurant {}".format(i) for i in range(n_restaurants)], dtype = object)[restaurant],
+        "boro": np.array(list(BOROS.values()), dtype = object)[restaurant % len(BOROS)],
+        "building": (restaurant % 997).astype(str).astype(object),
+        "street": np.array(STREETS, dtype = object)[restaurant % len(STREETS)],
+        "zipcode": (10001 + restaurant % 200).astype(str).astype(object),
+        "cuisinedescription": np.array(CUISINES, dtype = object)[restaurant % len(CUISINES)],
+        "inspectiondate": inspectiondate.strftime("%m/%d/%Y").values.astype(object),
+        "violationcode": violation_codes[violation],
+        "violationdescription": np.array(["violation description {}".format(code) for code in violation_codes], dtype = object)[violation],
+        "criticalflag": np.array(["critical", "not critical"], dtype = object)[violation % 2],
+        "score": rng.randint(0, 60, n_rows).astype(str).astype(object),
+        "grade": rng.choice(np.array(["a", "b", "c", ""], dtype = object), n_rows),
+        "gradedate": rng.choice(np.array(["01/02/2014", ""], dtype = object), n_rows),
+        "inspectiontype": "cycle inspection / initial inspection",
+    })
+
+    # append copies of random rows, then shuffle
+    copies = data.iloc[rng.randint(0, n_rows, int(n_rows * duplicate_share))]
+    data = pd.concat([data, copies])
+    return data.iloc[rng.permutation(len(data))].reset_index(drop = True)
+
+def compare(label, data):
+    '''
+    Times both deduplications of data and checks that they keep the same rows
+    '''
+    start = time.perf_counter()
+    expected = data.drop_duplicates()
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = drop_duplicate_rows(data)
+    hashed = time.perf_counter() - start
+
+    assert result.index.equals(expected.index)
+    print("{} ({} rows, {} columns, {} duplicates): drop_duplicates {:.2f} s, drop_duplicate_rows {:.2f} s".format(
+        label, len(data), len(data.columns), len(data) - len(result), baseline, hashed))
+
+if __name__ == "__main__":
+
+    raw = load_raw_extract()
+    if raw is None:
+        print("{} not found, skipping the real extract".format(RAW_EXTRACT))
+    else:
+        compare("real extract", raw)
+
+    for n_rows in [int(arg) for arg in sys.argv[1:]] or [450000, 5000000]:
+        compare("synthetic", make_raw_data(n_rows))
@@ -0,0 +1,55 @@
+# Author: Leslie Huang (lh1036)
+# Description: Benchmark of the bulk export of chart data.
+# Compares calling get_chart_data on one visualizer per group with the single-pass export
+# (iter_chart_records streamed by write_chart_records) for every cuisine, zipcode and restaurant,
+# and reports the peak memory allocated while streaming the export to a file.
+# The per-query restaurant timing is extrapolated from a sample of restaurants.
+#
+# Usage: python benchmarks/bench_export.py [rows]
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from inspectiongrades import CuisineGrades, ZipGrades, RestaurantGrades
+from inspectiongrades.chartdata import iter_chart_records, write_chart_records
+from synthetic import make_restaurant_data
+
+VISUALIZERS = {"cuisine": (CuisineGrades, "cuisine_primary"), "zipcode": (ZipGrades, "zipcode"), "restaurant": (RestaurantGrades, None)}
+
+# number of restaurants queried one by one (the timing is extrapolated to all of them)
+SAMPLED_RESTAURANTS = 200
+
+if __name__ == "__main__":
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 450000
+    data = make_restaurant_data(n_rows = n_rows, n_restaurants = n_rows // 18)
+
+    # the first selection on a new DF consolidates its blocks; don't count it in either timing
+    data[data["cuisine_primary"] == "pizza"]
+
+    for kind, (cls, column) in VISUALIZERS.items():
+        groups = sorted(data.index.unique() if column is None else data[column].dropna().unique())
+        queried = groups[:SAMPLED_RESTAURANTS] if column is None else groups
+
+        start = time.perf_counter()
+        for group in queried:
+            cls(group, data).get_chart_data()
+        per_query = (time.perf_counter() - start) * len(groups) / len(queried)
+
+        start = time.perf_counter()
+        with open(os.devnull, "w") as file:
+            count = write_chart_records(iter_chart_records(data, kind), file)
+        exported = time.perf_counter() - start
+
+        tracemalloc.start()
+        with open(os.devnull, "w") as file:
+            write_chart_records(iter_chart_records(data, kind), file)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print("{} {} groups ({} records): one query per group {:.2f} s{}, export {:.2f} s, peak {:.1f} MB while streaming".format(
+            len(groups), kind, count, per_query, " (extrapolated)" if len(queried) < len(groups) else "", exported, peak / 1e6))
@@ -0,0 +1,79 @@
+# Author: Leslie Huang (lh1036)
+# Description: Benchmark of radius searches.
+# Times the lookup of the zipcodes within a radius in the KD-tree of the bundled centroids (against
+# computing the distance to every centroid), and the aggregates of a NearbyGrades query (one isin
+# filter and one grouped pass over the selected zipcodes) against one ZipGrades query per zipcode.
+#
+# Usage: python benchmarks/bench_nearby.py [rows]
+
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from inspectiongrades import NearbyGrades, ZipGrades
+from inspectiongrades.nearby import ZipRadius, get_zip_index
+from synthetic import make_restaurant_data
+
+CENTER = "10011"
+LOOKUPS = 10000
+
+def scan_neighbors(zip_index, zipcode, radius):
+    '''
+    Returns the zipcodes within radius by computing the distance to every centroid
+    '''
+    point = zip_index.points[zip_index.zipcodes.get_loc(zipcode)]
+    return list(zip_index.zipcodes[np.hypot(*(zip_index.points - point).T) <= radius])
+
+def nearby_query(data, key):
+    '''
+    Computes the aggregates of the nearby graphs with one NearbyGrades query
+    '''
+    query = NearbyGrades(key, data)
+    for by in ["group", "grade", "cuisine_primary", "month"]:
+        query.aggregate_area(by)
+
+def separate_queries(data, key):
+    '''
+    Computes the same aggregates (per zipcode) with one ZipGrades query per zipcode within the radius
+    '''
+    for zipcode in get_zip_index().neighbors(*key):
+        subset = ZipGrades(zipcode, data).filter_data(data)
+        subset["score"].mean()
+        subset.groupby("grade", observed = True).size()
+        subset.groupby("cuisine_primary", observed = True)["score"].mean()
+        subset.groupby(subset["inspectiondate"].dt.to_period("M"))["score"].mean()
+
+if __name__ == "__main__":
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+
+    start = time.perf_counter()
+    zip_index = get_zip_index()
+    print("build index of {} centroids: {:.2f} ms".format(len(zip_index.zipcodes), (time.perf_counter() - start) * 1000))
+
+    for radius in [0.5, 1., 2.]:
+        timings = []
+        for function in [zip_index.neighbors, lambda zipcode, radius: scan_neighbors(zip_index, zipcode, radius)]:
+            start = time.perf_counter()
+            for _ in range(LOOKUPS):
+                function(CENTER, radius)
+            timings.append((time.perf_counter() - start) / LOOKUPS * 1e6)
+
+        print("{:g} miles ({} zipcodes): KD-tree lookup {:.1f} us, scan of all centroids {:.1f} us".format(radius, len(zip_index.neighbors(CENTER, radius)), *timings))
+
+    data = make_restaurant_data(n_rows = n_rows, n_restaurants = n_rows // 20)
+
+    # the first selection on a new DF consolidates its blocks; don't count it in either timing
+    data[data["zipcode"] == CENTER]
+
+    for radius in [0.5, 1., 2.]:
+        timings = []
+        for function in [nearby_query, separate_queries]:
+            start = time.perf_counter()
+            function(data, ZipRadius(CENTER, radius))
+            timings.append(time.perf_counter() - start)
+
+        print("{:g} miles: one nearby query {:.3f} s, separate zipcode queries {:.3f} s".format(radius, *timings))
@@ -0,0 +1,47 @@
+# Author: Leslie Huang (lh1036)
+# Description: Benchmark of render time and file size of the output modes.
+# Renders CuisineGrades.violations_per_restaurant (one bar per restaurant) for the cuisines with
+# the most restaurants, as vector PDF (the default), PDF with dense artists rasterized, PDF with
+# a histogram above 500 bars, and PNG/WebP at 100 DPI.
+#
+# Usage: python benchmarks/bench_output.py [number of cuisines]
+
+import os
+import sys
+import time
+import tempfile
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from inspectiongrades import CuisineGrades
+from inspectiongrades.rendering import RenderContext
+from synthetic import make_restaurant_data
+
+MODES = [
+    ("vector pdf", RenderContext()),
+    ("rasterized pdf", RenderContext(rasterize = True, dpi = 100)),
+    ("pdf, histogram above 500 bars", RenderContext(max_bars = 500)),
+    ("png 100 dpi", RenderContext(output_format = "png", dpi = 100)),
+    ("webp 100 dpi", RenderContext(output_format = "webp", dpi = 100)),
+]
+
+if __name__ == "__main__":
+
+    warnings.simplefilter("ignore", FutureWarning)
+    n_cuisines = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    data = make_restaurant_data()
+    os.chdir(tempfile.mkdtemp())
+
+    # cuisines with the most restaurants have the most bars
+    restaurants = data.reset_index().groupby("cuisine_primary")["restaurant"].nunique().sort_values(ascending = False)
+
+    for cuisine, n_restaurants in restaurants.iloc[:n_cuisines].items():
+        print("{} ({} restaurants)".format(cuisine, n_restaurants))
+
+        for label, renderer in MODES:
+            start = time.perf_counter()
+            filename = CuisineGrades(cuisine, data, renderer).violations_per_restaurant()
+            seconds = time.perf_counter() - start
+
+            print("    {}: {:.2f} s, {:.0f} KB".format(label, seconds, os.path.getsize(filename) / 1e3))
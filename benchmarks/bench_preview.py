@@ -0,0 +1,65 @@
+# Author: Leslie Huang (lh1036)
+# Description: Benchmark of approximate previews.
+# For the largest cuisine and zipcode, times the first graph saved (time to first chart) and all the
+# graphs of the preview drawn from the stratified sample, against the exact graphs of make_graphs.
+#
+# Usage: python benchmarks/bench_preview.py [rows]
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from inspectiongrades import CuisineGrades, ZipGrades
+from inspectiongrades.precomputed import set_derived
+from inspectiongrades.rendering import RenderContext
+from inspectiongrades.sampling import StratifiedSample
+from synthetic import make_restaurant_data
+
+class TimedRenderContext(RenderContext):
+    '''
+    RenderContext that records when each graph is saved
+    '''
+    __slots__ = ("saved",)
+
+    def save(self, figure, filename):
+        filename = super(TimedRenderContext, self).save(figure, filename)
+        self.saved.append(time.perf_counter())
+        return filename
+
+def time_graphs(make):
+    '''
+    Returns a tuple (seconds to the first saved graph, seconds to the last) of make(renderer)
+    '''
+    renderer = TimedRenderContext(output_format = "png")
+    renderer.saved = []
+
+    start = time.perf_counter()
+    make(renderer)
+    return renderer.saved[0] - start, renderer.saved[-1] - start
+
+if __name__ == "__main__":
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+    data = make_restaurant_data(n_rows = n_rows, n_restaurants = n_rows // 20)
+
+    start = time.perf_counter()
+    set_derived(data, "sample", StratifiedSample(data))
+    print("draw the stratified sample at load: {:.2f} s".format(time.perf_counter() - start))
+
+    queries = [
+        (CuisineGrades, data["cuisine_primary"].value_counts().index[0]),
+        (ZipGrades, data["zipcode"].value_counts().index[0]),
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+
+        for cls, key in queries:
+            rows = (data[cls(key, data).ranking_group()[0]] == key).sum()
+            preview = time_graphs(lambda renderer: cls(key, data, renderer).make_preview())
+            exact = time_graphs(lambda renderer: cls(key, data, renderer).make_graphs())
+
+            print("{} {} ({} rows): preview first graph {:.2f} s, all {:.2f} s; exact first graph {:.2f} s, all {:.2f} s".format(cls.__name__, key, rows, *(preview + exact)))
@@ -0,0 +1,82 @@
+# Author: Leslie Huang (lh1036)
+# Description: Benchmark of per-graph overhead when rendering many graphs in one process.
+# Compares the previous pattern (a new pyplot figure per graph, closed after saving), a RenderContext
+# that creates a new Figure for every graph, and one that reuses a cleared, pre-styled Figure, and
+# reports time per graph and resident memory growth.
+#
+# Usage: python benchmarks/bench_rendering.py [number of graphs]
+
+import os
+import sys
+import time
+import tempfile
+import warnings
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from inspectiongrades import ZipGrades
+from inspectiongrades.rendering import RenderContext
+from synthetic import make_restaurant_data
+
+class PyplotContext(RenderContext):
+    '''
+    The previous pattern: a new pyplot figure for every graph, closed after saving
+    '''
+    __slots__ = ()
+
+    def new_figure(self, figsize = None):
+        return plt.figure(figsize = figsize)
+
+    def save(self, figure, filename):
+        figure.savefig(filename)
+        plt.close(figure)
+        return filename
+
+def resident_memory():
+    '''
+    Returns the resident set size of this process in MB (Linux only)
+    '''
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+def render_batch(data, zipcodes, renderer, n_graphs):
+    '''
+    Renders n_graphs bar graphs (cycling through zipcodes) and returns the seconds per graph
+    '''
+    start = time.perf_counter()
+
+    for i in range(n_graphs):
+        ZipGrades(zipcodes[i % len(zipcodes)], data, renderer).boxplot_zip_scores()
+
+    return (time.perf_counter() - start) / n_graphs
+
+if __name__ == "__main__":
+
+    warnings.simplefilter("ignore", FutureWarning)
+    n_graphs = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    data = make_restaurant_data(n_rows = 100000, n_restaurants = 5000)
+    zipcodes = data["zipcode"].unique()
+    os.chdir(tempfile.mkdtemp())
+
+    query = ZipGrades("10001", data)
+    print("query object: {} bytes, has __dict__: {}".format(sys.getsizeof(query), hasattr(query, "__dict__")))
+
+    contexts = [
+        ("pyplot figure per graph", PyplotContext()),
+        ("new Figure per graph", RenderContext()),
+        ("reused Figure", RenderContext(reuse_figures = True))
+    ]
+
+    for label, renderer in contexts:
+        render_batch(data, zipcodes, renderer, 20) # warm up
+
+        before = resident_memory()
+        seconds = render_batch(data, zipcodes, renderer, n_graphs // 2)
+        halfway = resident_memory()
+        seconds = (seconds + render_batch(data, zipcodes, renderer, n_graphs // 2)) / 2
+
+        print("{}: {:.1f} ms/graph, resident memory growth after {} graphs: {:+.1f} MB, after {}: {:+.1f} MB".format(
+            label, seconds * 1000, n_graphs // 2, halfway - before, n_graphs, resident_memory() - before))
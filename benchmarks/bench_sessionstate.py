@@ -0,0 +1,69 @@
+# Author: Leslie Huang (lh1036)
+# Description: Benchmark of the session state.
+# Compares building the derived structures of a session with loading them from a saved session state
+# (fingerprinting the data, reading the file and registering the structures), and times the input
+# validation of a zipcode and a restaurant by scanning the data and through the query lookups.
+#
+# Usage: python benchmarks/bench_sessionstate.py [rows]
+
+import os
+import sys
+import time
+import tempfile
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from inspectiongrades.precomputed import clear_derived
+from inspectiongrades.sessionstate import SessionState, dataset_fingerprint, load_session_state, SESSION_STATE_FILE
+from userinput import validate_zip, validate_restaurant_name
+from synthetic import make_restaurant_data
+
+def scan_zip(input_zip, data):
+    '''
+    The zipcode validation without lookups: the zipcode's rows are selected and counted by restaurant
+    '''
+    this_zipcode = data[data.zipcode == input_zip]
+    return input_zip in data.zipcode.unique() and sum(count >= 2 for count in Counter(this_zipcode.index).values()) >= 2
+
+def scan_restaurant(name, data, min_rows = 2):
+    '''
+    The restaurant validation without lookups: the rows of every restaurant are counted
+    '''
+    counts = data.index.value_counts()
+    return name in data.index.unique() and name in counts[counts >= min_rows].index.values
+
+def timed(function, *args):
+    '''
+    Returns a tuple (result of function(*args), seconds it took)
+    '''
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+if __name__ == "__main__":
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 450000
+    data = make_restaurant_data(n_rows = n_rows, n_restaurants = n_rows // 18)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, SESSION_STATE_FILE)
+
+        state, built = timed(SessionState.build, data)
+        fingerprint, fingerprinted = timed(dataset_fingerprint, data)
+        state.fingerprint = fingerprint
+        _, saved = timed(state.save, path)
+
+        clear_derived(data)
+        (state, loaded), load_time = timed(load_session_state, data, path)
+        assert loaded
+
+        print("{} rows: building the session state {:.2f} s; saving it {:.2f} s ({:.1f} MB)".format(
+            n_rows, built, saved, os.path.getsize(path) / 1e6))
+        print("loading it {:.2f} s, of which fingerprinting the data {:.2f} s".format(load_time, fingerprinted))
+
+    zipcode, name = data["zipcode"].iloc[0], data.index[0]
+    for label, scan, lookup, value in [("zipcode", scan_zip, validate_zip, zipcode), ("restaurant", scan_restaurant, validate_restaurant_name, name)]:
+        _, scanned = timed(scan, value, data)
+        _, looked_up = timed(lookup, value, data)
+        print("validating a {}: scanning the data {:.1f} ms, query lookups {:.3f} ms".format(label, scanned * 1000, looked_up * 1000))
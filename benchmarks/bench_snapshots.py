@@ -0,0 +1,83 @@
+# Author: Leslie Huang (lh1036)
+# Description: Benchmark of the snapshot store.
+# Builds N monthly snapshots of a synthetic history (each extract holds every inspection up to its month,
+# like the DOHMH extracts) and reports the disk size of the store compared with N CSV files and N pickles,
+# and the resident memory and time of loading all N snapshots from the store compared with the pickles.
+#
+# Usage: python benchmarks/bench_snapshots.py [number of snapshots]
+
+import os
+import sys
+import time
+import tempfile
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from inspectiongrades.snapshots import SnapshotStore
+from inspectiongrades.changevisualizer import ChangeGrades
+from synthetic import make_restaurant_data
+from bench_storage import resident_memory
+
+def directory_size(path):
+    '''
+    Returns the total size in MB of the files in path
+    '''
+    return sum(os.path.getsize(os.path.join(path, filename)) for filename in os.listdir(path)) / 1e6
+
+def make_snapshots(data, n_snapshots):
+    '''
+    Returns a dict (snapshot name: DF) of the last n_snapshots monthly extracts of data
+    '''
+    months = pd.date_range(end = data["inspectiondate"].max(), periods = n_snapshots, freq = "MS")
+    return {"{:%Y-%m}".format(month): data[data["inspectiondate"] < month + pd.DateOffset(months = 1)] for month in months}
+
+def load_pickles(path, names):
+    '''
+    Returns the snapshots pickled in path
+    '''
+    return [pd.read_pickle(os.path.join(path, name + ".pkl")) for name in names]
+
+def load_store(path, names):
+    '''
+    Returns the snapshots of the store in path, loaded by one store so that they share the dictionary strings
+    '''
+    store = SnapshotStore(path)
+    return [store.load(name) for name in names]
+
+if __name__ == "__main__":
+
+    n_snapshots = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    snapshots = make_snapshots(make_restaurant_data(), n_snapshots)
+    store_path, csv_path, pickle_path = tempfile.mkdtemp(), tempfile.mkdtemp(), tempfile.mkdtemp()
+
+    start = time.perf_counter()
+    store = SnapshotStore(store_path)
+    for name, data in snapshots.items():
+        store.save(name, data)
+    store_seconds = time.perf_counter() - start
+
+    for name, data in snapshots.items():
+        data.to_csv(os.path.join(csv_path, name + ".csv"))
+        data.to_pickle(os.path.join(pickle_path, name + ".pkl"))
+
+    print("{} snapshots of {}-{} rows".format(n_snapshots, min(map(len, snapshots.values())), max(map(len, snapshots.values()))))
+    print("disk: store {:.1f} MB (saved in {:.1f} s), CSV files {:.1f} MB, pickles {:.1f} MB".format(
+        directory_size(store_path), store_seconds, directory_size(csv_path), directory_size(pickle_path)))
+
+    names = list(snapshots)
+    del snapshots
+
+    for label, load in [("store", lambda: load_store(store_path, names)),
+                        ("pickles", lambda: load_pickles(pickle_path, names))]:
+        before = resident_memory()
+        start = time.perf_counter()
+        loaded = load()
+        print("loading all snapshots from the {}: {:.1f} s, {:+.0f} MB resident memory".format(
+            label, time.perf_counter() - start, resident_memory() - before))
+        del loaded
+
+    os.chdir(tempfile.mkdtemp())
+    start = time.perf_counter()
+    ChangeGrades.from_store(None, None, SnapshotStore(store_path)).make_graphs()
+    print("change since last snapshot graphs: {:.1f} s".format(time.perf_counter() - start))
@@ -0,0 +1,105 @@
+# Author: Leslie Huang (lh1036)
+# Description: Benchmark of the partitioned history storage.
+# Writes a synthetic ten-year history partitioned by year and borough, then reports, for a query over
+# one zipcode (all years) and one cuisine (one year): the share of row group bytes it reads, its time,
+# and the resident memory it adds, compared with loading the whole history into memory.
+#
+# Usage: python benchmarks/bench_storage.py [rows per five years]
+
+import os
+import sys
+import time
+import multiprocessing
+import tempfile
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from inspectiongrades import ZipGrades, CuisineGrades
+from inspectiongrades.storage import write_partitioned, PartitionedData
+from synthetic import make_restaurant_data
+
+def resident_memory():
+    '''
+    Returns the resident set size of this process in MB (Linux only)
+    '''
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+def make_history(n_rows):
+    '''
+    Returns ten years of synthetic data: two five-year samples, the second shifted by five years
+    '''
+    first = make_restaurant_data(n_rows = n_rows, seed = 0)
+    second = make_restaurant_data(n_rows = n_rows, seed = 1)
+    second["inspectiondate"] = second["inspectiondate"] + pd.DateOffset(years = 5)
+    return pd.concat([first, second])
+
+def write_history(n_rows, path):
+    '''
+    Writes the synthetic history to path
+    '''
+    history = make_history(n_rows)
+    start = time.perf_counter()
+    write_partitioned(history, path)
+    print("wrote {} rows in {:.1f} s".format(len(history), time.perf_counter() - start))
+
+def bytes_read(storage, column, value, columns, years = None):
+    '''
+    Returns a tuple (bytes of the row groups and columns a query reads, bytes of the whole dataset)
+    '''
+    columns = set(columns) | {"restaurant", column}
+    read, total = 0, 0
+
+    for fragment in storage.dataset.get_fragments():
+        metadata = fragment.metadata
+        for i in range(metadata.num_row_groups):
+            chunks = metadata.row_group(i)
+            total += sum(chunks.column(j).total_compressed_size for j in range(chunks.num_columns))
+
+    # partitions are pruned on the year, row groups on the statistics of column
+    for fragment in storage.dataset.get_fragments(filter = storage.make_filter(years = years)):
+        metadata = fragment.metadata
+
+        for row_group in fragment.split_by_row_group(storage.make_filter(column, value)):
+            for group in row_group.row_groups:
+                chunks = metadata.row_group(group.id)
+                read += sum(chunks.column(i).total_compressed_size for i in range(chunks.num_columns)
+                    if chunks.column(i).path_in_schema in columns)
+
+    return read, total
+
+if __name__ == "__main__":
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+    path = tempfile.mkdtemp()
+    os.chdir(tempfile.mkdtemp())
+
+    # write in a child process, so that the memory of the generated history is not counted below
+    writer = multiprocessing.Process(target = write_history, args = (n_rows, path))
+    writer.start()
+    writer.join()
+
+    storage = PartitionedData(path)
+    queries = [
+        ("zipcode 10011, all years", ZipGrades, "10011", None),
+        ("thai, 2014", CuisineGrades, "thai", [2014]),
+    ]
+
+    for label, cls, key, years in queries:
+        before = resident_memory()
+        start = time.perf_counter()
+        query = cls.from_storage(key, storage, years = years)
+        query.make_graphs()
+        seconds = time.perf_counter() - start
+
+        column, value = query.storage_filter()
+        read, total = bytes_read(storage, column, value, cls.storage_columns, years)
+        print("{}: {} rows, {:.1%} of the stored bytes, {:.2f} s including graphs, {:+.0f} MB resident memory".format(
+            label, len(query.data), read / total, seconds, resident_memory() - before))
+
+    before = resident_memory()
+    start = time.perf_counter()
+    everything = storage.read()
+    print("whole history in memory: {} rows, {:.2f} s, {:+.0f} MB resident memory".format(
+        len(everything), time.perf_counter() - start, resident_memory() - before))
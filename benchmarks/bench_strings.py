@@ -0,0 +1,78 @@
+# Author: Leslie Huang (lh1036)
+# Description: Benchmark of the string storage of the cleaned dataset.
+# Runs clean_data() on a synthetic raw extract with Python object strings and with Arrow-backed
+# strings (string_storage = "pyarrow"), each in its own process, and reports the cleaning time,
+# the memory of the cleaned frame and the process's peak memory, and the latency of the lookups of
+# an interactive session (indexing by restaurant, validating a restaurant name, filtering by zipcode
+# and by restaurant).
+#
+# Usage: python benchmarks/bench_strings.py [rows]
+
+import os
+import sys
+import time
+import shutil
+import resource
+import tempfile
+import subprocess
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, REPO)
+
+from synthetic import write_raw_extract
+
+SIDEWALK_DATA = "Sidewalk_Caf__Licenses_and_Applications.csv"
+REPEATS = 20
+
+def time_repeated(function):
+    '''
+    Returns the mean seconds of REPEATS calls of function
+    '''
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        function()
+    return (time.perf_counter() - start) / REPEATS
+
+def run(string_storage):
+    '''
+    Cleans the raw extract in the current directory and prints the measurements of one storage mode
+    '''
+    from datacleaning import clean_data
+    from userinput import validate_restaurant_name
+
+    start = time.perf_counter()
+    restaurant_data = clean_data(string_storage = string_storage)
+    cleaning = time.perf_counter() - start
+
+    start = time.perf_counter()
+    restaurant_data = restaurant_data.set_index(["restaurant"])
+    set_index = time.perf_counter() - start
+
+    name = restaurant_data.index[len(restaurant_data) // 2]
+    zipcode = restaurant_data["zipcode"].iloc[0]
+    lookups = [
+        time_repeated(lambda: validate_restaurant_name(name, restaurant_data)),
+        time_repeated(lambda: restaurant_data[restaurant_data["zipcode"] == zipcode]),
+        time_repeated(lambda: restaurant_data[restaurant_data.index.isin([name])]),
+    ]
+
+    print("{:>7}: clean_data {:.2f} s, set_index {:.3f} s, frame {:.1f} MB, peak RSS {:.0f} MB".format(
+        string_storage or "object", cleaning, set_index, restaurant_data.memory_usage(deep = True).sum() / 1e6,
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+    print("         validate restaurant {:.1f} ms, zipcode filter {:.1f} ms, restaurant filter {:.1f} ms".format(*[seconds * 1000 for seconds in lookups]))
+
+if __name__ == "__main__":
+
+    if len(sys.argv) > 2:
+        # one measurement, in a fresh process so that peak memory is its own
+        run(None if sys.argv[2] == "object" else sys.argv[2])
+        sys.exit()
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 450000
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_raw_extract(directory, n_rows, n_rows // 18)
+        shutil.copy(os.path.join(REPO, SIDEWALK_DATA), directory)
+
+        for string_storage in ["object", "pyarrow"]:
+            subprocess.run([sys.executable, os.path.abspath(__file__), str(n_rows), string_storage], cwd = directory, check = True)
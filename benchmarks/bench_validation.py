@@ -0,0 +1,58 @@
+# Author: Leslie Huang (lh1036)
+# Description: Benchmark of the row validation in clean_data.
+# Compares the previous chain of filters (one copy of the frame per null check, then the score checks)
+# with validate_rows(), which evaluates all the rules as masks and copies the frame once, on all-string frames
+# shaped like the raw inspection extract with some empty and negative scores and missing names.
+# Checks that both accept the same rows, and reports times and the number of rows breaking each rule.
+#
+# Usage: python benchmarks/bench_validation.py [number of synthetic rows ...]
+
+import os
+import sys
+import time
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from datacleaning import validate_rows
+from bench_dedup import make_raw_data
+
+def make_invalid_data(n_rows, invalid_share = 0.01, seed = 0):
+    '''
+    Returns make_raw_data(n_rows) with invalid_share of the rows given an empty score, a negative score,
+    or a missing name or cuisine
+    '''
+    rng = np.random.RandomState(seed)
+    data = make_raw_data(n_rows, seed = seed)
+
+    for col, value in [("score", ""), ("score", "-1"), ("restaurant", None), ("cuisinedescription", None)]:
+        data.loc[rng.rand(len(data)) < invalid_share, col] = value
+
+    return data
+
+def filter_rows(df):
+    '''
+    The filters that clean_data applied before the validation stage
+    '''
+    for col in ["restaurant", "street", "cuisinedescription"]:
+        df = df[pd.notnull(df[col])]
+    df = df[pd.notnull(df["score"]) | pd.notnull(df["grade"])]
+    return df.loc[pd.to_numeric(df["score"], errors = "ignore") >= 0]
+
+if __name__ == "__main__":
+
+    for n_rows in [int(arg) for arg in sys.argv[1:]] or [450000, 5000000]:
+        data = make_invalid_data(n_rows)
+
+        start = time.perf_counter()
+        expected = filter_rows(data)
+        baseline = time.perf_counter() - start
+
+        start = time.perf_counter()
+        accepted, quarantine, rule_counts = validate_rows(data)
+        validated = time.perf_counter() - start
+
+        assert accepted.index.equals(expected.index)
+        print("{} rows: filters {:.3f} s, validate_rows {:.3f} s, {} quarantined ({})".format(
+            len(data), baseline, validated, len(quarantine), ", ".join("{}: {}".format(code, count) for code, count in rule_counts.items())))
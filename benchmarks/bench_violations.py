@@ -0,0 +1,50 @@
+# Author: Leslie Huang (lh1036)
+# Description: Benchmark of violation code profiles.
+# Compares the rates of every violation code for every cuisine computed in one batch from the sparse
+# inspection x violation code matrix (ViolationProfiles) with a scan of each cuisine's rows that
+# counts the (inspection, code) pairs, and reports the time to build the matrix.
+#
+# Usage: python benchmarks/bench_violations.py [rows]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from inspectiongrades.violations import ViolationProfiles
+from synthetic import make_restaurant_data
+
+def scan_profiles(data):
+    '''
+    Computes the rate of each code per cuisine by filtering the rows of each cuisine
+    '''
+    profiles = {}
+    for cuisine in data["cuisine_primary"].cat.categories:
+        rows = data[data["cuisine_primary"] == cuisine]
+        inspections = rows.groupby([rows.index, "inspectiondate"]).ngroups
+        cited = rows.reset_index().drop_duplicates(["restaurant", "inspectiondate", "violationcode"])
+        profiles[cuisine] = cited["violationcode"].value_counts() / inspections
+    return profiles
+
+if __name__ == "__main__":
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 450000
+    data = make_restaurant_data(n_rows = n_rows, n_restaurants = n_rows // 18)
+
+    start = time.perf_counter()
+    profiles = ViolationProfiles(data)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    profiles.get_profiles("cuisine_primary")
+    profiles.get_profiles("zipcode")
+    batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scan_profiles(data)
+    scan = time.perf_counter() - start
+
+    print("{} inspections x {} codes, {} cited".format(profiles.matrix.shape[0], profiles.matrix.shape[1], profiles.matrix.nnz))
+    print("build matrix {:.3f} s; all cuisine and zipcode profiles {:.3f} s".format(build, batch))
+    print("scan of each cuisine's rows {:.3f} s".format(scan))
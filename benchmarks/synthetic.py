@@ -0,0 +1,103 @@
+# Author: Leslie Huang (lh1036)
+# Description: Synthetic restaurant_data for the benchmarks.
+# The frame has the same columns and conventions (lowercased strings, one row per violation,
+# indexed by restaurant) as the output of clean_data(), so benchmarks can run without the raw extracts.
+
+import os
+import zipfile
+import pandas as pd
+import numpy as np
+
+CUISINES = ["american", "chinese", "pizza", "italian", "cafe", "mexican", "japanese", "latin", "bakery", "caribbean",
+    "spanish", "donuts", "chicken", "indian", "thai", "greek", "french", "korean", "ice cream", "basque"]
+CUISINE_WEIGHTS = np.array([60, 25, 20, 16, 12, 12, 10, 9, 9, 8, 8, 6, 6, 5, 4, 3, 3, 3, 2, 0.05])
+
+BOROS = {"1": "manhattan", "2": "bronx", "3": "brooklyn", "4": "queens", "5": "staten island"}
+ZIP_PREFIXES = {"1": "100", "2": "104", "3": "112", "4": "113", "5": "103"}
+
+STREETS = ["broadway", "west 4 street", "bleecker street", "amsterdam avenue", "5 avenue", "bedford avenue",
+    "atlantic avenue", "grand concourse", "steinway street", "victory boulevard"]
+SWC_TYPES = ["no cafe", "enclosed", "unenclosed", "small unenclosed"]
+GRADES = np.array(["a", "b", "c", "not yet graded", "grade pending"], dtype = object)
+VIOLATION_CODES = ["02g", "04l", "04n", "06c", "06d", "08a", "10b", "10f", "04m", "02b"]
+
+def make_restaurant_data(n_rows = 450000, n_restaurants = 25000, seed = 0):
+    '''
+    Returns a DF shaped like clean_data()'s output (indexed by restaurant) with n_rows violation rows
+    '''
+    rng = np.random.RandomState(seed)
+
+    # restaurant-level attributes
+    names = np.array(["restaurant {}".format(i) for i in range(n_restaurants)], dtype = object)
+    names[:n_restaurants // 100] = "dunkin' donuts"
+    names[n_restaurants // 100:n_restaurants // 60] = "starbucks"
+    cuisines = rng.choice(CUISINES, n_restaurants, p = CUISINE_WEIGHTS / CUISINE_WEIGHTS.sum())
+    boro_codes = rng.choice(list(BOROS), n_restaurants, p = [0.4, 0.1, 0.25, 0.2, 0.05])
+    zipcodes = np.array([ZIP_PREFIXES[code] + "{:02d}".format(rng.randint(1, 40)) for code in boro_codes], dtype = object)
+    buildings = rng.randint(1, 999, n_restaurants).astype(str).astype(object)
+    streets = rng.choice(STREETS, n_restaurants)
+    swc_types = rng.choice(SWC_TYPES, n_restaurants, p = [0.9, 0.03, 0.05, 0.02])
+
+    # violation rows: busier restaurants are inspected more often
+    restaurant = rng.zipf(1.3, n_rows) % n_restaurants
+    inspection_day = rng.randint(0, 1800, n_rows) // 30 * 30 + restaurant % 30
+    inspectiondate = pd.Timestamp("1/1/2012") + pd.to_timedelta(inspection_day, unit = "D")
+    score = np.round(rng.gamma(2.0, 8.0, n_rows) + (restaurant % 7))
+
+    data = pd.DataFrame({
+        "restaurant": names[restaurant],
+        "boro": np.vectorize(BOROS.get, otypes = [object])(boro_codes[restaurant]),
+        "building": buildings[restaurant],
+        "street": streets[restaurant],
+        "zipcode": zipcodes[restaurant],
+        "cuisinedescription": cuisines[restaurant],
+        "inspectiondate": inspectiondate,
+        "violationcode": rng.choice(VIOLATION_CODES, n_rows),
+        "criticalflag": rng.choice(["critical", "not critical"], n_rows),
+        "score": score,
+        "grade": np.where(score < 14, "a", np.where(score < 28, "b", "c")).astype(object),
+        "inspectiontype": "cycle inspection / initial inspection",
+        "cuisine_primary": cuisines[restaurant],
+        "swc_type": swc_types[restaurant],
+    })
+    data.loc[rng.rand(n_rows) < 0.1, "grade"] = "not yet graded"
+    data["address_id"] = data["building"] + " " + data["street"] + " " + data["zipcode"]
+    
+    for col in ["boro", "grade", "cuisine_primary", "swc_type"]:
+        data[col] = data[col].astype("category")
+
+    return data.set_index("restaurant")
+
+RAW_EXTRACT = "DOHMH_New_York_City_Restaurant_Inspection_Results.csv"
+
+def write_raw_extract(directory, n_rows = 450000, n_restaurants = 25000, seed = 0):
+    '''
+    Writes a synthetic ZIP archive of the raw inspection extract read by clean_data() into directory:
+    the rows of make_restaurant_data() in the raw columns and conventions (uppercase strings, dates as text)
+    '''
+    data = make_restaurant_data(n_rows, n_restaurants, seed).reset_index()
+    camis = pd.factorize(data["restaurant"] + data["address_id"])[0] + 40000000
+
+    raw = pd.DataFrame({
+        "CAMIS": camis.astype(str),
+        "DBA": data["restaurant"].str.upper(),
+        "BORO": data["boro"].astype(str).str.upper(),
+        "BUILDING": data["building"],
+        "STREET": data["street"].str.upper(),
+        "ZIPCODE": data["zipcode"],
+        "PHONE": "2125550100",
+        "CUISINE DESCRIPTION": data["cuisinedescription"].str.title(),
+        "INSPECTION DATE": data["inspectiondate"].dt.strftime("%m/%d/%Y"),
+        "ACTION": "Violations were cited in the following area(s).",
+        "VIOLATION CODE": data["violationcode"].str.upper(),
+        "VIOLATION DESCRIPTION": "Violation " + data["violationcode"],
+        "CRITICAL FLAG": data["criticalflag"].str.title(),
+        "SCORE": data["score"].astype(int).astype(str),
+        "GRADE": data["grade"].astype(str).str.upper().replace({"NOT YET GRADED": "", "GRADE PENDING": "P"}),
+        "GRADE DATE": data["inspectiondate"].dt.strftime("%m/%d/%Y"),
+        "RECORD DATE": "11/27/2016",
+        "INSPECTION TYPE": data["inspectiontype"].str.title(),
+    })
+
+    with zipfile.ZipFile(os.path.join(directory, RAW_EXTRACT + ".zip"), "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(RAW_EXTRACT, raw.to_csv(index = False))
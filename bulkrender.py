@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# Author: Leslie Huang (lh1036)
+# Description: Bulk rendering of the graphs of many cuisines, zipcodes and restaurants at once.
+# Job sizes vary by orders of magnitude (e.g. "american" vs "basque"), so jobs are not handed out in
+# a fixed order: the cost of each job is estimated from the row count of its group (from the value
+# counts of cuisine_primary, zipcode and the restaurant index) and the jobs are dispatched largest
+# first, each to the next idle worker, so that the small jobs fill in around the large ones at the end.
+#
+# Workers are forked processes that share the loaded data (and the structures derived from it, built
+# before forking). The per-worker memory ceiling is enforced in each worker as a limit on its address
+# space, so a job that would exceed it fails with MemoryError (reported as the job's error) instead of
+# running on or being killed by the system; a worker whose job failed that way, or whose resident memory
+# exceeds the ceiling after a job, is replaced by a fresh one. The time of every job is reported, and written to a timings file from which the cost
+# model of the next run is calibrated.
+#
+# Usage: python bulkrender.py [--workers=N] [--max-worker-mb=MB] [--format=FORMAT] [--dpi=DPI] [--rasterize] [--max-bars=N] KIND [KIND ...]
+# where KIND is cuisine, zipcode or restaurant; graphs are saved in the working directory, in FORMAT (pdf, svg,
+# png or webp; default pdf) at DPI, with dense artists rasterized, and graphs of more than N bars aggregated
+# (see rendering.RenderContext).
+
+import os
+import sys
+import time
+import queue
+import resource
+import multiprocessing
+from collections import namedtuple
+import pandas as pd
+import numpy as np
+from inspectiongrades import CuisineGrades, ZipGrades, RestaurantGrades
+from inspectiongrades.rendering import RenderContext, parse_render_options
+from inspectiongrades.precomputed import get_derived, set_derived
+from inspectiongrades.ranking import RestaurantRanking
+from inspectiongrades.boxstats import BoxStats
+from inspectiongrades.labels import make_display_labels
+from inspectiongrades.locations import LocationIndex
+from inspectiongrades.trendfeatures import TrendFeatures
+from inspectiongrades.violations import ViolationProfiles
+
+# visualizer of each kind of job, and the column whose value counts are the jobs' row counts (None: the index)
+JOB_KINDS = {"cuisine": (CuisineGrades, "cuisine_primary"), "zipcode": (ZipGrades, "zipcode"), "restaurant": (RestaurantGrades, None)}
+
+# estimated seconds of a job of each kind: fixed + per_row * rows (measured on 450k synthetic rows with the
+# default PDF output and reused figures, see benchmarks/bench_bulkrender.py)
+DEFAULT_COST_MODEL = {"cuisine": (1.08, 4.8e-6), "zipcode": (1.05, 4.1e-6), "restaurant": (0.19, 6.9e-6)}
+
+BULK_TIMINGS_FILE = "bulk_timings.csv"
+
+MAX_WORKER_BYTES = 2 * 1024 ** 3
+
+Job = namedtuple("Job", ["kind", "key", "rows", "estimate"])
+JobTiming = namedtuple("JobTiming", ["kind", "key", "rows", "estimate", "seconds", "worker", "rss_bytes", "files", "error"])
+
+def count_rows(data, kind):
+    '''
+    Returns a Series (index: keys of the jobs of kind) of the number of rows of each group
+    '''
+    column = JOB_KINDS[kind][1]
+    counts = (data.index if column is None else data[column]).value_counts()
+    return counts[counts > 0]
+
+def make_jobs(data, kinds, cost_model = None):
+    '''
+    Returns a list of the jobs of every group of kinds, largest estimated cost first
+    @param cost_model: dict {kind: (fixed seconds, seconds per row)}; kinds it doesn't have use DEFAULT_COST_MODEL
+    '''
+    cost_model = dict(DEFAULT_COST_MODEL, **(cost_model or {}))
+    jobs = []
+
+    for kind in kinds:
+        fixed, per_row = cost_model[kind]
+        jobs.extend(Job(kind, key, int(rows), fixed + per_row * rows) for key, rows in count_rows(data, kind).items())
+
+    # ties (e.g. restaurants with the same number of rows) keep the order of the keys
+    return sorted(jobs, key = lambda job: -job.estimate)
+
+def fit_cost_model(timings):
+    '''
+    Returns a cost model {kind: (fixed seconds, seconds per row)} fitted by least squares to the timings of completed jobs
+    @param timings: DF with columns kind, rows, seconds (e.g. the timings file of a previous run); failed jobs are ignored
+    Kinds with fewer than 2 distinct row counts are left out
+    '''
+    timings = timings[timings["error"].isna()] if "error" in timings.columns else timings
+    cost_model = {}
+
+    for kind, group in timings.groupby("kind"):
+        if group["rows"].nunique() < 2:
+            continue
+
+        per_row, fixed = np.polyfit(group["rows"].astype(float), group["seconds"].astype(float), 1)
+        cost_model[kind] = (max(fixed, 0.), max(per_row, 0.))
+
+    return cost_model
+
+def peak_rss_bytes():
+    '''
+    Returns the peak resident memory of the current process in bytes (ru_maxrss is in KB on Linux, bytes on macOS)
+    '''
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def rss_bytes():
+    '''
+    Returns the current resident memory of the current process in bytes (its peak where /proc is not available)
+    '''
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return peak_rss_bytes()
+
+def virtual_bytes():
+    '''
+    Returns the virtual memory size of the current process in bytes, or None where /proc is not available
+    '''
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * resource.getpagesize()
+    except OSError:
+        return None
+
+def limit_memory(max_bytes):
+    '''
+    Limits the address space of the current process, so that allocations that would take its resident memory above
+    max_bytes raise MemoryError: its current virtual size may grow by max_bytes minus its current resident memory
+    Returns False where the virtual size is not available (the limit is not set)
+    '''
+    size = virtual_bytes()
+    if size is None:
+        return False
+
+    hard = resource.getrlimit(resource.RLIMIT_AS)[1]
+    limit = size + max(max_bytes - rss_bytes(), 0)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    return True
+
+def warm_up(data, violations = None):
+    '''
+    Builds the structures derived from data that the visualizers share, so that forked workers inherit them
+    instead of each building its own
+    @param violations: DF of the violation codes of each inspection_id of data (see clean_data(keep_violations = True)),
+    from which the violation profiles of the top violations graphs are built, as in main
+    '''
+    for name, builder in [("ranking", RestaurantRanking), ("box_stats", BoxStats), ("display_labels", make_display_labels), ("locations", LocationIndex), ("trend_features", TrendFeatures)]:
+        get_derived(data, name, builder)
+
+    if violations is not None:
+        set_derived(data, "violation_profiles", ViolationProfiles(data, violations))
+
+def work(data, worker, jobs, results, max_worker_bytes, render_options):
+    '''
+    Loop of a worker process: renders the jobs it takes from the jobs queue (until None) and puts a JobTiming
+    for each on the results queue. Exits after a job that ran out of memory (see limit_memory) or left its resident
+    memory above max_worker_bytes, so that it is replaced by a fresh worker, and puts None on the results queue on exit
+    '''
+    # a worker renders many graphs in a row, so it reuses one cleared Figure instead of creating one per graph
+    renderer = RenderContext(**dict({"reuse_figures": True}, **render_options))
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+
+        start, files, error, out_of_memory = time.perf_counter(), [], None, False
+        try:
+            files = JOB_KINDS[job.kind][0](job.key, data, renderer = renderer).make_graphs()
+        except Exception as e:
+            error = "{}: {}".format(type(e).__name__, e)
+            out_of_memory = isinstance(e, MemoryError)
+
+        memory = rss_bytes()
+        results.put(JobTiming(job.kind, job.key, job.rows, job.estimate, time.perf_counter() - start, worker, memory, len(files), error))
+
+        if out_of_memory or (max_worker_bytes is not None and memory > max_worker_bytes):
+            break
+
+    results.put(None)
+
+def limited_work(data, worker, jobs, results, max_worker_bytes, render_options):
+    '''
+    Entry point of a forked worker process: limits its memory to max_worker_bytes (if not None), then runs work
+    '''
+    if max_worker_bytes is not None:
+        limit_memory(max_worker_bytes)
+
+    work(data, worker, jobs, results, max_worker_bytes, render_options)
+
+class BulkRenderer(object):
+    '''
+    Renders the graphs of many groups on several worker processes, largest estimated job first
+    '''
+
+    def __init__(self, data, workers = None, max_worker_bytes = MAX_WORKER_BYTES, notify = print, violations = None, **render_options):
+        '''
+        Constructor
+        @param data: the full restaurant_data DF
+        @param violations: DF of the violation codes of each inspection of data (see warm_up); without it, and without
+        a violationcode column in data, the top violations graphs are not drawn
+        @param workers: number of worker processes (default: the number of CPUs)
+        @param max_worker_bytes: memory ceiling of each worker, counting the pages it shares with this process; a job
+        that would allocate beyond it fails with MemoryError, and its worker (or one over the ceiling after a job)
+        is replaced; None for no ceiling
+        @param notify: function called with a message as each job completes or fails
+        @param render_options: arguments of each worker's RenderContext (e.g. output_format); workers reuse their
+        Figure unless reuse_figures = False is given
+        '''
+        self.data = data
+        self.workers = workers or os.cpu_count() or 1
+        self.max_worker_bytes = max_worker_bytes
+        self.notify = notify
+        self.violations = violations
+        self.render_options = render_options
+
+    def run(self, jobs):
+        '''
+        Renders jobs (a list of Job, in the order they are dispatched; see make_jobs) and returns a DF of their
+        JobTimings, in order of completion
+        '''
+        warm_up(self.data, self.violations)
+
+        # a worker's resident memory includes the pages of this process that it touches, so a ceiling below
+        # this process's would replace every worker after every job
+        if self.max_worker_bytes is not None and self.max_worker_bytes <= rss_bytes():
+            raise ValueError("The memory ceiling of {:.0f} MB per worker is below the {:.0f} MB of the loaded data".format(
+                self.max_worker_bytes / 1024 ** 2, rss_bytes() / 1024 ** 2))
+
+        # forked workers share the data and its derived structures instead of receiving a copy
+        context = multiprocessing.get_context("fork")
+        job_queue, results = context.Queue(), context.Queue()
+        for job in jobs:
+            job_queue.put(job)
+
+        processes, timings = [], []
+        def start_worker():
+            process = context.Process(target = limited_work, args = (self.data, len(processes), job_queue, results, self.max_worker_bytes, self.render_options))
+            process.start()
+            processes.append(process)
+
+        for i in range(min(self.workers, len(jobs))):
+            start_worker()
+
+        while len(timings) < len(jobs):
+            try:
+                timing = results.get(timeout = 1)
+            except queue.Empty:
+                # a worker killed while rendering (e.g. by the system when out of memory) never reports its job
+                dead = [i for i, process in enumerate(processes) if process.exitcode not in (None, 0)]
+                if dead:
+                    for process in processes:
+                        process.terminate()
+                    raise RuntimeError("Worker {} died with exit code {}".format(dead[0], processes[dead[0]].exitcode))
+                continue
+
+            if timing is None:
+                # a worker exited at its memory ceiling: replace it while jobs remain
+                self.notify("A worker at the memory ceiling of {:.0f} MB was replaced".format(self.max_worker_bytes / 1024 ** 2))
+                start_worker()
+                continue
+
+            timings.append(timing)
+            if timing.error is None:
+                self.notify("[{}/{}] {} {}: {} graphs in {:.2f} s (estimated {:.2f} s)".format(len(timings), len(jobs), timing.kind, timing.key, timing.files, timing.seconds, timing.estimate))
+            else:
+                self.notify("[{}/{}] {} {} failed: {}".format(len(timings), len(jobs), timing.kind, timing.key, timing.error))
+
+        # the workers still running stop at None, and the last message of each is its own None
+        for process in processes:
+            if process.is_alive():
+                job_queue.put(None)
+        for process in processes:
+            process.join()
+
+        return pd.DataFrame(timings, columns = JobTiming._fields)
+
+def load_cost_model(path = BULK_TIMINGS_FILE):
+    '''
+    Returns the cost model fitted to the timings file of a previous run, or an empty dict if there is none
+    '''
+    if not os.path.exists(path):
+        return {}
+
+    return fit_cost_model(pd.read_csv(path))
+
+if __name__ == "__main__":
+
+    options = dict(arg[2:].split("=", 1) for arg in sys.argv[1:] if arg.startswith("--") and "=" in arg)
+    kinds = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+
+    usage = "Usage: python bulkrender.py [--workers=N] [--max-worker-mb=MB] [--format=FORMAT] [--dpi=DPI] [--rasterize] [--max-bars=N] {{{}}} ...".format(",".join(JOB_KINDS))
+    if not kinds or any(kind not in JOB_KINDS for kind in kinds):
+        sys.exit(usage)
+
+    try:
+        render_options = parse_render_options(sys.argv[1:])
+    except ValueError as e:
+        sys.exit("{}\n{}".format(e, usage))
+
+    from datacleaning import clean_data
+    restaurant_data, violations = clean_data(keep_violations = True)
+    restaurant_data = restaurant_data.set_index(["restaurant"])
+
+    # the estimates are calibrated on the timings of the previous run, if any
+    cost_model = load_cost_model()
+    jobs = make_jobs(restaurant_data, kinds, cost_model)
+
+    max_worker_bytes = int(float(options["max-worker-mb"]) * 1024 ** 2) if "max-worker-mb" in options else MAX_WORKER_BYTES
+    renderer = BulkRenderer(restaurant_data, int(options.get("workers", 0)) or None, max_worker_bytes, violations = violations, **render_options)
+
+    start = time.perf_counter()
+    timings = renderer.run(jobs)
+    elapsed = time.perf_counter() - start
+
+    timings.to_csv(BULK_TIMINGS_FILE, index = False)
+    print("Rendered {} jobs on {} workers in {:.1f} s ({:.1f} s of rendering); timings saved to {}".format(
+        len(timings), renderer.workers, elapsed, timings["seconds"].sum(), BULK_TIMINGS_FILE))
+
+    for kind, (fixed, per_row) in sorted(fit_cost_model(timings).items()):
+        print("    {}: {:.3f} s + {:.2e} s per row".format(kind, fixed, per_row))
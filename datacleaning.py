@@ -4,7 +4,8 @@
 # (#1: Restaurant Grades Data, #2: Sidewalk Cafe Data), 
 # implements data cleaning, and saves the cleaned and merged file.
 #
-# When this file is run, it will output a CSV of the dataset.
+# When this file is run, it will output a CSV of the dataset, and the rows rejected by validation to QUARANTINE_FILE.
+# Run as "python datacleaning.py DIRECTORY" to also add it to the partitioned history in DIRECTORY.
 # When this program is called from main.py, it generates a dataframe 
 # used within the main.
 #
@@ -14,11 +15,26 @@
 
 import pandas as pd
 import numpy as np
+import os
 import re
+import sys
 import zipfile
+from addressmatching import match_addresses
+
+# pyarrow is only needed for Arrow-backed strings (clean_data(string_storage = "pyarrow"))
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
 
 ### Helper functions for data cleaning
 
+def is_arrow_string(column):
+    # True for a string column stored in Arrow (clean_data(string_storage = "pyarrow")), whose string operations
+    # run as vectorized Arrow kernels instead of Python calls on each object
+    return isinstance(column.dtype, pd.StringDtype) and column.dtype.storage == "pyarrow"
+
 def clean_colnames(df):
     # change column names to lowercase and strip whitespace for consistency
     df.columns = pd.Index(col_name.lower().replace(" ", "") for col_name in df.columns)
@@ -32,28 +48,206 @@ def convert_lowercase(df):
 def strip_whitespace(df, columns):
     # remove excessive whitespace (typos such as "44th    street") from specified columns
     for col in columns:
-        df[col] = pd.Series(" ".join(entry.split()) for entry in df[col])
+        if is_arrow_string(df[col]):
+            df[col] = df[col].str.replace(r"\s+", " ", regex = True).str.strip()
+        else:
+            df[col] = pd.Series(" ".join(entry.split()) for entry in df[col])
     return df    
 
 def concat_cols(df, columns_to_add, new_column):
     # create a new string column from an list of existing columns
-    df[new_column] = df[columns_to_add].apply(lambda x: " ".join(x), axis = 1)
+    if all(is_arrow_string(df[col]) for col in columns_to_add):
+        joined = pc.binary_join_element_wise(*[pa.array(df[col].array) for col in columns_to_add], " ")
+        df[new_column] = pd.arrays.ArrowStringArray(joined)
+    else:
+        df[new_column] = df[columns_to_add].apply(lambda x: " ".join(x), axis = 1)
     return df
 
 def make_primary_cuisine(df, cuisines, cuisine_primary):
     # make a new var (cuisine_primary) that is the first cuisine listed in cuisines
-    df[cuisine_primary] = df[cuisines].apply(lambda x: re.split(r"[,/()]", x)[0].strip())   
+    if is_arrow_string(df[cuisines]):
+        df[cuisine_primary] = df[cuisines].str.replace(r"[,/()].*", "", regex = True).str.strip()
+    else:
+        df[cuisine_primary] = df[cuisines].apply(lambda x: re.split(r"[,/()]", x)[0].strip())   
     return df
 
-def drop_multiple_column_nulls(df, cols_to_drop):
-    # drop all observations containing a null in any column in the list cols_to_drop
-    for col in cols_to_drop:
-        df = df[pd.notnull(df[col])]
+def convert_dates(column, date_format):
+    # parse a string column of dates; unparseable and empty strings become NaT
+    # Arrow-backed strings are parsed by Arrow's strptime, without converting them to Python objects first
+    if is_arrow_string(column):
+        dates = pc.strptime(pa.array(column.array), format = date_format, unit = "ns", error_is_null = True)
+        return pd.Series(dates.to_pandas(), index = column.index)
+    
+    return pd.to_datetime(column, format = date_format, errors = "coerce")
+
+def parse_numbers(column, errors = "coerce"):
+    # returns an array of the numbers in a string column, like pd.to_numeric(column, errors).values (with
+    # errors = "coerce", NaN for empty and non-numeric strings); a column such as the score has few distinct
+    # strings, so only those are parsed, and the numbers are spread back to the rows by their factorized codes
+    codes, uniques = pd.factorize(column)
+    numbers = pd.to_numeric(pd.Series(np.asarray(uniques, dtype = object)), errors = errors).values
+    
+    # missing values have the code -1, which picks the NaN appended at the end
+    if (codes < 0).any():
+        numbers = np.append(numbers, np.nan)
+    
+    return numbers[codes]
+
+# row rules of the validation stage, as (reason code, description); a row that breaks any of them is quarantined
+VALIDATION_RULES = [
+    ("missing_restaurant", "no restaurant name"),
+    ("missing_street", "no street"),
+    ("missing_cuisine", "no cuisine description"),
+    ("missing_score", "empty score (the score is what every graph plots)"),
+    ("invalid_score", "score is not a number"),
+    ("negative_score", "negative score (data entry error)"),
+]
+
+QUARANTINE_FILE = "quarantined_rows.csv"
+
+def find_invalid_rows(df):
+    # evaluate every rule of VALIDATION_RULES on all rows at once
+    # returns a DF of boolean masks (one column per reason code, True where the row breaks the rule)
+    # the score is parsed once: empty and non-numeric scores both become NaN, and are told apart by the raw strings
+    # (only those of the NaN rows are compared)
+    score = parse_numbers(df["score"])
+    not_numbers = np.flatnonzero(np.isnan(score))
+    empty_score = np.zeros(len(df), dtype = bool)
+    empty_score[not_numbers] = (df["score"].iloc[not_numbers].fillna("") == "").to_numpy(dtype = bool)
+    
+    return pd.DataFrame({
+        "missing_restaurant": df["restaurant"].isna().values,
+        "missing_street": df["street"].isna().values,
+        "missing_cuisine": df["cuisinedescription"].isna().values,
+        "missing_score": empty_score,
+        "invalid_score": np.isnan(score) & ~empty_score,
+        "negative_score": score < 0,
+    }, index = df.index, columns = [code for code, description in VALIDATION_RULES])
+
+def validate_rows(df):
+    # split df into accepted and rejected rows in one pass: the rule masks are combined into one mask, so df is
+    # only copied once for each side
+    # returns a tuple (DF of accepted rows, DF of rejected rows with a "reason" column, Series of the number of rows
+    # breaking each rule); the reason lists every rule the row breaks, separated by ";"
+    masks = find_invalid_rows(df)
+    
+    # each row's broken rules as the bits of one integer, so that the reason of each distinct combination is
+    # only spelled out once
+    flags = masks.values.astype(np.int64) @ (1 << np.arange(len(masks.columns), dtype = np.int64))
+    rejected = flags != 0
+    
+    flag_codes, flag_values = pd.factorize(flags[rejected])
+    reasons = [";".join(code for bit, code in enumerate(masks.columns) if flag >> bit & 1) for flag in flag_values]
+    
+    quarantine = df[rejected].copy()
+    quarantine["reason"] = pd.Categorical.from_codes(flag_codes, categories = reasons)
+    
+    return df[~rejected], quarantine, masks.sum()
+
+def make_categorical(df, columns):
+    # store string columns with few distinct values as categoricals (with sorted categories), so that filtering
+    # and grouping compare integer codes, and display labels only need to be computed once per category
+    for col in columns:
+        df[col] = df[col].astype("category")
     return df
 
+def hash_multipliers(n):
+    # n fixed random odd 64-bit multipliers, one per column of a row hash
+    return np.random.RandomState(0).randint(0, 2**63, n, dtype = np.uint64) * np.uint64(2) + np.uint64(1)
+
+def drop_duplicate_rows(df):
+    # same result as df.drop_duplicates() (keeps the first of identical rows), but compares one 64-bit hash per row
+    # instead of comparing the strings column by column. The hash is the sum of each column's factorized codes times
+    # a random odd multiplier (uint64 arithmetic wraps around), and is built one column at a time: a row whose partial
+    # hash is unique cannot be a duplicate, so later columns are only factorized for the remaining candidate rows
+    candidates = np.arange(len(df))
+    hashes = np.zeros(len(df), dtype = np.uint64)
+    codes = []
+    
+    # start with the columns with the most distinct values (estimated on a sample), which rule out the most rows
+    sample = candidates[::max(len(df) // 10000, 1)]
+    columns = sorted(df.columns, key = lambda col: -len(pd.unique(df[col].values[sample])))
+    
+    for col, multiplier in zip(columns, hash_multipliers(len(columns))):
+        if len(candidates) == 0:
+            break
+        
+        # factorize gives missing values the code -1, so they compare equal like in drop_duplicates
+        col_codes = np.empty(len(df), dtype = np.intp)
+        col_codes[candidates] = pd.factorize(df[col].values[candidates])[0]
+        codes.append(col_codes)
+        hashes += col_codes[candidates].astype(np.uint64) * multiplier
+        
+        is_candidate = pd.Series(hashes).duplicated(keep = False).values
+        candidates, hashes = candidates[is_candidate], hashes[is_candidate]
+    
+    codes = [col_codes[candidates] for col_codes in codes]
+    
+    # among the candidates, a row is a duplicate if an earlier row has the same hash
+    hash_ids = pd.factorize(hashes)[0]
+    positions = np.arange(len(candidates))
+    first_positions = np.empty(len(candidates), dtype = positions.dtype)
+    first_positions[hash_ids[::-1]] = positions[::-1] # assignment in reverse order leaves the first position
+    first_positions = first_positions[hash_ids]
+    is_duplicate = positions != first_positions
+    
+    # verify that rows flagged as duplicates are identical to the first row with their hash
+    # if two different rows share a hash, fall back to an exact comparison of the candidates' codes
+    duplicates = np.flatnonzero(is_duplicate)
+    for col_codes in codes:
+        if (col_codes[duplicates] != col_codes[first_positions[duplicates]]).any():
+            is_duplicate = pd.DataFrame(dict(enumerate(codes))).duplicated().values
+            break
+    
+    keep = np.ones(len(df), dtype = bool)
+    keep[candidates[is_duplicate]] = False
+    return df[keep]
+
+def make_inspection_table(df, violation_columns, inspection_id):
+    # collapse violation-level rows (one row per violation) into one row per inspection
+    # an inspection is identified by all columns that are not in violation_columns
+    # returns a tuple (DF of inspections with a violation_count column, DF of (inspection_id, violationcode))
+    inspection_columns = [col for col in df.columns if col not in violation_columns]
+    df[inspection_id] = df.groupby(inspection_columns, sort = False, dropna = False).ngroup().astype(np.int32)
+    
+    # inspections without violations have one row with an empty violation code
+    violations = df.loc[df["violationcode"] != "", [inspection_id, "violationcode"]]
+    violations = violations.drop_duplicates().reset_index(drop = True)
+    violations["violationcode"] = violations["violationcode"].astype("category")
+    
+    inspections = df.drop(violation_columns, axis = 1).drop_duplicates(inspection_id)
+    violation_counts = violations.groupby(inspection_id).size()
+    inspections["violation_count"] = violation_counts.reindex(inspections[inspection_id], fill_value = 0).values
+    
+    return inspections.reset_index(drop = True), violations
+
+def latest_license_per_address(licenses, address_id, date_column, date_format):
+    # keeps one license row per address: the one issued last (by date_column, in date_format)
+    # an address can have several license rows (renewals, new applications); rows without an issuance date
+    # are only kept for addresses that have no dated license
+    dates = convert_dates(licenses[date_column], date_format)
+    latest = licenses.assign(_issued = dates.values).sort_values(by = "_issued", na_position = "first", kind = "mergesort")
+    return latest.drop_duplicates(address_id, keep = "last").drop("_issued", axis = 1).sort_index()
+
+def merge_sidewalk_licenses(inspections, sidewalk_licenses, address_matches):
+    # left-joins each inspection to the latest license of its matched sidewalk cafe address
+    # address_matches has one row per address_id (see match_addresses), and the licenses are reduced to one row per
+    # swc_address_id, so each inspection remains one row
+    sidewalk_licenses = latest_license_per_address(sidewalk_licenses, "swc_address_id", "issuance_dd", "%m/%d/%Y")
+    inspections = pd.merge(inspections, address_matches, on = "address_id", how = "left")
+    return pd.merge(inspections, sidewalk_licenses, on = "swc_address_id", how = "left")
+
 ### This is the main datacleaning
 
-def clean_data():
+def clean_data(keep_violations = False, string_storage = None, quarantine_file = None):
+    # returns the cleaned and merged DF, with one row per inspection
+    # if keep_violations, returns a tuple (DF, DF of the violation codes of each inspection_id)
+    # rows that fail validation are dropped; if quarantine_file is given (as by the cleaning run of this file), they are
+    # written to it with their reasons, and the number of rows breaking each rule is printed
+    # if string_storage is "pyarrow", string columns are read and kept as Arrow-backed strings (pd.StringDtype("pyarrow"))
+    # end to end: the cleaning steps run as Arrow kernels, and the strings take a fraction of the memory of Python
+    # objects; by default (None) they are Python object strings
+    string_dtype = str if string_storage is None else pd.StringDtype(string_storage)
     
     ### read in (1) ZIP archive of Restaurant Inspection Dataset downloaded from  https://data.cityofnewyork.us/Health/DOHMH-New-York-City-Restaurant-Inspection-Results/xx67-kt59
     # PLEASE NOTE: The online version located at that URL is regularly updated. 
@@ -61,7 +255,7 @@ def clean_data():
     with zipfile.ZipFile("DOHMH_New_York_City_Restaurant_Inspection_Results.csv.zip", "r") as myzipfile:
         myzipfile.extractall()
     
-    restaurant_grades = pd.read_csv("DOHMH_New_York_City_Restaurant_Inspection_Results.csv", dtype = str, keep_default_na = False, na_values = [])
+    restaurant_grades = pd.read_csv("DOHMH_New_York_City_Restaurant_Inspection_Results.csv", dtype = string_dtype, keep_default_na = False, na_values = [])
     
     ### Because of the dataset's size, processing time is nontrivial. Thus, I proceed in the following steps:
     # (1) Fixing names and formatting, so that references are consistent
@@ -76,17 +270,23 @@ def clean_data():
     ### (2) Dropping
     
     ## drop unneeded columns
-    restaurant_grades = restaurant_grades.drop(["recorddate", "camis", "action", "phone", "violationcode"], axis = 1)
+    # Note: violationcode is kept until the violation rows are collapsed into inspections in (3)
+    restaurant_grades = restaurant_grades.drop(["recorddate", "camis", "action", "phone"], axis = 1)
     
     ## Drop rows:
-    restaurant_grades = restaurant_grades.drop_duplicates()
+    restaurant_grades = drop_duplicate_rows(restaurant_grades)
 
-    # Missing essential information: (a) name, category, address, or both score and grade
-    restaurant_grades = drop_multiple_column_nulls(restaurant_grades, ["restaurant", "street", "cuisinedescription"])
-    restaurant_grades = restaurant_grades[pd.notnull(restaurant_grades["score"]) | pd.notnull(restaurant_grades["grade"])]
+    # Missing essential information (name, category, address or score) and invalid or negative scores:
+    # when this file is run, the rejected rows are written with their reasons to the quarantine file instead of being dropped silently
+    restaurant_grades, quarantine, rule_counts = validate_rows(restaurant_grades)
     
-    # drop observations with negative scores (data entry error)
-    restaurant_grades = restaurant_grades.loc[pd.to_numeric(restaurant_grades["score"], errors = "ignore") >= 0]
+    if quarantine_file is not None:
+        # line number of each rejected row in the raw CSV (the header is line 1), to find it in the extract
+        quarantine.insert(0, "line", quarantine.index + 2)
+        quarantine.to_csv(quarantine_file, index = False)
+        print("Quarantined {} rows to {} ({})".format(
+            len(quarantine), quarantine_file, ", ".join("{}: {}".format(code, count) for code, count in rule_counts.items())
+        ))
     
     # drop restaurants with only one recorded inspection
     
@@ -97,7 +297,7 @@ def clean_data():
     restaurant_grades = convert_lowercase(restaurant_grades)
     
     # format scores and grades
-    restaurant_grades["score"] = pd.to_numeric(restaurant_grades["score"])
+    restaurant_grades["score"] = parse_numbers(restaurant_grades["score"], errors = "raise")
     restaurant_grades["grade"].replace(to_replace = ["p", "z"], value = "grade pending", inplace = True)
     
     # create unique ID var from address
@@ -106,13 +306,17 @@ def clean_data():
     # set first-listed cuisine as the primary cuisine and fix a unicode rendering error
     restaurant_grades = make_primary_cuisine(restaurant_grades, "cuisinedescription", "cuisine_primary")
     restaurant_grades["cuisine_primary"].replace(to_replace = ["cafÃ£Â©", "cafã©"], value = "cafe", inplace = True)  
+    
+    # The dataset has one row per violation, so an inspection with several violations appears in several rows
+    # (with the same score). Collapse to one row per inspection, keeping the violation codes as a side table
+    restaurant_grades, violations = make_inspection_table(restaurant_grades, ["violationcode", "violationdescription", "criticalflag"], "inspection_id")
       
       
     ### Read in (2) Sidewalk Cafe Dataset, downloaded from
     # https://data.cityofnewyork.us/Business/Sidewalk-Caf-Licenses-and-Applications/qcdj-rwhu
     # NOTE: This dataset is constantly updated. I use the 12/2/2016 version.
     
-    sidewalk_licenses = pd.read_csv("Sidewalk_Caf__Licenses_and_Applications.csv", dtype = str, keep_default_na = False, na_values = [])
+    sidewalk_licenses = pd.read_csv("Sidewalk_Caf__Licenses_and_Applications.csv", dtype = string_dtype, keep_default_na = False, na_values = [])
 
     # lowercase and strip whitespace
     sidewalk_licenses = clean_colnames(sidewalk_licenses)
@@ -122,29 +326,60 @@ def clean_data():
     # create unique ID var from address
     sidewalk_licenses = concat_cols(sidewalk_licenses, ["building", "street", "zip"], "address_id")
 
+    # link each restaurant address to the best-matching sidewalk cafe address (the two datasets abbreviate addresses differently)
+    # Note: matching uses "building", "street", "zip", so I drop them only after this step
+    address_matches = match_addresses(restaurant_grades, sidewalk_licenses.rename(columns = {"zip": "zipcode"}))
+    address_matches = address_matches.rename(columns = {"match_address_id": "swc_address_id", "match_score": "swc_match_score"})
+
     # Keep only needed columns
-    # Note: I drop "building", "street", "zip" AFTER using them to construct address_id
     sidewalk_licenses = sidewalk_licenses[["lic_status", "swc_type", "swc_sq_ft", "issuance", "business_name", "business_name2", "issuance_dd", "address_id"]]
+    sidewalk_licenses = sidewalk_licenses.rename(columns = {"address_id": "swc_address_id"})
 
 
 ### Merge and output the merged file
 
-    # merge on unique address_id var
-    merged = pd.merge(restaurant_grades, sidewalk_licenses, left_on = "address_id", right_on = "address_id", how = "left")
+    # merge on the matched addresses; swc_match_score is the confidence of the match (1.0 for the same normalized address)
+    # each address keeps only its latest license, so the merged file still has one row per inspection
+    merged = merge_sidewalk_licenses(restaurant_grades, sidewalk_licenses, address_matches)
     
     # add a label for restaurants that don't have sidewalk cafes
     merged["swc_type"] = merged["swc_type"].replace(np.nan, "no cafe", regex = True)
 
     # convert dates to datetime object for timeseries analysis
     for col_name in ["inspectiondate", "gradedate", "issuance_dd"]:
-        merged[col_name] = pd.to_datetime(merged[col_name], format = "%m/%d/%Y", errors = "coerce")
+        merged[col_name] = convert_dates(merged[col_name], "%m/%d/%Y")
+    
+    # columns with few distinct values that the visualizers filter and group on
+    merged = make_categorical(merged, ["boro", "grade", "cuisine_primary", "swc_type"])
     
+    if keep_violations:
+        return merged, violations
     
     return merged
 
 
 if __name__ == "__main__":    
     
-    # write cleaned data to file
+    merged, violations = clean_data(keep_violations = True, quarantine_file = QUARANTINE_FILE)
+    
+    # write cleaned data to file (one row per inspection) and the violation codes of each inspection
     with open("cleaned_data.csv", "w") as file:
-        clean_data().to_csv(file, index = False)
+        merged.to_csv(file, index = False)
+    
+    with open("cleaned_violations.csv", "w") as file:
+        violations.to_csv(file, index = False)
+    
+    # optionally also write the partitioned history used by main.py (requires pyarrow)
+    if len(sys.argv) > 1:
+        from inspectiongrades.storage import write_partitioned, PartitionedData
+        write_partitioned(merged.set_index("restaurant"), sys.argv[1])
+        
+        # the trend dashboard in history mode is drawn from the time cube saved with the history, refreshed
+        # from the whole history (not only this extract), of which only the cube's columns are read
+        from inspectiongrades.timecube import TIME_CUBE_FILE, CUBE_COLUMNS, load_time_cube
+        load_time_cube(PartitionedData(sys.argv[1]).read(columns = CUBE_COLUMNS), os.path.join(sys.argv[1], TIME_CUBE_FILE))
+
+    # optionally also save a snapshot named by today's date, to compare with later extracts
+    if len(sys.argv) > 2:
+        from inspectiongrades.snapshots import SnapshotStore
+        SnapshotStore(sys.argv[2]).save("{:%Y-%m-%d}".format(pd.Timestamp.today()), merged.set_index("restaurant"))
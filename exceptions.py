@@ -28,4 +28,10 @@ class QuitError(Exception):
     '''
 
     def __str__(self):
-        return "Goodbye."
\ No newline at end of file
+        return "Goodbye."
+class InvalidRadiusError(Exception):
+    '''
+    Error if user inputs a search radius that is not a positive number of miles (up to a maximum)
+    '''
+    def __str__(self):
+        return "Enter a zipcode and a radius in miles, separated by a comma. Try something like '10013, 1'."
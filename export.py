@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# Author: Leslie Huang (lh1036)
+# Description: Bulk export of the numbers behind the graphs.
+# Writes the chart data (grade counts, mean scores by sidewalk cafe type, by restaurant or by cuisine,
+# scores over time) of every cuisine, zipcode or restaurant to one file, for dashboards that would
+# otherwise have to recompute them. The aggregates of all the groups are computed in a single pass
+# over the data and streamed to the file group by group (see inspectiongrades.chartdata).
+#
+# Usage: python export.py {cuisine,zipcode,restaurant} OUTPUT_FILE [directory of the partitioned history written by datacleaning.py]
+# An OUTPUT_FILE ending in .csv is written as CSV; any other name as newline-delimited JSON.
+
+import sys
+from inspectiongrades.chartdata import EXPORT_COLUMNS, iter_chart_records, write_chart_records
+
+# columns that the chart data is computed from
+EXPORT_DATA_COLUMNS = ["zipcode", "cuisine_primary", "inspectiondate", "score", "grade", "swc_type"]
+
+if __name__ == "__main__":
+
+    if len(sys.argv) < 3 or sys.argv[1] not in EXPORT_COLUMNS:
+        sys.exit("Usage: python export.py {{{}}} OUTPUT_FILE [history directory]".format(",".join(EXPORT_COLUMNS)))
+
+    kind, output_file = sys.argv[1], sys.argv[2]
+
+    if len(sys.argv) > 3:
+        # history mode: only the columns of the chart data are read
+        from inspectiongrades.storage import PartitionedData
+        restaurant_data = PartitionedData(sys.argv[3]).read(columns = EXPORT_DATA_COLUMNS)
+    else:
+        from datacleaning import clean_data
+        restaurant_data = clean_data().set_index(["restaurant"])
+
+    with open(output_file, "w", newline = "") as file:
+        count = write_chart_records(iter_chart_records(restaurant_data, kind), file, "csv" if output_file.endswith(".csv") else "ndjson")
+
+    print("Wrote {} records of {} chart data to {}".format(count, kind, output_file))
@@ -1,3 +1,7 @@
 from .cuisinevisualizer import CuisineGrades
 from .zipvisualizer import ZipGrades
-from .restaurantvisualizer import RestaurantGrades
\ No newline at end of file
+from .restaurantvisualizer import RestaurantGrades
+from .changevisualizer import ChangeGrades
+from .trendvisualizer import TrendGrades
+from .comparisonvisualizer import CuisineComparison, ZipComparison
+from .nearbyvisualizer import NearbyGrades
@@ -0,0 +1,112 @@
+# Author: Leslie Huang (lh1036)
+# Description: Precomputed box plot statistics.
+# Quartiles, whiskers and outliers of the inspection scores are computed for every (cuisine, borough)
+# and (zipcode, cuisine) group in one sorted pass over the data, so that box plots are drawn from
+# these summaries (with Axes.bxp) instead of sorting the raw scores of a subset for every graph.
+
+import pandas as pd
+import numpy as np
+
+# pairs of columns whose groups are summarized; each pair can be queried in either direction
+GROUPINGS = (("cuisine_primary", "boro"), ("zipcode", "cuisine_primary"))
+
+# whiskers reach the most extreme scores within WHIS * IQR of the quartiles (the matplotlib default)
+WHIS = 1.5
+
+class BoxStats(object):
+    '''
+    Box plot statistics of inspection scores per group, in the format of matplotlib's Axes.bxp
+    '''
+
+    def __init__(self, data, groupings = GROUPINGS, whis = WHIS):
+        '''
+        Constructor
+        @param data: restaurant_data DF
+        @param groupings: pairs of columns to summarize; pairs with a column missing from data are skipped
+        @param whis: whisker length as a multiple of the interquartile range
+        '''
+        scores = pd.to_numeric(data["score"]).to_numpy(dtype = float)
+        self.groups = {}
+
+        for first, second in groupings:
+            if first not in data.columns or second not in data.columns:
+                continue
+
+            by_first, by_second = {}, {}
+            for (first_value, second_value), stats in make_box_stats(scores, data[first], data[second], whis).items():
+                by_first.setdefault(first_value, {})[second_value] = stats
+                by_second.setdefault(second_value, {})[first_value] = stats
+
+            self.groups[(first, second)] = by_first
+            self.groups[(second, first)] = by_second
+
+    def get_stats(self, within, value, by):
+        '''
+        Returns a dict {value of by: box statistics} of the groups where within equals value
+        e.g. get_stats("cuisine_primary", "thai", "boro") for one box per borough of Thai restaurants
+        '''
+        if (within, by) not in self.groups:
+            raise KeyError("No box statistics for {} within {}".format(by, within))
+
+        return self.groups[(within, by)].get(value, {})
+
+def make_box_stats(scores, first, second, whis = WHIS):
+    '''
+    Returns a dict {(first value, second value): box statistics} with one entry per group of rows
+    The statistics are a dict with the keys of matplotlib's Axes.bxp (med, q1, q3, whislo, whishi, fliers)
+    plus mean and count. Fliers are the distinct outlying scores (scores are mostly integers, so drawing
+    repeated values would not change the graph).
+    @param scores: float array of scores; missing scores are ignored
+    @param first, second: Series of group keys aligned with scores
+    '''
+    first_codes, first_values = pd.factorize(first)
+    second_codes, second_values = pd.factorize(second)
+    valid = (first_codes >= 0) & (second_codes >= 0) & ~np.isnan(scores)
+
+    if not valid.any():
+        return {}
+
+    pair_codes = first_codes[valid].astype(np.int64) * len(second_values) + second_codes[valid]
+    group_ids, pairs = pd.factorize(pair_codes)
+    scores = scores[valid]
+
+    # the only sort: by group, then by score
+    order = np.lexsort((scores, group_ids))
+    sorted_scores, sorted_groups = scores[order], group_ids[order]
+    counts = np.bincount(group_ids, minlength = len(pairs))
+    starts = np.cumsum(counts) - counts
+    ends = starts + counts - 1
+
+    def percentile(q):
+        # linear interpolation between the closest ranks, as in np.percentile
+        position = starts + q * (counts - 1)
+        below = np.floor(position).astype(np.int64)
+        above = np.minimum(below + 1, ends)
+        return sorted_scores[below] + (sorted_scores[above] - sorted_scores[below]) * (position - below)
+
+    q1, med, q3 = percentile(0.25), percentile(0.5), percentile(0.75)
+    iqr = q3 - q1
+    lowest, highest = sorted_scores.min(), sorted_scores.max()
+
+    # search all groups at once in one sorted key: group id * span + score, where span exceeds the range of scores
+    span = highest - lowest + 1
+    keys = sorted_groups * span + (sorted_scores - lowest)
+    group_offsets = np.arange(len(pairs)) * span - lowest
+    whishi = sorted_scores[np.searchsorted(keys, group_offsets + np.minimum(q3 + whis * iqr, highest), side = "right") - 1]
+    whislo = sorted_scores[np.searchsorted(keys, group_offsets + np.maximum(q1 - whis * iqr, lowest), side = "left")]
+    whishi, whislo = np.maximum(whishi, q3), np.minimum(whislo, q1)
+
+    # distinct outliers of each group (consecutive in the sorted order)
+    outliers = np.flatnonzero((sorted_scores < whislo[sorted_groups]) | (sorted_scores > whishi[sorted_groups]))
+    outliers = outliers[np.r_[True, keys[outliers][1:] != keys[outliers][:-1]]] if len(outliers) else outliers
+    fliers = np.split(sorted_scores[outliers], np.searchsorted(sorted_groups[outliers], np.arange(1, len(pairs))))
+
+    means = np.add.reduceat(sorted_scores, starts) / counts
+
+    return {
+        (first_values[pair // len(second_values)], second_values[pair % len(second_values)]): {
+            "med": med[i], "q1": q1[i], "q3": q3[i], "whislo": whislo[i], "whishi": whishi[i],
+            "fliers": fliers[i], "mean": means[i], "count": counts[i]
+        }
+        for i, pair in enumerate(pairs)
+    }
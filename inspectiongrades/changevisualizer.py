@@ -0,0 +1,153 @@
+# Author: Leslie Huang (lh1036)
+# Attributes and methods for the change visualizer: "change since last snapshot" graphs
+# for a cuisine category, a zipcode, or the whole city
+
+import pandas as pd
+import numpy as np
+from string import capwords
+from .visualizer import Visualizer
+from .precomputed import get_derived
+from .ranking import RestaurantRanking
+
+class ChangeGrades(Visualizer):
+    __slots__ = ("column", "value", "previous_data", "label")
+
+    def __init__(self, column, value, data, previous_data, label = "since last snapshot", renderer = None):
+        '''
+        Constructor
+        @param column, value: the group to compare, e.g. ("cuisine_primary", "thai") or ("zipcode", "10011");
+        (None, None) for the whole city
+        @param data, previous_data: the current and previous snapshots of restaurant_data
+        @param label: describes the comparison in titles, e.g. "since 2016-10-27"
+        '''
+        super(ChangeGrades, self).__init__(data, renderer)
+        self.column = column
+        self.value = value
+        self.previous_data = previous_data
+        self.label = label
+
+    @classmethod
+    def from_store(cls, column, value, store, name = None, renderer = None):
+        '''
+        Returns a ChangeGrades comparing snapshot name (default: the latest) of a snapshots.SnapshotStore with the snapshot before it
+        Raises ValueError if there is no earlier snapshot
+        '''
+        name = name or store.names()[-1]
+        previous = store.previous(name)
+
+        if previous is None:
+            raise ValueError("Snapshot {} has no earlier snapshot to compare with".format(name))
+
+        return cls(column, value, store.load(name), store.load(previous), "since {}".format(previous), renderer)
+
+    ### Class methods for subsetting and returning the data
+
+    def filter_data(self, data):
+        '''
+        Returns a DF subset of the data for the group in question
+        '''
+        if self.column is None:
+            return data
+
+        return data[data[self.column] == self.value]
+
+    def ranking_group(self):
+        '''
+        Restaurants are ranked within the group in question (a cuisine or zipcode, or the whole city)
+        '''
+        if self.column is None:
+            return None
+
+        return (self.column, self.value)
+
+    def get_name(self):
+        '''
+        Returns the formatted name of the group, used in titles and file names
+        '''
+        if self.column is None:
+            return "NYC"
+
+        return capwords(self.value)
+
+    def get_restaurant_changes(self, minimum_obs):
+        '''
+        Returns a Series (index: restaurant) of the change in mean score of restaurants that are in both snapshots
+        @param minimum_obs: restrict to restaurants with at least this many inspections in both snapshots (outliers)
+        '''
+        column, value = self.ranking_group() or (None, None)
+        means = []
+
+        for data in [self.data, self.previous_data]:
+            stats = get_derived(data, "ranking", RestaurantRanking).get_stats(column, value)
+            selected = stats["counts"] >= minimum_obs
+            means.append(pd.Series(stats["means"][selected], index = stats["names"][selected]))
+
+        current, previous = means
+        return (current - previous).dropna()
+
+    ### Class methods for visualizing the data
+
+    def graph_mean_score_by_boro(self):
+        '''
+        Bar graph of the mean score per borough in the previous and current snapshot
+        '''
+        means = pd.DataFrame({
+            label: self.filter_data(data).groupby("boro", observed = True)["score"].mean()
+            for label, data in [("Previous", self.previous_data), ("Current", self.data)]
+        })
+        means.index = self.get_display_labels("boro", means.index)
+
+        fig, ax = self.renderer.new_axes()
+        means.plot(kind = "bar", ax = ax, rot = 90)
+        ax.set_ylabel("Mean Inspection Violations Score")
+        ax.set_xlabel("Borough")
+        ax.set_title("Mean Inspection Violations by Borough {} ({})".format(self.label, self.get_name()))
+        fig.subplots_adjust(bottom = 0.3)
+
+        return self.renderer.save(fig, "{}_score_change_by_borough.pdf".format(self.get_name()))
+
+    def graph_grade_mix(self):
+        '''
+        Bar graph of the share of A, B and C grades in the previous and current snapshot
+        '''
+        shares = pd.DataFrame({
+            label: self.filter_data(data)["grade"].astype(object).value_counts(normalize = True).reindex(["a", "b", "c"], fill_value = 0)
+            for label, data in [("Previous", self.previous_data), ("Current", self.data)]
+        })
+        shares.index = self.get_display_labels("grade", shares.index)
+
+        fig, ax = self.renderer.new_axes()
+        shares.plot(kind = "bar", ax = ax, rot = 0)
+        ax.set_ylabel("Share of Grades Awarded")
+        ax.set_xlabel("Grade")
+        ax.set_title("Grades Awarded {} ({})".format(self.label, self.get_name()))
+
+        return self.renderer.save(fig, "{}_grade_mix_change.pdf".format(self.get_name()))
+
+    def graph_restaurant_changes(self, k = 10):
+        '''
+        Horizontal bar graphs of the k restaurants whose mean inspection violations score improved (dropped)
+        and worsened (rose) the most. Restricted to restaurants with at least 3 inspections in both snapshots
+        '''
+        min_inspections = 3
+
+        changes = self.get_restaurant_changes(min_inspections).sort_values()
+        improved, worsened = changes[changes < 0].iloc[:k], changes[changes > 0].iloc[::-1].iloc[:k]
+
+        pairs = [(top.rename(capwords), color, "Top {} {}".format(len(top), label)) for top, color, label in [(improved, "g", "Improved"), (worsened, "r", "Worsened")]]
+
+        return self.graph_paired_barh(pairs, "Change in Mean Inspection Violations Score",
+            "Largest Changes {} ({})".format(self.label, self.get_name()),
+            "Only restaurants that have received at least {} inspections in both snapshots are considered.".format(min_inspections),
+            "{}_restaurant_changes.pdf".format(self.get_name()))
+
+    def make_graphs(self):
+        '''
+        Calls all graphing methods for this class
+        Returns a list of the saved file names
+        '''
+        return [
+            self.graph_mean_score_by_boro(),
+            self.graph_grade_mix(),
+            self.graph_restaurant_changes()
+        ]
@@ -0,0 +1,169 @@
+# Author: Leslie Huang (lh1036)
+# Description: The numbers behind the graphs, as plain records.
+# Each visualizer returns its chart data (get_chart_data) as a dict {chart name: list of records
+# {"label": ..., "value": ...}}. iter_chart_records yields the same records for every cuisine,
+# zipcode or restaurant at once: the counts and score sums of every (group, grade, cafe type, ...)
+# cell are computed in one groupby over the data, each chart is summed from those cells and sorted
+# by group, and the records are then yielded group by group. write_chart_records streams them to a
+# newline-delimited JSON or CSV file, so the export is never held in memory as a whole.
+
+import csv
+import json
+import pandas as pd
+import numpy as np
+from .labels import make_display_labels, get_display_labels
+
+# display labels of the boroughs and grades shown in the graphs; other values (e.g. "Missing") are left out
+VALID_BOROS = ["Manhattan", "Queens", "Bronx", "Brooklyn", "Staten Island"]
+VALID_GRADES = ["A", "B", "C", "Not Yet Graded", "Grade Pending"]
+
+# column that identifies the groups of each kind of export (restaurants are identified by the index)
+EXPORT_COLUMNS = {"cuisine": "cuisine_primary", "zipcode": "zipcode", "restaurant": None}
+
+RECORD_FIELDS = ["group", "chart", "label", "value"]
+
+# groups whose records are converted to Python objects at a time while they are streamed
+CHUNK_GROUPS = 1000
+
+def make_records(values):
+    '''
+    Returns a list of chart records {"label": ..., "value": ...}, one per item of the Series values (index: labels)
+    Values are plain Python objects: numbers, strings, dates as "YYYY-MM-DD", and None for missing values
+    '''
+    return [{"label": label, "value": value} for label, value in zip(to_plain(values.index), to_plain(values))]
+
+def to_plain(values):
+    '''
+    Returns a list of the values (an array, Series or Index) as plain Python objects (see make_records)
+    '''
+    values = pd.Series(values)
+
+    if pd.api.types.is_datetime64_any_dtype(values):
+        values = values.dt.strftime("%Y-%m-%d")
+
+    return values.astype(object).where(values.notna(), None).tolist()
+
+def factorize_sorted(values):
+    '''
+    Returns a tuple (array of codes, Index of sorted distinct values) of a Series or Index; missing values have the code -1
+    The codes of a categorical are its category codes
+    '''
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return np.asarray(pd.Categorical(values).codes, dtype = np.intp), values.dtype.categories
+
+    codes, uniques = pd.factorize(values, sort = True)
+    return codes, pd.Index(uniques)
+
+def iter_chart_records(data, kind, chunk_groups = CHUNK_GROUPS):
+    '''
+    Yields a record {"group", "chart", "label", "value"} for every chart record of every group of kind
+    ("cuisine", "zipcode" or "restaurant"), in the order of the groups, then of the charts and records of
+    get_chart_data of the group's visualizer
+    @param data: the full restaurant_data DF
+    @param chunk_groups: number of groups whose records are converted to Python objects at a time
+    '''
+    groups, charts = make_chart_tables(data, kind)
+
+    # the rows of each group in each chart (the tables are sorted by group)
+    bounds = [np.searchsorted(codes, np.arange(len(groups) + 1)) for name, codes, labels, values in charts]
+
+    for first in range(0, len(groups), chunk_groups):
+        last = min(first + chunk_groups, len(groups))
+        chunks = [
+            (name, chart_bounds[first:last + 1] - chart_bounds[first],
+             to_plain(labels[chart_bounds[first]:chart_bounds[last]]), to_plain(values[chart_bounds[first]:chart_bounds[last]]))
+            for (name, codes, labels, values), chart_bounds in zip(charts, bounds)
+        ]
+
+        for position, group in enumerate(to_plain(groups[first:last])):
+            for name, chunk_bounds, labels, values in chunks:
+                start, end = chunk_bounds[position], chunk_bounds[position + 1]
+
+                for label, value in zip(labels[start:end], values[start:end]):
+                    yield {"group": group, "chart": name, "label": label, "value": value}
+
+def make_chart_tables(data, kind):
+    '''
+    Returns a tuple (Index of groups, list of charts) where each chart is a tuple (name, array of group codes,
+    Index of labels, array of values) of the records of every group, sorted by group code
+    '''
+    column = EXPORT_COLUMNS[kind]
+    group_codes, groups = factorize_sorted(data.index if column is None else data[column])
+    display_labels = make_display_labels(data)
+    scores = data["score"].to_numpy(dtype = float)
+
+    # one row per (group, grade, ...) cell with its number of rows and the count and sum of its scores
+    second = {"cuisine": "restaurant", "zipcode": "cuisine_primary", "restaurant": None}[kind]
+    dimensions, values_of = {"group": group_codes}, {}
+    dimensions["grade"], values_of["grade"] = factorize_sorted(data["grade"])
+
+    if kind != "restaurant":
+        dimensions["swc_type"], values_of["swc_type"] = factorize_sorted(data["swc_type"])
+        dimensions[second], values_of[second] = factorize_sorted(data.index if second == "restaurant" else data[second])
+
+    cells = pd.DataFrame(dimensions).assign(rows = 1, score_count = ~np.isnan(scores), score_sum = np.nan_to_num(scores))
+    cells = cells.groupby(list(dimensions)).sum().reset_index()
+
+    def chart(name, by, statistic, sort = None):
+        # sums the cells of each (group, by); drops missing values of by (code -1), like the visualizers' groupbys
+        sums = cells[cells[by] >= 0].groupby(["group", by])[["rows", "score_count", "score_sum"]].sum().reset_index()
+
+        if statistic == "rows":
+            values = sums["rows"].to_numpy(dtype = np.int64)
+        else:
+            with np.errstate(invalid = "ignore", divide = "ignore"):
+                values = sums["score_sum"].values / sums["score_count"].values
+
+        labels = pd.Index(values_of[by][sums[by].values])
+        if by in ("grade", "cuisine_primary"):
+            labels = get_display_labels(labels, display_labels.get(by))
+
+        # order within each group: by descending count or ascending mean (if sort is given), then by value of by
+        sort_values = {"descending": -values, "ascending": values}.get(sort, np.zeros(len(sums)))
+        order = np.lexsort((sums[by].values, sort_values, sums["group"].values))
+
+        if by == "grade":
+            order = order[labels[order].isin(VALID_GRADES)]
+
+        return (name, sums["group"].values[order], labels[order], values[order])
+
+    charts = [chart("lettergrades", "grade", "rows", "descending")]
+
+    if kind == "cuisine":
+        charts.append(chart("scores_by_cafe_type", "swc_type", "mean", None))
+        charts.append(chart("mean_score_by_restaurant", "restaurant", "mean", "ascending"))
+    elif kind == "zipcode":
+        charts.append(chart("scores_by_cafe_type", "swc_type", "mean", None))
+        charts.append(chart("mean_score_by_cuisine", "cuisine_primary", "mean", "ascending"))
+    else:
+        # every inspection of the restaurant, by date
+        dates = data["inspectiondate"].values
+        order = np.lexsort((dates, group_codes))
+        order = order[group_codes[order] >= 0]
+        # the scores keep the dtype of the data (ints after cleaning), like the records of get_chart_data
+        charts.append(("timeseries", group_codes[order], pd.Index(dates[order]), data["score"].to_numpy()[order]))
+
+    return groups, charts
+
+def write_chart_records(records, file, output_format = "ndjson"):
+    '''
+    Writes records (an iterable of dicts with the keys RECORD_FIELDS) to the open text file one at a time,
+    as newline-delimited JSON ("ndjson") or CSV with a header ("csv")
+    Returns the number of records written
+    '''
+    if output_format not in ("ndjson", "csv"):
+        raise ValueError("output_format must be 'ndjson' or 'csv'")
+
+    if output_format == "csv":
+        writer = csv.DictWriter(file, fieldnames = RECORD_FIELDS)
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        write = lambda record: file.write(json.dumps(record) + "\n")
+
+    count = 0
+    for record in records:
+        write(record)
+        count += 1
+
+    return count
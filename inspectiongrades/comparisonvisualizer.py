@@ -0,0 +1,248 @@
+# Author: Leslie Huang (lh1036)
+# Attributes and methods for the comparison visualizers: side-by-side graphs of several cuisine
+# categories or zipcodes (e.g. pizza vs chinese vs thai) in one query.
+#
+# The rows of all the compared groups are selected with one isin filter, and one groupby over
+# (group, borough, cuisine, sidewalk cafe type, grade, month) computes the counts and score sums
+# that every graph is drawn from, so comparing k groups costs about as much as one query, not k.
+
+import pandas as pd
+import numpy as np
+from .visualizer import Visualizer
+from .boxstats import make_box_stats
+from .chartdata import VALID_BOROS, VALID_GRADES
+
+# dimensions of the summary, besides the compared column
+SUMMARY_DIMENSIONS = ["boro", "cuisine_primary", "swc_type", "grade", "month"]
+
+class ComparisonGrades(Visualizer):
+    '''
+    Superclass of the cuisine and zipcode comparisons; child classes set column
+    '''
+    __slots__ = ("keys", "group_data", "summary")
+
+    # the column whose values are compared
+    column = None
+
+    def __init__(self, keys, data, renderer = None):
+        '''
+        Constructor
+        @param keys: list of the values of column to compare, e.g. ["pizza", "chinese", "thai"]
+        '''
+        super(ComparisonGrades, self).__init__(data, renderer)
+        self.keys = list(keys)
+        self.group_data = None
+        self.summary = None
+
+    ### Class methods for subsetting and returning the data
+
+    def filter_data(self, data):
+        '''
+        Returns a DF subset of the data for all the compared groups
+        '''
+        return data[data[self.column].isin(self.keys)]
+
+    def storage_filter(self):
+        '''
+        A query on partitioned storage reads the rows of all the compared groups at once
+        '''
+        return (self.column, self.keys)
+
+    def get_group_data(self):
+        '''
+        Returns the rows of the compared groups, selected once per query
+        Only the columns that the graphs use are copied
+        '''
+        if self.group_data is None:
+            selected = self.data[self.column].isin(self.keys).values
+            columns = [col for col in [self.column, "score", "inspectiondate"] + SUMMARY_DIMENSIONS if col in self.data.columns]
+            self.group_data = pd.DataFrame({col: self.data[col].values[selected] for col in dict.fromkeys(columns)}, index = self.data.index[selected])
+
+        return self.group_data
+
+    def get_summary(self):
+        '''
+        Returns a DF with one row per (group, boro, cuisine_primary, swc_type, grade, month) of the compared groups
+        and the columns rows, score_count, score_sum, computed in a single groupby
+        Dimensions that the data does not have (e.g. swc_type in a history without the sidewalk data) are left out
+        '''
+        if self.summary is None:
+            data = self.get_group_data()
+            scores = data["score"].values
+
+            frame = pd.DataFrame({
+                "rows": np.ones(len(data), dtype = np.int64),
+                "score_count": ~np.isnan(scores),
+                "score_sum": np.nan_to_num(scores),
+            })
+            frame["group"] = data[self.column].values
+            for col in SUMMARY_DIMENSIONS:
+                if col == "month":
+                    frame[col] = data["inspectiondate"].values.astype("datetime64[M]")
+                elif col in data.columns and col != self.column:
+                    frame[col] = data[col].values
+
+            # categorical dimensions are grouped by their codes (missing values: -1), then decoded
+            categories = {}
+            for col in frame.columns:
+                if isinstance(frame[col].dtype, pd.CategoricalDtype):
+                    categories[col] = frame[col].cat.categories
+                    frame[col] = frame[col].cat.codes
+
+            dimensions = [col for col in ["group"] + SUMMARY_DIMENSIONS if col in frame.columns]
+            summary = frame.groupby(dimensions, dropna = False).sum().reset_index()
+            for col, values in categories.items():
+                summary[col] = pd.Categorical.from_codes(summary[col], values)
+            self.summary = summary
+
+        return self.summary
+
+    def get_key_labels(self):
+        '''
+        Returns a list of the display labels of the compared groups, in the order of keys
+        '''
+        return list(self.get_display_labels(self.column, self.keys))
+
+    def get_name(self):
+        '''
+        Returns the name of the comparison, used in titles and file names, e.g. "Pizza vs Chinese vs Thai"
+        '''
+        return " vs ".join(self.get_key_labels())
+
+    def get_file_name(self, graph_name):
+        '''
+        Returns the file name of a graph of this comparison
+        '''
+        return "{}_{}.pdf".format("_vs_".join(label.replace(" ", "_") for label in self.get_key_labels()), graph_name)
+
+    def aggregate(self, by, statistic = "mean"):
+        '''
+        Returns a DF (index: values of by; columns: display labels of the compared groups) of the mean score
+        ("mean") or the number of rows ("rows") per group and value of by, from the summary
+        '''
+        sums = self.get_summary().groupby(["group", by], observed = True)[["rows", "score_count", "score_sum"]].sum()
+
+        if statistic == "mean":
+            values = sums["score_sum"] / sums["score_count"].replace(0, np.nan)
+        else:
+            values = sums[statistic]
+
+        table = values.unstack("group").reindex(columns = self.keys).sort_index()
+        table.columns = self.get_key_labels()
+        return table
+
+    ### Class methods for visualizing the data
+
+    def graph_mean_score_by(self, by, valid_values = None, max_values = None):
+        '''
+        Grouped bar graph of the mean score of each compared group per value of by (e.g. per borough)
+        @param valid_values: display labels of the values of by to show (others are dropped)
+        @param max_values: show only the max_values values of by with the most rows
+        '''
+        names = {"boro": "Borough", "cuisine_primary": "Cuisine", "swc_type": "Type of Sidewalk Cafe (if any)"}
+        means = self.aggregate(by)
+
+        if max_values is not None:
+            largest = self.aggregate(by, "rows").sum(axis = 1).nlargest(max_values).index
+            means = means.loc[means.index.isin(largest)]
+
+        means.index = self.get_display_labels(by, means.index)
+        if valid_values is not None:
+            means = means[means.index.isin(valid_values)]
+
+        fig, ax = self.renderer.new_axes(figsize = (10, 6))
+        means.plot(kind = "bar", ax = ax, rot = 90)
+        ax.set_xlabel(names[by])
+        ax.set_ylabel("Mean Inspection Violations Score")
+        ax.set_title("Mean Inspection Violations by {}: {}".format(names[by], self.get_name()))
+        fig.subplots_adjust(bottom = 0.35)
+
+        return self.renderer.save(fig, self.get_file_name("violations_by_{}".format(by)))
+
+    def graph_lettergrade_frequency(self):
+        '''
+        Grouped bar graph of the share of each letter grade awarded in each compared group
+        '''
+        counts = self.aggregate("grade", "rows")
+        counts.index = self.get_display_labels("grade", counts.index)
+        counts = counts[counts.index.isin(VALID_GRADES)].fillna(0)
+
+        fig, ax = self.renderer.new_axes()
+        (counts / counts.sum()).plot(kind = "bar", ax = ax, rot = 0)
+        ax.set_xlabel("Grade")
+        ax.set_ylabel("Share of Grades Awarded")
+        ax.set_title("Distribution of Letter Grades: {}".format(self.get_name()))
+        fig.subplots_adjust(bottom = 0.2)
+
+        return self.renderer.save(fig, self.get_file_name("lettergrades"))
+
+    def boxplot_scores(self):
+        '''
+        Boxplot of the scores of each compared group, side by side
+        '''
+        data = self.get_group_data()
+        stats = make_box_stats(data["score"].values.astype(float), data[self.column], pd.Series("all", index = data.index))
+        keys = [key for key in self.keys if (key, "all") in stats]
+
+        fig, ax = self.renderer.new_axes()
+        self.renderer.draw_boxes(ax, [stats[(key, "all")] for key in keys], self.get_display_labels(self.column, keys), rot = 0)
+        ax.set_ylabel("Inspection Violations")
+        ax.set_title("Spread of Violations: {}".format(self.get_name()))
+
+        return self.renderer.save(fig, self.get_file_name("violations_spread"))
+
+    def timeseries_monthly(self):
+        '''
+        Overlaid timeseries of the monthly mean inspection score of each compared group
+        '''
+        means = self.aggregate("month")
+
+        fig, ax = self.renderer.new_axes(figsize = (10, 6))
+        means.plot(ax = ax)
+        ax.set_xlabel("Month")
+        ax.set_ylabel("Mean Inspection Violations Score")
+        ax.set_title("Monthly Inspection Violations: {}".format(self.get_name()))
+        ax.legend(loc = "upper right")
+
+        return self.renderer.save(fig, self.get_file_name("timeseries"))
+
+class CuisineComparison(ComparisonGrades):
+    '''
+    Side-by-side graphs of several cuisine categories
+    '''
+    __slots__ = ()
+    column = "cuisine_primary"
+
+    def make_graphs(self):
+        '''
+        Calls all graphing methods for this class
+        Returns a list of the saved file names
+        '''
+        return [
+            self.graph_lettergrade_frequency(),
+            self.graph_mean_score_by("boro", VALID_BOROS),
+            self.graph_mean_score_by("swc_type"),
+            self.boxplot_scores(),
+            self.timeseries_monthly()
+        ]
+
+class ZipComparison(ComparisonGrades):
+    '''
+    Side-by-side graphs of several zipcodes
+    '''
+    __slots__ = ()
+    column = "zipcode"
+
+    def make_graphs(self, max_cuisines = 10):
+        '''
+        Calls all graphing methods for this class
+        Returns a list of the saved file names
+        @param max_cuisines: number of cuisine categories (those with the most inspections) in the cuisine graph
+        '''
+        return [
+            self.graph_lettergrade_frequency(),
+            self.graph_mean_score_by("cuisine_primary", max_values = max_cuisines),
+            self.graph_mean_score_by("swc_type"),
+            self.boxplot_scores(),
+            self.timeseries_monthly()
+        ]
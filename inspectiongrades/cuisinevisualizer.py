@@ -3,19 +3,21 @@
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from .visualizer import Visualizer
+from .chartdata import make_records, VALID_BOROS
+from .timeseries import prepare_timeseries, MAX_POINTS
 from string import capwords
 
-plt.style.use("ggplot")
 pd.options.mode.chained_assignment = None
 
 class CuisineGrades(Visualizer):
-    def __init__(self, cuisine_name, data):
+    __slots__ = ("cuisine_name",)
+    
+    def __init__(self, cuisine_name, data, renderer = None):
         '''
         Constructor
         '''
-        super(CuisineGrades, self).__init__(data)
+        super(CuisineGrades, self).__init__(data, renderer)
         self.cuisine_name = cuisine_name
 
     ### Class methods for subsetting and returning the data
@@ -25,6 +27,35 @@ class CuisineGrades(Visualizer):
         Returns a DF subset of the data for the cuisine in question
         '''
         return data[data["cuisine_primary"] == self.cuisine_name]
+    
+    def ranking_group(self):
+        '''
+        Restaurants are ranked within the cuisine category in question
+        '''
+        return ("cuisine_primary", self.cuisine_name)
+    
+    def get_name(self):
+        '''
+        Returns the formatted name of the cuisine category, used in titles and file names
+        '''
+        return capwords(self.cuisine_name)
+    
+    def describe_restaurants(self):
+        '''
+        Returns the restaurants of the cuisine category as worded in titles, e.g. "Thai Restaurants"
+        '''
+        return "{} Restaurants".format(self.get_name())
+
+    def get_chart_data(self):
+        '''
+        Returns the numbers behind the graphs of the letter grades, the scores by sidewalk cafe type and
+        the distribution of mean scores per restaurant, as a dict {chart name: list of records}
+        '''
+        return {
+            "lettergrades": make_records(self.grade_counts()),
+            "scores_by_cafe_type": make_records(self.group_by_sidewalk()["score"].sort_index()),
+            "mean_score_by_restaurant": make_records(self.calculate_mean_by_restaurant()["score"])
+        }
 
     ### Class methods for visualizing the data
     
@@ -32,31 +63,48 @@ class CuisineGrades(Visualizer):
         '''
         Generates pie graph of letter grades awarded in cuisine category
         '''
-        data = self.filter_data_valid_values("grade", ["A", "B", "C", "Not Yet Graded", "Grade Pending"])
+        fig, ax = self.renderer.new_axes()
+        self.grade_counts().plot(kind = "pie", ax = ax, title = "Distribution of Letter Grades for {} Restaurants".format(capwords(self.cuisine_name)), rot = 0)
+        ax.set_xlabel("Grade")
+        ax.set_ylabel("Number of Times Awarded")
         
-        data.grade.value_counts().plot(kind = "pie", title = "Distribution of Letter Grades for {} Restaurants".format(capwords(self.cuisine_name)), rot = 0)
-        plt.xlabel("Grade")
-        plt.ylabel("Number of Times Awarded")
-        
-        plt.savefig("{}_restaurants_lettergrades.pdf".format(capwords(self.cuisine_name)))
-        plt.close()   
+        return self.renderer.save(fig, "{}_restaurants_lettergrades.pdf".format(capwords(self.cuisine_name)))
             
     def boxplot_by_boro(self):
         '''
         Show boxplot of restaurant violations in this category, grouped by borough
+        Drawn from the precomputed box statistics of each (cuisine, borough)
         '''
-        data = self.filter_data_valid_values("boro", ["Manhattan", "Queens", "Bronx", "Brooklyn", "Staten Island"])
+        stats = self.get_box_stats("cuisine_primary", self.cuisine_name, "boro")
+        boros = sorted(stats)
+        labels = self.get_display_labels("boro", boros)
+        valid = [i for i, label in enumerate(labels) if label in VALID_BOROS]
+        
+        fig, ax = self.renderer.new_axes()
+        self.renderer.draw_boxes(ax, [stats[boros[i]] for i in valid], [labels[i] for i in valid])
+        ax.set_xlabel("Boroughs")
+        ax.set_ylabel("Inspection Violations")
+        fig.subplots_adjust(bottom = 0.3)
+        ax.set_title("Spread of Violations by Borough for {} Restaurants".format(capwords(self.cuisine_name)))
         
-        data.boxplot(by = "boro", column = "score", return_type = "dict", rot = 90)
-        plt.xlabel("Boroughs")
-        plt.ylabel("Inspection Violations")
-        plt.subplots_adjust(bottom = 0.3)
+        return self.renderer.save(fig, "{}_restaurant_violations_by_borough.pdf".format(capwords(self.cuisine_name)))
     
-        # add title and get rid of automatically added title
-        plt.title("Spread of Violations by Borough for {} Restaurants".format(capwords(self.cuisine_name)))
-        plt.suptitle("")
-        plt.savefig("{}_restaurant_violations_by_borough.pdf".format(capwords(self.cuisine_name)))
-        plt.close()    
+    def boxplot_by_zipcode(self, max_zipcodes = 20):
+        '''
+        Show boxplot of restaurant violations in this category, grouped by zipcode
+        Only the max_zipcodes zipcodes with the most inspections are shown
+        Drawn from the precomputed box statistics of each (zipcode, cuisine)
+        '''
+        zipcodes, stats = self.get_largest_boxes("cuisine_primary", self.cuisine_name, "zipcode", max_zipcodes)
+        
+        fig, ax = self.renderer.new_axes(figsize = (10, 6))
+        self.renderer.draw_boxes(ax, stats, zipcodes)
+        ax.set_xlabel("Zipcodes (the {} with the most inspections)".format(len(zipcodes)))
+        ax.set_ylabel("Inspection Violations")
+        fig.subplots_adjust(bottom = 0.2)
+        ax.set_title("Spread of Violations by Zipcode for {} Restaurants".format(capwords(self.cuisine_name)))
+        
+        return self.renderer.save(fig, "{}_restaurant_violations_by_zipcode.pdf".format(capwords(self.cuisine_name)))
         
     def bargraphs_by_sidewalk_type(self):
         '''
@@ -64,62 +112,98 @@ class CuisineGrades(Visualizer):
         '''
         grouped = self.group_by_sidewalk()
                 
-        grouped.score.plot(kind = "bar", rot = 90)
-        plt.subplots_adjust(bottom = 0.5)
-        plt.title("Inspection Violations by Cafe Type for {} Restaurants".format(capwords(self.cuisine_name)))
-        plt.ylabel("Average Inspection Violation Scores")
-        plt.xlabel("Type of Sidewalk Cafe (if any)")
-        plt.savefig("{}_restaurant_violations_by_cafe_type.pdf".format(capwords(self.cuisine_name)))
-        plt.close()    
+        fig, ax = self.renderer.new_axes()
+        grouped.score.plot(kind = "bar", ax = ax, rot = 90, yerr = grouped.get("error"))
+        fig.subplots_adjust(bottom = 0.5)
+        ax.set_title("Inspection Violations by Cafe Type for {} Restaurants".format(capwords(self.cuisine_name)))
+        ax.set_ylabel("Average Inspection Violation Scores")
+        ax.set_xlabel("Type of Sidewalk Cafe (if any)")
+        return self.renderer.save(fig, "{}_restaurant_violations_by_cafe_type.pdf".format(capwords(self.cuisine_name)))
             
     def violations_per_restaurant(self):
         '''
         Distribution of mean violations per restaurant
+        One bar per restaurant, or a histogram if there are more restaurants than the renderer's max_bars
         '''
         data = self.calculate_mean_by_restaurant()
-        data.plot(kind = "bar", legend = False)
-        plt.title("Distribution of Mean Inspection Violations for {} Restaurants".format(capwords(self.cuisine_name)))
-        plt.xticks([])
-        plt.ylabel("Mean Inspection Violations Score")
-        plt.xlabel("{} Restaurants".format(capwords(self.cuisine_name)))
+        fig, ax = self.renderer.new_axes()
+        ax.set_title("Distribution of Mean Inspection Violations for {} Restaurants".format(capwords(self.cuisine_name)))
         
-        plt.savefig("{}_restaurant_distribution.pdf".format(capwords(self.cuisine_name)))
-        plt.close() 
+        if self.renderer.too_many_bars(len(data)):
+            data["score"].plot(kind = "hist", ax = ax, bins = 50)
+            ax.set_xlabel("Mean Inspection Violations Score")
+            ax.set_ylabel("Number of {} Restaurants".format(capwords(self.cuisine_name)))
+        else:
+            self.renderer.draw_bars(ax, data["score"].values)
+            ax.set_ylabel("Mean Inspection Violations Score")
+            ax.set_xlabel("{} Restaurants".format(capwords(self.cuisine_name)))
+        
+        return self.renderer.save(fig, "{}_restaurant_distribution.pdf".format(capwords(self.cuisine_name)))
     
-    def timeseries_best_and_worst(self):
+    def timeseries_best_and_worst(self, freq = None, window = None, max_points = MAX_POINTS):
         '''
         Timeseries of inspection scores for the best and worst restaurants in this zip
         Restricted to restaurants with at least 10 inspections (to exclude outliers)
         Remember, lower is better! Higher score = more violations = dirty restaurant
+        @param freq, window: optionally resample to monthly ("M") or quarterly ("Q") rolling means
+        @param max_points: cap on the number of plotted points per line (see timeseries.prepare_timeseries)
         '''
         min_inspections = 10
         
         best_data, worst_data, = self.get_best_and_worst_data(min_inspections)
         best_name, worst_name = self.get_best_and_worst_names(min_inspections)
-        x_best, y_best = best_data["inspectiondate"], best_data["score"]
-        x_worst, y_worst = worst_data["inspectiondate"], worst_data["score"]
+        best_series = prepare_timeseries(best_data, freq, window, max_points)
+        worst_series = prepare_timeseries(worst_data, freq, window, max_points)
+        x_best, y_best = best_series.index, best_series.values
+        x_worst, y_worst = worst_series.index, worst_series.values
 
-        plt.plot_date(x = x_best, y = y_best, fmt = "r-", label = "{}".format(capwords(best_name)))
-        plt.plot_date(x = x_worst, y = y_worst, fmt = "b-", label = "{}".format(capwords(worst_name)))
-        plt.xticks(rotation = "vertical")
+        fig, ax = self.renderer.new_axes()
+        ax.plot_date(x = x_best, y = y_best, fmt = "r-", label = "{}".format(capwords(best_name)))
+        ax.plot_date(x = x_worst, y = y_worst, fmt = "b-", label = "{}".format(capwords(worst_name)))
+        ax.tick_params(axis = "x", labelrotation = 90)
         
-        plt.legend(loc = "upper right")
-        plt.ylabel("Inspection Violations Score")
-        plt.title("Time Series of Inspection Violations for the Best ({}) \n and Worst ({}) {} Restaurants".format(capwords(best_name), capwords(worst_name), capwords(self.cuisine_name)))
+        ax.legend(loc = "upper right")
+        ax.set_ylabel("Inspection Violations Score")
+        ax.set_title("Time Series of Inspection Violations for the Best ({}) \n and Worst ({}) {} Restaurants".format(capwords(best_name), capwords(worst_name), capwords(self.cuisine_name)))
         
-        plt.annotate("Best and worst restaurants have the lowest and highest mean inspection violations, respectively. \nTo exclude outliers, only restaurants that have received at least {} inspections are considered.".format(min_inspections), (0,0), (0, -100), xycoords = "axes fraction", textcoords = "offset points", va = "top")
-        plt.subplots_adjust(bottom = 0.5)
+        ax.annotate("Best and worst restaurants have the lowest and highest mean inspection violations, respectively. \nTo exclude outliers, only restaurants that have received at least {} inspections are considered.".format(min_inspections), (0,0), (0, -100), xycoords = "axes fraction", textcoords = "offset points", va = "top")
+        fig.subplots_adjust(bottom = 0.5)
         
-        plt.savefig("{}_best_worst_restaurants_timeseries.pdf".format(capwords(self.cuisine_name)))
-        plt.close()   
+        return self.renderer.save(fig, "{}_best_worst_restaurants_timeseries.pdf".format(capwords(self.cuisine_name)))
             
     def make_graphs(self):
         '''
         Calls all graphing methods for this class
+        Returns a list of the saved file names
+        '''
+        filenames = [
+            self.graph_lettergrade_frequency(),
+            self.boxplot_by_boro(),
+            self.boxplot_by_zipcode(),
+            self.bargraphs_by_sidewalk_type(),
+            self.violations_per_restaurant(),
+            self.timeseries_best_and_worst(),
+            self.graph_top_restaurants(),
+            self.graph_improved_and_declined()
+        ]
+        
+        # the violation codes are not kept in partitioned storage
+        if self.has_violation_codes():
+            filenames.append(self.graph_top_violations())
+        
+        return filenames
+    
+    def make_preview(self):
+        '''
+        Calls the graphing methods that can be drawn from the stratified sample, with an "approximate" annotation
+        They save the same file names as make_graphs, whose exact graphs replace them
+        Returns a list of the saved file names
         '''
-        self.graph_lettergrade_frequency()
-        self.boxplot_by_boro()
-        self.bargraphs_by_sidewalk_type()
-        self.violations_per_restaurant()
-        self.timeseries_best_and_worst()
-        
\ No newline at end of file
+        preview = self.get_preview()
+        
+        with self.renderer.annotate(preview.sample.describe()):
+            return [
+                preview.graph_lettergrade_frequency(),
+                preview.boxplot_by_boro(),
+                preview.bargraphs_by_sidewalk_type()
+            ]
@@ -0,0 +1,27 @@
+# Author: Leslie Huang (lh1036)
+# Description: Display labels for the categorical columns of restaurant_data.
+# The dataset is all lowercase (for case-insensitive matching to user input), so graphs capitalize
+# the values they show. For categorical columns the labels are computed once per category, instead
+# of calling capwords on every row of every graph's subset.
+
+from string import capwords
+import pandas as pd
+
+def make_display_labels(data):
+    '''
+    Returns a dict {column name: Series of display labels indexed by category} for the categorical columns of data
+    '''
+    return {
+        col: pd.Series([capwords(category) for category in data[col].cat.categories], index = data[col].cat.categories)
+        for col in data.columns if isinstance(data[col].dtype, pd.CategoricalDtype)
+    }
+
+def get_display_labels(values, labels = None):
+    '''
+    Returns an Index of the display labels of values (e.g. the categories left after a groupby)
+    @param labels: Series of precomputed labels indexed by value, from make_display_labels; if None, values are capitalized here
+    '''
+    if labels is None:
+        return pd.Index([capwords(value) for value in values])
+
+    return pd.Index(labels.reindex(values).values)
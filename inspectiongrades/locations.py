@@ -0,0 +1,85 @@
+# Author: Leslie Huang (lh1036)
+# Description: Location-level index of the dataset.
+# A location is one branch of a restaurant: a (restaurant name, address_id) pair. The index is built
+# once per dataset and maps each name to its locations and each location to its inspection rows
+# (sorted by date), so that looking up a branch costs O(result) instead of a scan of the whole dataset.
+
+import pandas as pd
+import numpy as np
+
+class LocationIndex(object):
+    '''
+    Index of restaurant name -> locations and location -> inspection rows sorted by date
+    '''
+
+    def __init__(self, data):
+        '''
+        Constructor
+        @param data: restaurant_data DF, indexed by restaurant name
+        '''
+        name_codes, self.names = pd.factorize(data.index)
+        address_codes, self.addresses = pd.factorize(data["address_id"])
+
+        # one code per (name, address) pair; the names' codes come first so that a name's locations are contiguous
+        pair_codes, pairs = pd.factorize(name_codes.astype(np.int64) * len(self.addresses) + address_codes, sort = True)
+        self.location_names = (pairs // len(self.addresses)).astype(np.intp)
+        self.location_addresses = (pairs % len(self.addresses)).astype(np.intp)
+
+        # row positions sorted by location, then by inspection date
+        self.rows = np.lexsort((data["inspectiondate"].values, pair_codes))
+        self.row_bounds = np.concatenate([[0], np.cumsum(np.bincount(pair_codes, minlength = len(pairs)))])
+
+        # locations of each name are a contiguous run of location codes
+        self.location_bounds = np.concatenate([[0], np.cumsum(np.bincount(self.location_names, minlength = len(self.names)))])
+
+        # per-location score statistics for comparing branches
+        scores = pd.to_numeric(data["score"]).values.astype(float)
+        valid = ~np.isnan(scores)
+        self.score_sums = np.bincount(pair_codes[valid], weights = scores[valid], minlength = len(pairs))
+        self.score_counts = np.bincount(pair_codes[valid], minlength = len(pairs))
+        self.inspection_counts = np.diff(self.row_bounds)
+
+    def _name_code(self, restaurant_name):
+        '''
+        Returns the code of restaurant_name, or raises KeyError if it is not in the data
+        '''
+        return self.names.get_loc(restaurant_name)
+
+    def get_locations(self, restaurant_name):
+        '''
+        Returns a DF (index: address_id; columns: rows, mean_score) of every location named restaurant_name
+        '''
+        code = self._name_code(restaurant_name)
+        locations = np.arange(self.location_bounds[code], self.location_bounds[code + 1])
+
+        with np.errstate(invalid = "ignore", divide = "ignore"):
+            means = self.score_sums[locations] / self.score_counts[locations]
+
+        return pd.DataFrame(
+            {"rows": self.inspection_counts[locations], "mean_score": means},
+            index = pd.Index(self.addresses[self.location_addresses[locations]], name = "address_id")
+        )
+
+    def get_rows(self, restaurant_name, address_id):
+        '''
+        Returns an array of row positions of the location (restaurant_name, address_id), sorted by inspection date
+        Raises KeyError if the restaurant has no location at that address
+        '''
+        code = self._name_code(restaurant_name)
+        start, end = self.location_bounds[code], self.location_bounds[code + 1]
+
+        # a name has few locations, so a binary search over its run of location codes finds the address
+        address_code = self.addresses.get_loc(address_id)
+        location = start + np.searchsorted(self.location_addresses[start:end], address_code)
+
+        if location == end or self.location_addresses[location] != address_code:
+            raise KeyError(address_id)
+
+        return self.rows[self.row_bounds[location]:self.row_bounds[location + 1]]
+
+    def get_data(self, data, restaurant_name, address_id):
+        '''
+        Returns a DF of the inspection rows of one location, sorted by inspection date
+        @param data: the DF this index was built from
+        '''
+        return data.iloc[self.get_rows(restaurant_name, address_id)]
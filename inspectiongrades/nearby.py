@@ -0,0 +1,87 @@
+# Author: Leslie Huang (lh1036)
+# Description: Spatial index of NYC zipcodes for radius searches.
+# The centroids of the NYC zipcodes are bundled with the package (zip_centroids.csv), so no
+# geocoding service is needed. They are projected to miles around the city's latitude, which is
+# accurate to well under 1% across the five boroughs, and held in a KD-tree built once, so finding
+# the zipcodes within a radius of another is a tree lookup (microseconds), not a scan of the table.
+
+import os
+from collections import namedtuple
+import pandas as pd
+import numpy as np
+from scipy.spatial import cKDTree
+
+ZIP_CENTROIDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "zip_centroids.csv")
+
+# miles per degree of latitude, and of longitude at the latitude of NYC
+MILES_PER_DEGREE = 69.05
+NYC_LATITUDE = 40.7
+
+MAX_RADIUS = 5.
+
+class ZipRadius(namedtuple("ZipRadius", ["zipcode", "radius"])):
+    '''
+    Key of a radius search: the zipcodes whose centroids are within radius miles of zipcode's
+    '''
+    __slots__ = ()
+
+    def __str__(self):
+        return "within {:g} {} of {}".format(self.radius, "mile" if self.radius == 1 else "miles", self.zipcode)
+
+class ZipIndex(object):
+    '''
+    KD-tree of the zipcode centroids, in miles
+    '''
+
+    def __init__(self, centroids):
+        '''
+        Constructor
+        @param centroids: DF with columns zipcode, latitude, longitude (one row per zipcode)
+        '''
+        self.zipcodes = pd.Index(centroids["zipcode"].astype(str))
+        self.points = np.column_stack([
+            centroids["longitude"].values * MILES_PER_DEGREE * np.cos(np.radians(NYC_LATITUDE)),
+            centroids["latitude"].values * MILES_PER_DEGREE,
+        ])
+        self.tree = cKDTree(self.points)
+
+    @classmethod
+    def load(cls, path = ZIP_CENTROIDS_FILE):
+        '''
+        Returns the ZipIndex of the centroids saved at path (default: the bundled NYC table)
+        '''
+        return cls(pd.read_csv(path, dtype = {"zipcode": str}))
+
+    def __contains__(self, zipcode):
+        return zipcode in self.zipcodes
+
+    def neighbors(self, zipcode, radius):
+        '''
+        Returns a list of the zipcodes whose centroids are within radius miles of zipcode's, nearest first
+        (zipcode itself is always first); raises KeyError if zipcode has no centroid
+        '''
+        point = self.points[self.zipcodes.get_loc(zipcode)]
+        positions = np.asarray(self.tree.query_ball_point(point, radius), dtype = np.intp)
+        distances = np.hypot(*(self.points[positions] - point).T)
+
+        return list(self.zipcodes[positions[np.lexsort((positions, distances))]])
+
+    def distances(self, zipcode, zipcodes):
+        '''
+        Returns an array of the distances in miles from zipcode's centroid to the centroids of zipcodes
+        '''
+        point = self.points[self.zipcodes.get_loc(zipcode)]
+        return np.hypot(*(self.points[self.zipcodes.get_indexer(zipcodes)] - point).T)
+
+_zip_index = None
+
+def get_zip_index():
+    '''
+    Returns the ZipIndex of the bundled centroids, built on first use and shared afterwards
+    '''
+    global _zip_index
+
+    if _zip_index is None:
+        _zip_index = ZipIndex.load()
+
+    return _zip_index
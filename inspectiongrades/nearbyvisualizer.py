@@ -0,0 +1,141 @@
+# Author: Leslie Huang (lh1036)
+# Attributes and methods for the nearby visualizer: graphs of all the zipcodes within a radius of one,
+# for neighborhoods that straddle zipcode boundaries.
+#
+# The zipcodes are found in the KD-tree of the bundled zipcode centroids (see nearby.ZipIndex), and
+# their rows are aggregated like a comparison (one isin filter and one grouped pass over the summary),
+# then pooled over the area or shown per zipcode.
+
+import pandas as pd
+import numpy as np
+from .comparisonvisualizer import ComparisonGrades
+from .chartdata import VALID_GRADES
+from .nearby import ZipRadius, get_zip_index
+
+class NearbyGrades(ComparisonGrades):
+    '''
+    Graphs of the zipcodes whose centroids are within a radius of a zipcode's
+    '''
+    __slots__ = ("center", "radius", "zip_index")
+    column = "zipcode"
+
+    def __init__(self, key, data, renderer = None, zip_index = None):
+        '''
+        Constructor
+        @param key: a nearby.ZipRadius (zipcode, radius in miles), or an equivalent tuple
+        @param zip_index: nearby.ZipIndex to search (default: the index of the bundled NYC centroids)
+        '''
+        self.center, self.radius = key
+        self.zip_index = zip_index or get_zip_index()
+        super(NearbyGrades, self).__init__(self.zip_index.neighbors(self.center, self.radius), data, renderer)
+
+    def get_name(self):
+        '''
+        Returns the name of the area, used in titles, e.g. "within 2 miles of 10011"
+        '''
+        return str(ZipRadius(self.center, self.radius))
+
+    def get_file_name(self, graph_name):
+        '''
+        Returns the file name of a graph of this area
+        '''
+        return "{}_within_{:g}_miles_{}.pdf".format(self.center, self.radius, graph_name)
+
+    def aggregate_area(self, by, statistic = "mean"):
+        '''
+        Returns a Series (index: values of by) of the mean score ("mean") or the number of rows ("rows")
+        per value of by, pooled over all the zipcodes of the area, from the summary
+        by can be "group" for one value per zipcode (nearest first; zipcodes without rows are dropped)
+        '''
+        sums = self.get_summary().groupby(by, observed = True)[["rows", "score_count", "score_sum"]].sum()
+
+        if statistic == "mean":
+            values = sums["score_sum"] / sums["score_count"].replace(0, np.nan)
+        else:
+            values = sums[statistic]
+
+        if by == "group":
+            return values.reindex(self.keys).dropna()
+
+        return values.sort_index()
+
+    ### Class methods for visualizing the data
+
+    def graph_mean_score_by_zip(self):
+        '''
+        Horizontal bar graph of the mean score of each zipcode in the area, nearest first, with the area's mean
+        '''
+        # reversed so that the nearest zipcode is drawn at the top
+        means = self.aggregate_area("group").iloc[::-1]
+        distances = self.zip_index.distances(self.center, means.index)
+        summary = self.get_summary()
+
+        fig, ax = self.renderer.new_axes(figsize = (10, 6))
+        ax.barh(range(len(means)), means.values, color = "b")
+        ax.axvline(summary["score_sum"].sum() / summary["score_count"].sum(), color = "r", linestyle = "--", label = "Area Mean")
+        ax.set_yticks(range(len(means)))
+        ax.set_yticklabels(["{} ({:.1f} mi)".format(zipcode, distance) for zipcode, distance in zip(means.index, distances)])
+        ax.set_xlabel("Mean Inspection Violations Score")
+        ax.set_ylabel("Zipcode (distance between centroids)")
+        ax.set_title("Mean Inspection Violations by Zipcode {}".format(self.get_name()))
+        ax.legend(loc = "lower right")
+        fig.subplots_adjust(left = 0.2)
+
+        return self.renderer.save(fig, self.get_file_name("violations_by_zipcode"))
+
+    def graph_lettergrade_frequency(self):
+        '''
+        Generates pie graph of letter grades awarded in the area
+        '''
+        counts = self.aggregate_area("grade", "rows")
+        counts.index = self.get_display_labels("grade", counts.index)
+        counts = counts[counts.index.isin(VALID_GRADES)]
+
+        fig, ax = self.renderer.new_axes()
+        counts.plot(kind = "pie", ax = ax, title = "Distribution of Letter Grades {}".format(self.get_name()))
+        ax.set_ylabel("")
+
+        return self.renderer.save(fig, self.get_file_name("lettergrades"))
+
+    def graph_mean_score_by_cuisine(self, max_cuisines = 15):
+        '''
+        Horizontal bar graph of the mean score of the max_cuisines cuisine categories with the most inspections in the area
+        '''
+        largest = self.aggregate_area("cuisine_primary", "rows").nlargest(max_cuisines).index
+        means = self.aggregate_area("cuisine_primary")[largest].sort_values()
+        means.index = self.get_display_labels("cuisine_primary", means.index)
+
+        fig, ax = self.renderer.new_axes(figsize = (10, 6))
+        means.plot(kind = "barh", ax = ax)
+        ax.set_xlabel("Mean Inspection Violations Score")
+        ax.set_ylabel("Cuisine (the {} with the most inspections)".format(len(means)))
+        ax.set_title("Mean Inspection Violations by Cuisine {}".format(self.get_name()))
+        fig.subplots_adjust(left = 0.3)
+
+        return self.renderer.save(fig, self.get_file_name("violations_by_cuisine"))
+
+    def timeseries_monthly(self):
+        '''
+        Timeseries of the monthly mean inspection score in the area
+        '''
+        means = self.aggregate_area("month")
+
+        fig, ax = self.renderer.new_axes(figsize = (10, 6))
+        means.plot(ax = ax)
+        ax.set_xlabel("Month")
+        ax.set_ylabel("Mean Inspection Violations Score")
+        ax.set_title("Monthly Inspection Violations {}".format(self.get_name()))
+
+        return self.renderer.save(fig, self.get_file_name("timeseries"))
+
+    def make_graphs(self):
+        '''
+        Calls all graphing methods for this class
+        Returns a list of the saved file names
+        '''
+        return [
+            self.graph_mean_score_by_zip(),
+            self.graph_lettergrade_frequency(),
+            self.graph_mean_score_by_cuisine(),
+            self.timeseries_monthly()
+        ]
@@ -0,0 +1,52 @@
+# Author: Leslie Huang (lh1036)
+# Description: Cache of structures derived from a loaded dataset (rankings, indexes, aggregates).
+# Each structure is built once per dataset and then shared by every visualizer query on that dataset.
+
+import weakref
+
+_derived = {}
+
+def get_derived(data, name, builder):
+    '''
+    Returns the structure called name derived from data, calling builder(data) only the first time it is requested
+    @param data: the full restaurant_data DF; the cache is keyed on this object, so treat it as read-only once loaded
+    @param name: key of the derived structure, e.g. "ranking"
+    @param builder: function that builds the structure from data
+    '''
+    entry = _entry_for(data)
+
+    if name not in entry:
+        entry[name] = builder(data)
+
+    return entry[name]
+
+def has_derived(data, name):
+    '''
+    Returns True if the structure called name has already been built or stored for data
+    '''
+    return name in _derived.get(id(data), {})
+
+def set_derived(data, name, value):
+    '''
+    Stores an already-built structure for data (e.g. one loaded from disk) so that it is not rebuilt
+    '''
+    _entry_for(data)[name] = value
+
+def clear_derived(data):
+    '''
+    Drops every structure derived from data (call after mutating data in place)
+    '''
+    _derived.pop(id(data), None)
+
+def _entry_for(data):
+    '''
+    Returns the dict of derived structures for data, creating it (and its cleanup hook) on first use
+    '''
+    key = id(data)
+
+    if key not in _derived:
+        _derived[key] = {}
+        # forget the structures when the dataset is garbage collected, so ids can be safely reused
+        weakref.finalize(data, _derived.pop, key, None)
+
+    return _derived[key]
@@ -0,0 +1,37 @@
+# Author: Leslie Huang (lh1036)
+# Description: Lookups that validate user input against the dataset.
+# The sets of cuisines and zipcodes, the number of rows of each restaurant and the zipcodes eligible
+# for a query are built in one pass over the data, so that validating a query is a set lookup
+# instead of a scan of every row.
+
+import pandas as pd
+
+class QueryLookups(object):
+    '''
+    Values of restaurant_data that queries are validated against
+    '''
+
+    def __init__(self, data):
+        '''
+        Constructor
+        @param data: restaurant_data DF, indexed by restaurant name, or the catalog of a history (see storage.read_catalog),
+        whose column rows holds the number of rows of each of its rows
+        '''
+        rows = data["rows"] if "rows" in data.columns else pd.Series(1, index = data.index)
+
+        # dict {restaurant: number of rows}, for the minimum number of inspection records of a restaurant query
+        self.restaurant_counts = rows.groupby(level = 0).sum().to_dict()
+
+        self.cuisines = frozenset(data["cuisine_primary"].dropna().unique())
+        self.zipcodes = frozenset(data["zipcode"].dropna().unique())
+
+        # zipcodes with at least 2 restaurants that each have at least 2 rows in the zipcode (to handle outliers)
+        rows = rows.groupby([data["zipcode"], data.index], observed = True).sum()
+        repeated = rows[rows >= 2].groupby(level = 0).size()
+        self.eligible_zipcodes = frozenset(repeated[repeated >= 2].index)
+
+    def restaurant_rows(self, name):
+        '''
+        Returns the number of rows of the restaurant called name (0 if it is not in the data)
+        '''
+        return self.restaurant_counts.get(name, 0)
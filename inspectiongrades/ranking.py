@@ -0,0 +1,113 @@
+# Author: Leslie Huang (lh1036)
+# Description: Ranking engine for the best and worst restaurants.
+# Per-restaurant mean/count statistics are built in one pass over the data (overall and within each
+# cuisine and zipcode), and top-k queries use partial selection instead of sorting every restaurant.
+
+import pandas as pd
+import numpy as np
+
+TIE_BREAKERS = ("count", "name")
+
+class RestaurantRanking(object):
+    '''
+    Per-restaurant inspection score statistics, queried for the top-k best and worst restaurants
+    Remember, lower is better! Higher score = more violations = dirty restaurant
+    '''
+
+    group_columns = ["cuisine_primary", "zipcode"]
+
+    def __init__(self, data):
+        '''
+        Constructor
+        @param data: restaurant_data DF, indexed by restaurant name
+        '''
+        group_columns = [col for col in self.group_columns if col in data.columns]
+
+        # the only pass over the rows: score sum and count for every (restaurant, cuisine, zipcode)
+        scores = pd.to_numeric(data["score"])
+        keys = [data.index.rename("restaurant")] + [data[col] for col in group_columns]
+        totals = scores.groupby(keys, dropna = False, observed = True).agg(["sum", "count"])
+
+        # everything else rolls up the (much smaller) totals table
+        self.overall = self._make_stats(totals.groupby(level = "restaurant", observed = True).sum())
+        self.groups = {}
+
+        for col in group_columns:
+            by_group = totals.groupby(level = [col, "restaurant"], observed = True).sum()
+            self.groups[col] = {
+                value: self._make_stats(by_group.iloc[positions].droplevel(col))
+                for value, positions in by_group.groupby(level = col, observed = True).indices.items()
+            }
+
+    @staticmethod
+    def _make_stats(totals):
+        '''
+        Returns a dict of aligned arrays (names, means, counts) from a DF of score sums and counts indexed by restaurant
+        '''
+        counts = totals["count"].to_numpy()
+
+        with np.errstate(invalid = "ignore", divide = "ignore"):
+            means = totals["sum"].to_numpy(dtype = float) / counts
+
+        return {"names": totals.index.to_numpy(), "means": means, "counts": counts}
+
+    def get_stats(self, column = None, value = None):
+        '''
+        Returns the statistics of all restaurants, or of restaurants within one group if column and value are given
+        e.g. get_stats("cuisine_primary", "thai")
+        '''
+        if column is None:
+            return self.overall
+
+        empty = {"names": np.array([], dtype = object), "means": np.array([]), "counts": np.array([], dtype = int)}
+        return self.groups[column].get(value, empty)
+
+    def top_k(self, k, minimum_obs, best = True, column = None, value = None, tie_breaker = "count"):
+        '''
+        Returns a DF (index: restaurant; columns: mean, count) of the k best or worst restaurants, best/worst first
+        @param k: number of restaurants to return (fewer if not enough restaurants qualify)
+        @param minimum_obs: restrict to restaurants with at least this many inspection scores (outliers)
+        @param best: True for the lowest mean scores, False for the highest
+        @param column, value: restrict the ranking to one cuisine or zipcode
+        @param tie_breaker: order of restaurants with equal means: "count" (more inspections first, then name),
+        "name" (alphabetical), or None (no particular order)
+        '''
+        if tie_breaker not in TIE_BREAKERS + (None,):
+            raise ValueError("tie_breaker must be one of {}".format(TIE_BREAKERS + (None,)))
+
+        stats = self.get_stats(column, value)
+        candidates = np.flatnonzero((stats["counts"] >= minimum_obs) & ~np.isnan(stats["means"]))
+
+        # sort key: ascending for the best restaurants, descending for the worst
+        keys = stats["means"][candidates] if best else -stats["means"][candidates]
+
+        # partial selection: keep only the candidates at least as good as the k-th one (ties included)
+        if 0 < k < len(candidates):
+            kth = np.partition(keys, k - 1)[k - 1]
+            selected = keys <= kth
+            candidates, keys = candidates[selected], keys[selected]
+
+        # fully sort only the handful of selected restaurants; np.lexsort sorts by the last key first
+        names = stats["names"][candidates]
+        if tie_breaker == "count":
+            order = np.lexsort((names, -stats["counts"][candidates], keys))
+        elif tie_breaker == "name":
+            order = np.lexsort((names, keys))
+        else:
+            order = np.argsort(keys, kind = "stable")
+
+        top = candidates[order[:max(k, 0)]]
+
+        return pd.DataFrame(
+            {"mean": stats["means"][top], "count": stats["counts"][top]},
+            index = pd.Index(stats["names"][top], name = "restaurant")
+        )
+
+    def best_and_worst(self, k, minimum_obs, column = None, value = None, tie_breaker = "count"):
+        '''
+        Returns a tuple (DF of k best restaurants, DF of k worst restaurants)
+        '''
+        return (
+            self.top_k(k, minimum_obs, True, column, value, tie_breaker),
+            self.top_k(k, minimum_obs, False, column, value, tie_breaker)
+        )
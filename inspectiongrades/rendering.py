@@ -0,0 +1,200 @@
+# Author: Leslie Huang (lh1036)
+# Description: Rendering context shared by the visualizers.
+# Instead of creating and closing a pyplot figure for every graph, a RenderContext creates a
+# pre-styled Figure (with its canvas) for each graph. With reuse_figures (as in bulk rendering), it
+# keeps one Figure and clears it between graphs instead: the figure-level state that clf() leaves
+# behind (size, layout, colors, dpi, layout engine) is reset to the rcParams, so a reused Figure draws
+# each graph like a new one. Figures are not registered with pyplot, so a context can be used from a
+# background thread.
+#
+# A context also sets the output mode: the file format (vector PDF/SVG or raster PNG/WebP at a
+# chosen DPI), rasterization of dense artists inside vector files, and the number of bars above
+# which graphs switch to an aggregated representation.
+
+import os
+from contextlib import contextmanager
+import matplotlib
+import matplotlib.style
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+matplotlib.style.use("ggplot")
+
+SUBPLOT_PARAMS = ("left", "right", "bottom", "top", "wspace", "hspace")
+OUTPUT_FORMATS = ("pdf", "svg", "png", "webp")
+
+# bar graphs with at least this many bars are drawn as a single artist
+DENSE_ARTISTS = 200
+
+# axes whose patches, lines and collections have at least this many vertices are rasterized in "rasterize" mode
+DENSE_VERTICES = 1000
+
+class RenderContext(object):
+    '''
+    Hands out a cleared figure for each graph and saves it
+    '''
+
+    __slots__ = ("reuse_figures", "figure", "output_format", "dpi", "rasterize", "max_bars", "annotation")
+
+    def __init__(self, reuse_figures = False, output_format = "pdf", dpi = None, rasterize = False, max_bars = None):
+        '''
+        Constructor
+        @param reuse_figures: if True, one Figure is cleared and reused for every graph instead of creating a new one
+        @param output_format: one of OUTPUT_FORMATS; replaces the extension of every saved file name
+        @param dpi: resolution of raster files and of rasterized artists (default: the savefig.dpi rcParam)
+        @param rasterize: draw dense artists (e.g. thousands of bars) as one embedded image in vector files
+        @param max_bars: graphs with more bars than this are drawn in aggregated form (e.g. a histogram); None for no limit
+        '''
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError("output_format must be one of {}".format(OUTPUT_FORMATS))
+        
+        self.reuse_figures = reuse_figures
+        self.figure = None
+        self.output_format = output_format
+        self.dpi = dpi
+        self.rasterize = rasterize
+        self.max_bars = max_bars
+        self.annotation = None
+
+    def new_figure(self, figsize = None):
+        '''
+        Returns an empty figure with the default layout, sized figsize (default: the figure.figsize rcParam)
+        '''
+        figsize = figsize or matplotlib.rcParams["figure.figsize"]
+
+        if self.figure is None or not self.reuse_figures:
+            self.figure = Figure(figsize = figsize)
+            FigureCanvasAgg(self.figure)
+        else:
+            self.reset_figure(figsize)
+
+        return self.figure
+
+    def reset_figure(self, figsize):
+        '''
+        Clears the reused figure and resets the state that clf() keeps to that of a new Figure sized figsize
+        '''
+        figure = self.figure
+        figure.clf()
+
+        # clf() keeps the layout engine, the size, the layout set by the last graph's subplots_adjust, the colors and dpi;
+        # the layout engine goes first, as subplots_adjust is ignored under a constrained layout
+        figure.set_layout_engine(None)
+        figure.set_size_inches(figsize)
+        figure.subplots_adjust(**{param: matplotlib.rcParams["figure.subplot." + param] for param in SUBPLOT_PARAMS})
+        figure.set_facecolor(matplotlib.rcParams["figure.facecolor"])
+        figure.set_edgecolor(matplotlib.rcParams["figure.edgecolor"])
+        figure.set_linewidth(0.0)
+        figure.set_frameon(matplotlib.rcParams["figure.frameon"])
+        figure.set_dpi(matplotlib.rcParams["figure.dpi"])
+
+    def new_axes(self, figsize = None, nrows = 1, ncols = 1):
+        '''
+        Returns a tuple (figure, axes) of an empty figure with nrows x ncols axes
+        '''
+        figure = self.new_figure(figsize)
+        return figure, figure.subplots(nrows, ncols)
+
+    def draw_bars(self, ax, values):
+        '''
+        Draws a bar graph of values without tick labels (e.g. one bar per restaurant)
+        Dense graphs are drawn as a single filled step artist instead of one patch per bar, which looks the
+        same at that density but keeps render time and file size from growing with the number of bars
+        '''
+        if len(values) < DENSE_ARTISTS:
+            ax.bar(range(len(values)), values)
+        else:
+            ax.stairs(values, [i - 0.5 for i in range(len(values) + 1)], fill = True)
+
+        ax.set_xticks([])
+
+    def draw_boxes(self, ax, stats, labels, rot = 90):
+        '''
+        Draws a box plot from precomputed statistics (see boxstats.BoxStats), one box per entry of stats
+        @param stats: list of dicts of box statistics
+        @param labels: list of tick labels, aligned with stats
+        '''
+        ax.bxp([dict(box, label = label) for box, label in zip(stats, labels)], showfliers = True)
+        ax.tick_params(axis = "x", labelrotation = rot)
+
+    @contextmanager
+    def annotate(self, text):
+        '''
+        Context in which every saved graph is annotated with text (e.g. that it is an approximate preview)
+        '''
+        self.annotation = text
+        try:
+            yield self
+        finally:
+            self.annotation = None
+
+    def too_many_bars(self, n_bars):
+        '''
+        Returns True if a graph of n_bars bars should be drawn in aggregated form instead
+        '''
+        return self.max_bars is not None and n_bars > self.max_bars
+
+    def rasterize_dense_artists(self, figure):
+        '''
+        Marks the patches, lines and collections of dense axes as rasterized; text and axes stay vector
+        '''
+        for ax in figure.axes:
+            artists = ax.patches + ax.lines + ax.collections
+
+            if sum(count_vertices(artist) for artist in artists) >= DENSE_VERTICES:
+                for artist in artists:
+                    artist.set_rasterized(True)
+
+    def save(self, figure, filename):
+        '''
+        Saves figure in the output format and clears it, so that the artists of finished graphs are not kept in memory
+        Returns the saved file name (filename with the extension of the output format)
+        '''
+        filename = "{}.{}".format(os.path.splitext(filename)[0], self.output_format)
+
+        if self.rasterize:
+            self.rasterize_dense_artists(figure)
+
+        if self.annotation is not None:
+            figure.text(0.99, 0.01, self.annotation, ha = "right", va = "bottom", color = "r", fontsize = "small", style = "italic")
+
+        figure.savefig(filename, dpi = self.dpi)
+        figure.clf()
+
+        return filename
+
+def parse_render_options(args):
+    '''
+    Returns the RenderContext arguments (a dict) given on a command line: --format=FORMAT, --dpi=DPI, --rasterize
+    and --max-bars=N; other arguments are ignored
+    Raises ValueError for an unsupported format or a value that is not a number
+    '''
+    options = dict(arg[2:].split("=", 1) for arg in args if arg.startswith("--") and "=" in arg)
+    render_options = {}
+
+    if "format" in options:
+        if options["format"] not in OUTPUT_FORMATS:
+            raise ValueError("--format must be one of {}".format(", ".join(OUTPUT_FORMATS)))
+        render_options["output_format"] = options["format"]
+    if "dpi" in options:
+        render_options["dpi"] = float(options["dpi"])
+    if "max-bars" in options:
+        render_options["max_bars"] = int(options["max-bars"])
+    if "--rasterize" in args:
+        render_options["rasterize"] = True
+
+    return render_options
+
+def count_vertices(artist):
+    '''
+    Returns the number of vertices (or points) drawn by a patch, line or collection
+    '''
+    if hasattr(artist, "get_xydata"):
+        return len(artist.get_xydata())
+
+    if hasattr(artist, "get_path"):
+        return len(artist.get_path().vertices)
+
+    return sum(len(path.vertices) for path in artist.get_paths()) + len(artist.get_offsets())
+
+default_context = RenderContext()
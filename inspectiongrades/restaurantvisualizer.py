@@ -3,67 +3,182 @@
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from string import capwords
 from .visualizer import Visualizer
-plt.style.use("ggplot")
+from .chartdata import make_records
+from .timeseries import prepare_timeseries, MAX_POINTS
+from .precomputed import get_derived
+from .locations import LocationIndex
 
 class RestaurantGrades(Visualizer):
-    def __init__(self, restaurant_name, data):
+    __slots__ = ("restaurant_name", "address_id")
+    
+    def __init__(self, restaurant_name, data, address_id = None, renderer = None):
         '''
         Constructor
+        @param address_id: if given, restrict to the single location (branch) of the restaurant at this address
         '''
-        super(RestaurantGrades, self).__init__(data)
+        super(RestaurantGrades, self).__init__(data, renderer)
         self.restaurant_name = restaurant_name
+        self.address_id = address_id
         
     ### Class methods for subsetting and returning the data
 
+    def get_location_index(self):
+        '''
+        Returns the LocationIndex of the full dataset (built once and shared by every query on it)
+        '''
+        return get_derived(self.data, "locations", LocationIndex)
+
     def filter_data(self, data):
         '''
-        Returns a DF subset for the specified restaurant
+        Returns a DF subset for the specified restaurant (or location), sorted by inspection date
+        '''
+        if self.address_id is None:
+            return data.loc[[self.restaurant_name]].sort_values(by = "inspectiondate")
+        
+        if data is self.data:
+            return self.get_location_index().get_data(data, self.restaurant_name, self.address_id)
+        
+        data = data.loc[[self.restaurant_name]]
+        return data[data["address_id"] == self.address_id].sort_values(by = "inspectiondate")
+    
+    def storage_filter(self):
+        '''
+        A restaurant query reads the rows of every location with its name from partitioned storage
+        '''
+        return ("restaurant", self.restaurant_name)
+    
+    def get_branches(self):
+        '''
+        Returns a DF (index: address_id; columns: rows, mean_score) of every location of the restaurant
+        '''
+        return self.get_location_index().get_locations(self.restaurant_name)
+    
+    def get_label(self):
+        '''
+        Returns the formatted restaurant name (and address, for a single location) used in titles and file names
+        '''
+        if self.address_id is None:
+            return capwords(self.restaurant_name)
+        
+        return "{} at {}".format(capwords(self.restaurant_name), capwords(self.address_id))
+    
+    def get_note(self):
+        '''
+        Returns the note that explains which restaurants a graph includes
         '''
-        data = data.sort_values(by = "inspectiondate")
-        return data.loc[[self.restaurant_name]]
+        if self.address_id is None:
+            return "Note: Graph includes all restaurants named {}.".format(capwords(self.restaurant_name))
+        
+        return "Note: Graph includes only the location at {}.".format(capwords(self.address_id))
+    
+    def get_chart_data(self):
+        '''
+        Returns the numbers behind the graphs of the letter grades and of the scores over time (one record per
+        inspection, by date), as a dict {chart name: list of records}
+        '''
+        data = self.filter_data(self.data)
+        
+        return {
+            "lettergrades": make_records(self.grade_counts()),
+            "timeseries": make_records(pd.Series(data["score"].values, index = data["inspectiondate"].values))
+        }
     
     ### Class methods for visualizing the data
 
-    def graph_restaurant_timeseries(self):
+    def graph_restaurant_timeseries(self, freq = None, window = None, max_points = MAX_POINTS):
         '''
         Plots a line graph of inspection violation scores over time
+        @param freq, window: optionally resample to monthly ("M") or quarterly ("Q") rolling means
+        @param max_points: cap on the number of plotted points (see timeseries.prepare_timeseries)
         '''
-        data = self.filter_data(self.data)        
+        data = prepare_timeseries(self.filter_data(self.data), freq, window, max_points)
         
-        plt.plot_date(x = data["inspectiondate"], y = data["score"], fmt = "r-")
-        plt.xticks(rotation = "vertical")
-        plt.ylabel("Inspection Violations")
-        plt.title("Inspection Violations at {} Over Time".format(capwords(self.restaurant_name)))
+        fig, ax = self.renderer.new_axes()
+        ax.plot_date(x = data.index, y = data.values, fmt = "r-")
+        ax.tick_params(axis = "x", labelrotation = 90)
+        ax.set_ylabel("Inspection Violations")
+        ax.set_title("Inspection Violations at {} Over Time".format(self.get_label()))
         
-        plt.annotate("Note: Graph includes all restaurants named {}.".format(capwords(self.restaurant_name)), (0,0), (0, -100), xycoords = "axes fraction", textcoords = "offset points", va = "top")
-        plt.subplots_adjust(bottom = 0.5)
+        ax.annotate(self.get_note(), (0,0), (0, -100), xycoords = "axes fraction", textcoords = "offset points", va = "top")
+        fig.subplots_adjust(bottom = 0.5)
         
-        plt.savefig("{}_timeseries.pdf".format(capwords(self.restaurant_name)))
-        plt.close()   
+        return self.renderer.save(fig, "{}_timeseries.pdf".format(self.get_label()))
             
     def graph_restaurant_lettergrade_frequency(self):
         '''
         Plots a bar graph of frequency of letter grades received
         '''
-        data = self.filter_data_valid_values("grade", ["A", "B", "C", "Not Yet Graded", "Grade Pending"])
+        fig, ax = self.renderer.new_axes()
+        self.grade_counts().plot(kind = "bar", ax = ax, rot = 0, title = "Letter Grades Awarded to {}".format(self.get_label()))
+        ax.set_xlabel("Grade")
+        ax.set_ylabel("Number of Times Awarded")
+        
+        ax.annotate(self.get_note(), (0,0), (0, -50), xycoords = "axes fraction", textcoords = "offset points", va = "top")
+        fig.subplots_adjust(bottom = 0.3)
+        
+        return self.renderer.save(fig, "{}_lettergrades.pdf".format(self.get_label()))
+    
+    def graph_branch_timeseries(self, max_branches = 10, freq = None, window = None, max_points = MAX_POINTS):
+        '''
+        Plots one line of inspection violation scores over time per location of the restaurant
+        @param max_branches: only the locations with the most inspection records are plotted
+        @param freq, window, max_points: see timeseries.prepare_timeseries
+        '''
+        index = self.get_location_index()
+        branches = self.get_branches().sort_values(by = "rows", ascending = False).iloc[:max_branches]
         
-        data["grade"].value_counts().plot(kind = "bar", rot = 0, title = "Letter Grades Awarded to {}".format(capwords(self.restaurant_name)))
-        plt.xlabel("Grade")
-        plt.ylabel("Number of Times Awarded")
+        fig, ax = self.renderer.new_axes(figsize = (10, 6))
+        for address_id in branches.index:
+            data = prepare_timeseries(index.get_data(self.data, self.restaurant_name, address_id), freq, window, max_points)
+            ax.plot_date(x = data.index, y = data.values, fmt = "-", label = capwords(address_id))
         
-        plt.annotate("Note: Graph includes all restaurants named {}.".format(capwords(self.restaurant_name)), (0,0), (0, -50), xycoords = "axes fraction", textcoords = "offset points", va = "top")
-        plt.subplots_adjust(bottom = 0.3)
+        ax.tick_params(axis = "x", labelrotation = 90)
+        ax.set_ylabel("Inspection Violations")
+        ax.set_title("Inspection Violations at {} Locations Over Time".format(capwords(self.restaurant_name)))
+        ax.legend(loc = "upper left", bbox_to_anchor = (1, 1), fontsize = "small")
         
-        plt.savefig("{}_lettergrades.pdf".format(capwords(self.restaurant_name)))
-        plt.close()   
+        ax.annotate("Note: Graph includes the {} of {} locations with the most inspection records.".format(len(branches), len(self.get_branches())), (0,0), (0, -100), xycoords = "axes fraction", textcoords = "offset points", va = "top")
+        fig.subplots_adjust(bottom = 0.4, right = 0.7)
+        
+        return self.renderer.save(fig, "{}_branches_timeseries.pdf".format(capwords(self.restaurant_name)))
+    
+    def graph_branch_comparison(self, max_branches = 30):
+        '''
+        Plots a horizontal bar graph comparing the mean inspection violations score of the restaurant's locations
+        @param max_branches: only the locations with the most inspection records are compared
+        '''
+        branches = self.get_branches()
+        compared = branches.sort_values(by = "rows", ascending = False).iloc[:max_branches]
+        compared = compared.sort_values(by = "mean_score") # worst location is drawn at the top
+        compared.index = pd.Index(capwords(address_id) for address_id in compared.index)
+        
+        fig, ax = self.renderer.new_axes(figsize = (8, max(4, 0.25 * len(compared))))
+        compared["mean_score"].plot(kind = "barh", ax = ax)
+        ax.set_xlabel("Mean Inspection Violations Score")
+        ax.set_ylabel("Location")
+        ax.set_title("Mean Inspection Violations at {} Locations".format(capwords(self.restaurant_name)))
+        
+        fig.text(0.02, 0.02, "Note: Graph includes the {} of {} locations with the most inspection records.".format(len(compared), len(branches)))
+        fig.subplots_adjust(left = 0.4, bottom = 0.15)
+        
+        return self.renderer.save(fig, "{}_branches_comparison.pdf".format(capwords(self.restaurant_name)))
                 
     def make_graphs(self):
         '''
         Calls all graphing methods for this class
+        The branch graphs are only made for restaurants with more than one location
+        Returns a list of the saved file names
         '''
-        self.graph_restaurant_timeseries()
-        self.graph_restaurant_lettergrade_frequency()
+        saved = [
+            self.graph_restaurant_timeseries(),
+            self.graph_restaurant_lettergrade_frequency()
+        ]
+        
+        if self.address_id is None and len(self.get_branches()) > 1:
+            saved.append(self.graph_branch_timeseries())
+            saved.append(self.graph_branch_comparison())
+        
+        return saved
         
\ No newline at end of file
@@ -0,0 +1,82 @@
+# Author: Leslie Huang (lh1036)
+# Description: Stratified sample of the dataset for approximate preview graphs.
+# The rows are stratified by (boro, cuisine_primary, zipcode) and the same fraction of every stratum
+# is drawn (the fractional part of a stratum's share is rounded up or down at random), so every row
+# has the same chance of being in the sample: means and shares computed on it are unbiased without
+# weights, and every borough, cuisine and zipcode is represented in proportion to its size.
+# The sample is drawn once at load time; a preview of a large cuisine or zipcode then only filters
+# and aggregates a few percent of the rows.
+
+import numpy as np
+import pandas as pd
+
+STRATA = ["boro", "cuisine_primary", "zipcode"]
+SAMPLE_FRACTION = 0.05
+
+# a 95% confidence interval is 1.96 standard errors either side of the mean
+Z_95 = 1.96
+
+class StratifiedSample(object):
+    '''
+    Rows drawn with the same probability from each (boro, cuisine_primary, zipcode) stratum
+    '''
+
+    def __init__(self, data, strata = STRATA, fraction = SAMPLE_FRACTION, seed = 0):
+        '''
+        Constructor
+        @param data: the full restaurant_data DF
+        @param strata: columns that define the strata; columns missing from data are skipped
+        @param fraction: share of the rows of each stratum in the sample
+        @param seed: seed of the random draw, so that previews are reproducible
+        '''
+        self.fraction = fraction
+        self.strata = [col for col in strata if col in data.columns]
+        rng = np.random.RandomState(seed)
+
+        # stratum of each row, from the codes of its values (missing values are a stratum of their own)
+        key = np.zeros(len(data), dtype = np.int64)
+        for col in self.strata:
+            codes, values = pd.factorize(data[col])
+            key = key * (len(values) + 1) + codes + 1
+        stratum_of_row = pd.factorize(key)[0]
+
+        # strata are numbered in order of first appearance, so a stratum's first row is where the running maximum grows
+        running_max = np.maximum.accumulate(stratum_of_row)
+        first_rows = np.flatnonzero(np.diff(running_max, prepend = -1))
+
+        sizes = np.bincount(stratum_of_row)
+        self.stratum_sizes = pd.DataFrame({col: data[col].values[first_rows] for col in self.strata})
+        self.stratum_sizes["rows"] = sizes
+
+        # rows taken per stratum: fraction * size, with the remainder rounded up with probability equal to it
+        taken = np.floor(sizes * fraction + rng.random_sample(len(sizes))).astype(np.int64)
+
+        # shuffle the rows, then order them by stratum (a stable sort keeps them shuffled within each stratum)
+        # and keep the first taken of each stratum
+        shuffled = rng.permutation(len(data))
+        order = shuffled[np.argsort(stratum_of_row[shuffled], kind = "stable")]
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        position = np.arange(len(data)) - starts[stratum_of_row[order]]
+
+        self.rows = np.sort(order[position < taken[stratum_of_row[order]]])
+        self.data = data.iloc[self.rows]
+
+    def count(self, column, value):
+        '''
+        Returns the number of rows of the full dataset where column equals value (column must be one of the strata)
+        '''
+        return int(self.stratum_sizes.loc[self.stratum_sizes[column] == value, "rows"].sum())
+
+    def margin_of_error(self, grouped):
+        '''
+        Returns a Series of the half-width of the 95% confidence interval of the mean of each group
+        @param grouped: a SeriesGroupBy of sampled values, e.g. sample.data.groupby("swc_type")["score"]
+        '''
+        # the finite population correction accounts for the sample being a share of the rows, not drawn with replacement
+        return Z_95 * grouped.std() / np.sqrt(grouped.count()) * np.sqrt(1 - self.fraction)
+
+    def describe(self):
+        '''
+        Returns the annotation of the graphs drawn from the sample
+        '''
+        return "Approximate ({:g}% stratified sample); the exact graph will replace it".format(self.fraction * 100)
@@ -0,0 +1,182 @@
+# Author: Leslie Huang (lh1036)
+# Description: Session state: the structures derived from the dataset, saved between sessions.
+# Every session of main.py needs the same derived structures (the lookups that validate user input,
+# the ranking, box statistics, trend features, ...). They are saved in one versioned file with the
+# fingerprint of the data they were built from, and a session whose data has the same fingerprint
+# registers them (see precomputed) instead of building them. A file of another version, of other
+# data or missing a structure is rebuilt.
+#
+# Layout of the file: a pickled header (version, fingerprint, build time and size of each structure),
+# followed by the pickled structures, so that the header can be read without loading them.
+# Only load session state files written by this program: unpickling runs code named in the file.
+
+import os
+import time
+import pickle
+import hashlib
+import pandas as pd
+from .precomputed import set_derived
+from .querylookups import QueryLookups
+from .ranking import RestaurantRanking
+from .boxstats import BoxStats
+from .labels import make_display_labels
+from .locations import LocationIndex
+from .trendfeatures import TrendFeatures
+from .sampling import StratifiedSample
+
+# increment when a structure's class changes, so that files written by older code are rebuilt
+SESSION_STATE_VERSION = 1
+
+SESSION_STATE_FILE = "session_state.pkl"
+
+# structures of a session: {name in precomputed: function that builds it from restaurant_data}
+SESSION_BUILDERS = {
+    "query_lookups": QueryLookups,
+    "ranking": RestaurantRanking,
+    "box_stats": BoxStats,
+    "display_labels": make_display_labels,
+    "locations": LocationIndex,
+    "trend_features": TrendFeatures,
+    "sample": StratifiedSample,
+}
+
+# errors of a file that is truncated, corrupt or written by code that no longer exists; the file is rebuilt
+READ_ERRORS = (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, IndexError, KeyError, TypeError, ValueError)
+
+def dataset_fingerprint(data, *related_data):
+    '''
+    Returns a hex digest of the index, columns, dtypes and values of data and of the other DFs related_data
+    '''
+    digest = hashlib.sha256()
+
+    for frame in (data,) + related_data:
+        digest.update(repr([frame.index.names, list(frame.columns), [str(dtype) for dtype in frame.dtypes]]).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(frame, index = True).values.tobytes())
+
+    return digest.hexdigest()
+
+class SessionState(object):
+    '''
+    Structures derived from a dataset, with the fingerprint of the dataset and the time it took to build each one
+    '''
+
+    def __init__(self, fingerprint, structures, build_seconds, rows, built = None, version = SESSION_STATE_VERSION, sizes = None):
+        '''
+        Constructor
+        @param structures: dict {name: structure}, registered under these names by register
+        @param build_seconds: dict {name: seconds it took to build the structure}
+        @param rows: number of rows of the dataset
+        @param sizes: dict {name: bytes of the saved structure}, if it was saved or loaded
+        '''
+        self.version = version
+        self.fingerprint = fingerprint
+        self.structures = structures
+        self.build_seconds = build_seconds
+        self.rows = rows
+        self.built = built or pd.Timestamp.now().floor("s")
+        self.sizes = sizes or {}
+
+    @classmethod
+    def build(cls, data, builders = None, fingerprint = None):
+        '''
+        Returns the SessionState of data, building each structure with builders (default: SESSION_BUILDERS)
+        '''
+        builders = SESSION_BUILDERS if builders is None else builders
+        structures, build_seconds = {}, {}
+
+        for name, builder in builders.items():
+            start = time.perf_counter()
+            structures[name] = builder(data)
+            build_seconds[name] = time.perf_counter() - start
+
+        return cls(fingerprint or dataset_fingerprint(data), structures, build_seconds, len(data))
+
+    @staticmethod
+    def read_header(file):
+        '''
+        Returns the header (a dict) of the session state in the open binary file, leaving the file at its structures
+        '''
+        return pickle.load(file)
+
+    @classmethod
+    def load(cls, path, fingerprint = None, names = ()):
+        '''
+        Returns the SessionState saved in path, or None if it is of another version, or fingerprint is given and
+        differs from the saved one, or it lacks any of names; its structures are only unpickled if it is valid
+        '''
+        with open(path, "rb") as file:
+            header = cls.read_header(file)
+
+            if header["version"] != SESSION_STATE_VERSION or (fingerprint is not None and header["fingerprint"] != fingerprint) \
+                    or not set(names) <= set(header["sizes"]):
+                return None
+
+            structures = {name: pickle.loads(structure) for name, structure in pickle.load(file).items()}
+
+        return cls(header["fingerprint"], structures, header["build_seconds"], header["rows"], header["built"], header["version"], header["sizes"])
+
+    def save(self, path):
+        '''
+        Writes the session state to path
+        The file is replaced only once it is complete, so an interrupted save leaves the previous state
+        '''
+        pickled = {name: pickle.dumps(structure, protocol = pickle.HIGHEST_PROTOCOL) for name, structure in self.structures.items()}
+        self.sizes = {name: len(structure) for name, structure in pickled.items()}
+
+        header = {"version": self.version, "fingerprint": self.fingerprint, "built": self.built,
+            "build_seconds": self.build_seconds, "rows": self.rows, "sizes": self.sizes}
+
+        with open(path + ".tmp", "wb") as file:
+            pickle.dump(header, file, protocol = pickle.HIGHEST_PROTOCOL)
+            pickle.dump(pickled, file, protocol = pickle.HIGHEST_PROTOCOL)
+
+        os.replace(path + ".tmp", path)
+
+    def register(self, data):
+        '''
+        Registers every structure as derived from data, so that queries on data use them instead of building them
+        '''
+        for name, structure in self.structures.items():
+            set_derived(data, name, structure)
+
+def load_session_state(data, path, builders = None, related_data = ()):
+    '''
+    Registers the structures of builders (default: SESSION_BUILDERS) as derived from data, loading them from the
+    session state file path if it was saved from the same data, and otherwise building them and saving them to path
+    Returns a tuple (SessionState, True if it was loaded from path)
+    @param related_data: other DFs the structures are built from (e.g. the violations table), included in the fingerprint
+    '''
+    builders = SESSION_BUILDERS if builders is None else builders
+    fingerprint = dataset_fingerprint(data, *related_data)
+    state = None
+
+    if os.path.exists(path):
+        try:
+            state = SessionState.load(path, fingerprint, builders)
+        except READ_ERRORS:
+            state = None
+
+    loaded = state is not None
+    if not loaded:
+        state = SessionState.build(data, builders, fingerprint)
+        state.save(path)
+
+    state.register(data)
+    return state, loaded
+
+def describe_session_state(path):
+    '''
+    Returns a description (str) of the session state file path: its version, fingerprint and build date,
+    and the build time and size of each structure; only the header of the file is read
+    '''
+    with open(path, "rb") as file:
+        header = SessionState.read_header(file)
+
+    lines = [
+        "Session state {}: version {}{}".format(path, header["version"], "" if header["version"] == SESSION_STATE_VERSION else " (outdated, will be rebuilt)"),
+        "Built {} from {} rows in {:.2f} s; dataset fingerprint {}".format(header["built"], header["rows"], sum(header["build_seconds"].values()), header["fingerprint"][:16]),
+    ]
+    for name in sorted(header["sizes"]):
+        lines.append("    {:<20} {:>8.2f} s {:>10.1f} KB".format(name, header["build_seconds"].get(name, float("nan")), header["sizes"][name] / 1024))
+
+    return "\n".join(lines)
@@ -0,0 +1,168 @@
+# Author: Leslie Huang (lh1036)
+# Description: Store of cleaned snapshots (e.g. monthly extracts) for comparison across extracts.
+# String columns are saved as integer codes into dictionaries shared by all snapshots (restaurant
+# names, cuisines, streets, ...), which only grow when a snapshot brings new values. Each snapshot
+# only stores its code arrays and numeric columns, so N snapshots cost far less than N full copies,
+# and loaded snapshots share one string object per distinct value.
+#
+# Layout of a store directory: dictionaries.npz (every dictionary as UTF-8 bytes and offsets) and
+# one <snapshot name>.npz per snapshot. Snapshot names sort in time order, e.g. "2016-11-27".
+
+import os
+import json
+import pandas as pd
+import numpy as np
+
+# columns that share one dictionary; other string columns get a dictionary of their own
+SHARED_DICTIONARIES = {
+    "restaurant": "names", "business_name": "names", "business_name2": "names",
+    "cuisine_primary": "cuisines", "cuisinedescription": "cuisines",
+    "street": "streets",
+}
+
+# columns loaded as categoricals, as in the output of clean_data(); other string columns are loaded as objects
+CATEGORICAL_COLUMNS = ["boro", "grade", "cuisine_primary", "swc_type"]
+
+DICTIONARY_FILE = "dictionaries.npz"
+
+class SnapshotStore(object):
+    '''
+    Directory of snapshots of restaurant_data (indexed by restaurant) with shared string dictionaries
+    '''
+
+    def __init__(self, path):
+        '''
+        Constructor
+        @param path: directory of the store (created if needed)
+        '''
+        self.path = path
+        self.dictionaries = {}
+        self.loaded = {}
+        os.makedirs(path, exist_ok = True)
+
+        if os.path.exists(os.path.join(path, DICTIONARY_FILE)):
+            with np.load(os.path.join(path, DICTIONARY_FILE)) as arrays:
+                for key in arrays.files:
+                    if key.endswith("_offsets"):
+                        name = key[:-len("_offsets")]
+                        self.dictionaries[name] = decode_strings(arrays[name + "_bytes"], arrays[key])
+
+    def names(self):
+        '''
+        Returns the sorted list of snapshot names
+        '''
+        return sorted(filename[:-len(".npz")] for filename in os.listdir(self.path)
+            if filename.endswith(".npz") and filename != DICTIONARY_FILE)
+
+    def previous(self, name):
+        '''
+        Returns the name of the snapshot before name, or None for the first snapshot
+        '''
+        names = self.names()
+        position = names.index(name)
+        return names[position - 1] if position > 0 else None
+
+    def save(self, name, data):
+        '''
+        Saves restaurant_data as snapshot name (replacing a snapshot of the same name)
+        New string values are appended to the shared dictionaries, so codes of saved snapshots stay valid
+        '''
+        data = data.reset_index()
+        arrays, schema = {}, []
+
+        for col in data.columns:
+            values = data[col]
+
+            # strings are encoded whether they are Python objects, categoricals or pd.StringDtype (e.g. string[pyarrow])
+            if isinstance(values.dtype, (pd.CategoricalDtype, pd.StringDtype)) or values.dtype == object:
+                dictionary_name = SHARED_DICTIONARIES.get(col, col)
+                arrays[col] = self.encode(dictionary_name, values)
+                schema.append([col, "string", dictionary_name])
+            elif np.issubdtype(values.dtype, np.datetime64):
+                arrays[col] = values.values.view(np.int64)
+                schema.append([col, "datetime", None])
+            else:
+                arrays[col] = values.to_numpy()
+                schema.append([col, str(values.dtype), None])
+
+        arrays["schema"] = np.array(json.dumps(schema))
+        self.write_dictionaries()
+        np.savez_compressed(os.path.join(self.path, name + ".npz"), **arrays)
+        self.loaded.pop(name, None)
+
+    def load(self, name):
+        '''
+        Returns snapshot name as a DF indexed by restaurant, with the dtypes of clean_data()'s output
+        Loaded snapshots are kept, so that queries on the same snapshot share its derived structures
+        '''
+        if name not in self.loaded:
+            columns = {}
+
+            with np.load(os.path.join(self.path, name + ".npz")) as arrays:
+                for col, kind, dictionary_name in json.loads(str(arrays["schema"])):
+                    if kind == "string":
+                        columns[col] = self.decode(dictionary_name, arrays[col], col in CATEGORICAL_COLUMNS)
+                    elif kind == "datetime":
+                        columns[col] = arrays[col].view("datetime64[ns]")
+                    else:
+                        columns[col] = arrays[col]
+
+            self.loaded[name] = pd.DataFrame(columns).set_index("restaurant")
+
+        return self.loaded[name]
+
+    def encode(self, dictionary_name, values):
+        '''
+        Returns int32 codes of values in the dictionary (missing values: -1), appending new values to it
+        '''
+        codes, uniques = pd.factorize(values)
+        dictionary = self.dictionaries.get(dictionary_name, np.array([], dtype = object))
+
+        unique_codes = pd.Index(dictionary).get_indexer(uniques)
+        new_values = np.asarray(uniques[unique_codes < 0], dtype = object)
+        unique_codes[unique_codes < 0] = np.arange(len(dictionary), len(dictionary) + len(new_values))
+        self.dictionaries[dictionary_name] = np.concatenate([dictionary, new_values])
+
+        return np.append(unique_codes, -1)[codes].astype(np.int32)
+
+    def decode(self, dictionary_name, codes, categorical = False):
+        '''
+        Returns the values of codes: a categorical of the values used, or an object array whose strings are
+        shared with every other snapshot loaded from this store
+        '''
+        dictionary = self.dictionaries[dictionary_name]
+
+        if categorical:
+            used = np.unique(codes[codes >= 0])
+            order = np.argsort(dictionary[used].astype(str))
+            categorical_codes = np.full(len(dictionary) + 1, -1)
+            categorical_codes[used[order]] = np.arange(len(used))
+            return pd.Categorical.from_codes(categorical_codes[codes], categories = dictionary[used[order]])
+
+        return np.append(dictionary, np.nan)[codes]
+
+    def write_dictionaries(self):
+        '''
+        Writes the shared dictionaries to the store
+        '''
+        arrays = {}
+        for name, dictionary in self.dictionaries.items():
+            arrays[name + "_bytes"], arrays[name + "_offsets"] = encode_strings(dictionary)
+
+        np.savez_compressed(os.path.join(self.path, DICTIONARY_FILE), **arrays)
+
+def encode_strings(strings):
+    '''
+    Returns a tuple (uint8 array of the UTF-8 bytes of strings, concatenated; int64 array of their end offsets)
+    '''
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = np.cumsum([len(string) for string in encoded], dtype = np.int64)
+    return np.frombuffer(b"".join(encoded), dtype = np.uint8), offsets
+
+def decode_strings(data, offsets):
+    '''
+    Returns an object array of the strings encoded by encode_strings
+    '''
+    data = data.tobytes()
+    starts = np.concatenate([[0], offsets[:-1]])
+    return np.array([data[start:end].decode("utf-8") for start, end in zip(starts, offsets)], dtype = object)
@@ -0,0 +1,154 @@
+# Author: Leslie Huang (lh1036)
+# Description: Partitioned columnar storage for the multi-year inspection history.
+# The cleaned data is written as a Parquet dataset partitioned by inspection year and borough
+# (year=2014/boro=manhattan/...), with rows sorted by zipcode, cuisine and restaurant inside each
+# partition so that the row group statistics of those columns are selective. Queries read only the
+# partitions, row groups and columns that their filter needs, instead of loading the whole history.
+#
+# A small catalog of the distinct (restaurant, zipcode, cuisine) of each partition and their number of
+# rows is saved with the dataset, so that user input is validated without reading the history.
+#
+# Requires pyarrow, which is only needed for this storage mode.
+
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+PARTITION_COLUMNS = ["year", "boro"]
+
+# sort order inside each partition
+SORT_COLUMNS = ["zipcode", "cuisine_primary", "restaurant", "inspectiondate"]
+
+# string columns read back as categoricals, as in the output of clean_data()
+CATEGORICAL_COLUMNS = ["grade", "cuisine_primary", "swc_type"]
+
+# smaller row groups let more of them be skipped, at the cost of more metadata
+ROW_GROUP_SIZE = 20000
+
+# the catalog file; names starting with "_" are not read as part of the dataset
+CATALOG_FILE = "_catalog.parquet"
+CATALOG_COLUMNS = ["restaurant", "zipcode", "cuisine_primary"]
+
+# default memory budget of the rows read by one query
+QUERY_MAX_BYTES = 1024 ** 3
+
+def write_partitioned(data, path, row_group_size = ROW_GROUP_SIZE):
+    '''
+    Writes restaurant_data (indexed by restaurant) as a Parquet dataset partitioned by year and borough
+    Existing files of the written partitions are replaced, so a new extract can be added year by year
+    @param path: directory of the dataset
+    '''
+    data = data.reset_index()
+    data["year"] = data["inspectiondate"].dt.year.astype("int32")
+    data["boro"] = data["boro"].astype(str)
+    data = data.sort_values(by = PARTITION_COLUMNS + SORT_COLUMNS)
+
+    partitioning = ds.partitioning(pa.schema([("year", pa.int32()), ("boro", pa.string())]), flavor = "hive")
+    ds.write_dataset(
+        pa.Table.from_pandas(data, preserve_index = False), path, format = "parquet", partitioning = partitioning,
+        existing_data_behavior = "delete_matching", max_rows_per_group = row_group_size,
+        min_rows_per_group = row_group_size, basename_template = "part-{i}.parquet"
+    )
+
+    # the catalog rows of the written partitions replace those saved before
+    catalog = make_catalog(data)
+    catalog_path = os.path.join(path, CATALOG_FILE)
+    if os.path.exists(catalog_path):
+        saved = pd.read_parquet(catalog_path)
+        written = pd.MultiIndex.from_frame(catalog[PARTITION_COLUMNS].drop_duplicates())
+        saved = saved[~pd.MultiIndex.from_frame(saved[PARTITION_COLUMNS]).isin(written)]
+        catalog = pd.concat([saved, catalog], ignore_index = True)
+
+    catalog.to_parquet(catalog_path, index = False)
+
+def make_catalog(data):
+    '''
+    Returns a DF of the distinct (year, boro, restaurant, zipcode, cuisine_primary) of data (with the columns year and boro
+    and the restaurant column) and their number of rows (column rows)
+    '''
+    catalog = data[PARTITION_COLUMNS + CATALOG_COLUMNS].astype({col: object for col in CATALOG_COLUMNS})
+    return catalog.groupby(PARTITION_COLUMNS + CATALOG_COLUMNS, dropna = False).size().rename("rows").reset_index()
+
+class PartitionedData(object):
+    '''
+    Query path over a dataset written by write_partitioned
+    '''
+
+    def __init__(self, path, max_bytes = QUERY_MAX_BYTES):
+        '''
+        Constructor
+        @param path: directory of the dataset
+        @param max_bytes: memory budget of the rows read by one visualizer query (see Visualizer.from_storage); None for no budget
+        '''
+        self.path = path
+        self.max_bytes = max_bytes
+        parquet_format = ds.ParquetFileFormat(read_options = {"dictionary_columns": CATEGORICAL_COLUMNS})
+        partitioning = ds.HivePartitioning.discover(infer_dictionary = True)
+        # other files saved in the directory (the time cube, the session state) are not part of the dataset
+        self.dataset = ds.dataset(path, format = parquet_format, partitioning = partitioning, exclude_invalid_files = True)
+
+    def make_filter(self, column = None, value = None, years = None):
+        '''
+        Returns the pyarrow filter expression for rows where column equals value (or is in value, a list), inspected in one of years
+        Conditions on the partition columns skip whole partitions; others skip row groups by their statistics
+        '''
+        conditions = []
+
+        if isinstance(value, list):
+            conditions.append(ds.field(column).isin(value))
+        elif column is not None:
+            conditions.append(ds.field(column) == value)
+
+        if years is not None:
+            conditions.append(ds.field("year").isin(list(years)))
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        return expression
+
+    def read(self, column = None, value = None, columns = None, years = None, max_bytes = None):
+        '''
+        Returns a DF indexed by restaurant of the rows where column equals value (all rows if column is None)
+        @param columns: columns to read (default: all); only these columns are read from disk, and columns
+        that are not stored (e.g. swc_type in a history written without the sidewalk data) are left out
+        @param years: iterable of inspection years to read (default: all)
+        @param max_bytes: memory budget for the result; raises MemoryError when the query would exceed it
+        '''
+        if columns is not None:
+            stored = self.dataset.schema.names
+            columns = ["restaurant"] + [col for col in columns if col != "restaurant" and col in stored]
+
+        scanner = self.dataset.scanner(columns = columns, filter = self.make_filter(column, value, years))
+
+        # stream the matching record batches, so that a query over the budget fails before it is materialized
+        batches, total_bytes = [], 0
+        for batch in scanner.to_batches():
+            total_bytes += batch.nbytes
+
+            if max_bytes is not None and total_bytes > max_bytes:
+                raise MemoryError("Query for {} = {} exceeds the memory budget of {} bytes".format(column, value, max_bytes))
+
+            batches.append(batch)
+
+        data = pa.Table.from_batches(batches, schema = scanner.projected_schema).to_pandas()
+        return data.set_index("restaurant")
+
+    def read_catalog(self):
+        '''
+        Returns a DF indexed by restaurant of the distinct (restaurant, zipcode, cuisine_primary) of the history, with
+        their number of rows (column rows), enough to validate user input without loading the history
+        Its size grows with the number of restaurants, not of inspections; a history written without a catalog is scanned
+        '''
+        catalog_path = os.path.join(self.path, CATALOG_FILE)
+
+        if os.path.exists(catalog_path):
+            catalog = pd.read_parquet(catalog_path)
+        else:
+            catalog = self.read(columns = CATALOG_COLUMNS).reset_index().assign(rows = 1)
+
+        catalog = catalog.astype({col: object for col in CATALOG_COLUMNS})
+        catalog = catalog.groupby(CATALOG_COLUMNS, dropna = False)["rows"].sum().reset_index()
+        return catalog.set_index("restaurant")
@@ -0,0 +1,197 @@
+# Author: Leslie Huang (lh1036)
+# Description: Monthly time cube of inspection scores and grades, used by the citywide trend dashboard.
+# The cube has one cell per (month, borough, cuisine) with the number of rows, the count and sum of
+# scores, and the number of A, B and C grades. It is built from restaurant_data in one pass, and every
+# trend (by borough, by cuisine, or citywide) is an aggregate of the cells, so drawing the dashboard
+# never scans row-level data. The cube is saved as a small CSV file next to the data and refreshed
+# incrementally: only the last stored month (which may have been partial) and newer months are rebuilt.
+# The file's first line holds the fingerprint of the rows the older cells were built from, and the cube
+# is rebuilt from scratch when those rows of the data have changed.
+
+import os
+import pandas as pd
+import numpy as np
+from .precomputed import set_derived
+
+CUBE_DIMENSIONS = ["month", "boro", "cuisine_primary"]
+# columns of restaurant_data the cube is built from
+CUBE_COLUMNS = ["inspectiondate", "boro", "cuisine_primary", "score", "grade"]
+GRADES = ["a", "b", "c"]
+TIME_CUBE_FILE = "time_cube.csv"
+
+def build_cells(data):
+    '''
+    Returns a DF with one row per (month, boro, cuisine_primary) of data, sorted by month,
+    and the columns rows, score_count, score_sum, grade_a, grade_b, grade_c
+    Rows without an inspection date are left out
+    '''
+    data = data[data["inspectiondate"].notna()]
+    scores = data["score"].values
+    grades = data["grade"].values
+
+    frame = pd.DataFrame({
+        "month": data["inspectiondate"].values.astype("datetime64[M]"),
+        "boro": np.asarray(data["boro"], dtype = object),
+        "cuisine_primary": np.asarray(data["cuisine_primary"], dtype = object),
+        "rows": np.ones(len(data), dtype = np.int64),
+        "score_count": ~np.isnan(scores),
+        "score_sum": np.nan_to_num(scores),
+    })
+    for grade in GRADES:
+        frame["grade_" + grade] = grades == grade
+
+    cells = frame.groupby(CUBE_DIMENSIONS, sort = True, dropna = False).sum().reset_index()
+    cells["month"] = cells["month"].astype("datetime64[ns]")
+    return cells
+
+def rows_fingerprint(data, before):
+    '''
+    Returns a fingerprint (str) of the cube columns of the rows of data inspected before the month before
+    It is the number of rows and the sum of their hashes, so it doesn't depend on the order of the rows
+    '''
+    rows = data.loc[data["inspectiondate"] < before, CUBE_COLUMNS]
+    hashes = pd.util.hash_pandas_object(rows, index = False).values
+    return "{}-{:016x}".format(len(rows), int(hashes.sum(dtype = np.uint64)))
+
+class TimeCube(object):
+    '''
+    Monthly counts and sums of scores and grades by borough and cuisine
+    '''
+
+    def __init__(self, data = None, cells = None, fingerprint = None):
+        '''
+        Constructor
+        @param data: restaurant_data DF to build the cube from
+        @param cells: or the cells of an already-built cube (see build_cells)
+        @param fingerprint: with cells, the rows_fingerprint of the rows before the cube's last month (None if unknown)
+        '''
+        if cells is None:
+            self.cells = build_cells(data)
+            self.fingerprint = rows_fingerprint(data, self.last_month())
+        else:
+            self.cells = cells
+            self.fingerprint = fingerprint
+
+    @classmethod
+    def load(cls, path):
+        '''
+        Returns the TimeCube saved in the CSV file path
+        '''
+        with open(path) as file:
+            header = file.readline()
+            fingerprint = header[len("# fingerprint "):].strip() if header.startswith("# fingerprint ") else None
+
+            # files saved without a fingerprint start with the cells
+            if fingerprint is None:
+                file.seek(0)
+
+            cells = pd.read_csv(file, dtype = {"boro": object, "cuisine_primary": object}, parse_dates = ["month"])
+
+        return cls(cells = cells, fingerprint = fingerprint)
+
+    def save(self, path):
+        '''
+        Writes the fingerprint and the cells to the CSV file path
+        '''
+        with open(path, "w", newline = "") as file:
+            file.write("# fingerprint {}\n".format(self.fingerprint))
+            self.cells.to_csv(file, index = False)
+
+    def last_month(self):
+        '''
+        Returns the last month in the cube (pd.Timestamp.min if it is empty)
+        '''
+        return self.cells["month"].max() if len(self.cells) else pd.Timestamp.min
+
+    def matches(self, data):
+        '''
+        Returns True if the cells before the cube's last month were built from the same rows as those of data,
+        so that the cube can be refreshed with update instead of rebuilt
+        '''
+        return self.fingerprint is not None and self.fingerprint == rows_fingerprint(data, self.last_month())
+
+    def months(self):
+        '''
+        Returns a DatetimeIndex of the months in the cube (first day of each month)
+        '''
+        return pd.DatetimeIndex(self.cells["month"].unique()).sort_values()
+
+    def update(self, data):
+        '''
+        Rebuilds the cells of the cube's last month and of newer months from data, keeping older cells
+        Only valid if the rows of data before the cube's last month are those the cube was built from (see matches)
+        Returns the list of rebuilt months
+        '''
+        start = self.last_month()
+
+        new_cells = build_cells(data[data["inspectiondate"] >= start])
+        self.cells = pd.concat([self.cells[self.cells["month"] < start], new_cells], ignore_index = True)
+
+        if self.last_month() != start:
+            self.fingerprint = rows_fingerprint(data, self.last_month())
+
+        return list(pd.DatetimeIndex(new_cells["month"].unique()).sort_values())
+
+    def aggregate(self, by = None, values = None):
+        '''
+        Returns a DF of the summed cells indexed by month, or by (month, value of by) if by is given
+        @param by: "boro", "cuisine_primary" or None (citywide)
+        @param values: restrict to these values of by
+        '''
+        cells = self.cells
+        if values is not None:
+            cells = cells[cells[by].isin(values)]
+
+        keys = ["month"] if by is None else ["month", by]
+        return cells.drop(columns = [col for col in CUBE_DIMENSIONS if col not in keys]).groupby(keys).sum()
+
+    def top_values(self, by, k):
+        '''
+        Returns a list of the k values of by with the most rows
+        '''
+        return list(self.cells.groupby(by)["rows"].sum().nlargest(k).index)
+
+    def mean_scores(self, by = None, values = None):
+        '''
+        Returns a DF of mean scores (index: month; columns: values of by, or "score" if by is None)
+        Months without scores are NaN
+        '''
+        sums = self.aggregate(by, values)
+        means = sums["score_sum"] / sums["score_count"].replace(0, np.nan)
+
+        if by is None:
+            return means.to_frame("score")
+
+        return means.unstack(by)
+
+    def grade_shares(self, by = None, values = None, grade = None):
+        '''
+        Returns a DF of the share of each grade among the A, B and C grades awarded (index: month; columns: grades),
+        or if grade is given, the share of that grade (columns: values of by)
+        '''
+        sums = self.aggregate(by, values)
+        counts = sums[["grade_" + g for g in GRADES]]
+        shares = counts.div(counts.sum(axis = 1).replace(0, np.nan), axis = 0)
+        shares.columns = GRADES
+
+        if grade is None:
+            return shares
+
+        return shares[grade].unstack(by) if by is not None else shares[[grade]]
+
+def load_time_cube(data, path):
+    '''
+    Returns the TimeCube of data, loaded from the CSV file path if it was saved from the same rows of data before
+    its last month and refreshed with the months of data from that month on (otherwise built from data), then saved to path
+    The cube is registered as derived from data, so visualizers on data use it
+    '''
+    cube = TimeCube.load(path) if os.path.exists(path) else None
+
+    if cube is not None and cube.matches(data):
+        cube.update(data)
+    else:
+        cube = TimeCube(data)
+
+    cube.save(path)
+    set_derived(data, "time_cube", cube)
+    return cube
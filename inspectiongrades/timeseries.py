@@ -0,0 +1,86 @@
+# Author: Leslie Huang (lh1036)
+# Description: Prepares inspection scores for the timeseries graphs.
+# Rows are collapsed to one point per inspection date, optionally resampled to monthly/quarterly
+# rolling means, and capped to a maximum number of points with LTTB downsampling, so the
+# size of a timeseries graph does not grow with the number of inspections.
+
+import pandas as pd
+import numpy as np
+
+MAX_POINTS = 200
+
+def collapse_inspections(data):
+    '''
+    Returns a Series of mean inspection score per inspection date, sorted by date
+    (the dataset has one row per inspection, but a restaurant with several branches or several inspections
+    on the same day has more than one row per date)
+    '''
+    scores = data[["inspectiondate", "score"]].dropna()
+    return scores.groupby("inspectiondate")["score"].mean()
+
+def resample_scores(scores, freq, window = None):
+    '''
+    Returns a Series of mean scores per period (e.g. freq = "M" for monthly, "Q" for quarterly)
+    @param scores: Series of scores indexed by date
+    @param window: if given, smooth with a rolling mean over this many periods
+    Periods without inspections are dropped
+    '''
+    resampled = scores.resample(freq).mean().dropna()
+
+    if window is not None:
+        resampled = resampled.rolling(window, min_periods = 1).mean()
+
+    return resampled
+
+def lttb_downsample(scores, max_points):
+    '''
+    Returns scores downsampled to at most max_points with the Largest-Triangle-Three-Buckets algorithm,
+    which keeps the first and last points and the visually important peaks and troughs in between
+    @param scores: Series of scores indexed by date, sorted by date
+    '''
+    n = len(scores)
+    if max_points >= n or max_points < 3:
+        return scores
+
+    x = scores.index.values.astype(np.int64).astype(float)
+    y = scores.values.astype(float)
+
+    # the first and last points are always kept; the others are split into max_points - 2 buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    selected = np.empty(max_points, dtype = int)
+    selected[0], selected[-1] = 0, n - 1
+
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # average of the next bucket (or the last point) is the third vertex of the triangle
+        if i < max_points - 3:
+            next_x, next_y = x[end:edges[i + 2]].mean(), y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        prev_x, prev_y = x[selected[i]], y[selected[i]]
+
+        # keep the point in this bucket that forms the largest triangle with the previous and next vertices
+        areas = np.abs((prev_x - next_x) * (y[start:end] - prev_y) - (prev_x - x[start:end]) * (next_y - prev_y))
+        selected[i + 1] = start + np.argmax(areas)
+
+    return scores.iloc[selected]
+
+def prepare_timeseries(data, freq = None, window = None, max_points = MAX_POINTS):
+    '''
+    Returns a Series of scores indexed by date, ready for plotting
+    @param data: DF of inspection rows with "inspectiondate" and "score" columns
+    @param freq: resample to this frequency (e.g. "M" or "Q"); None keeps one point per inspection date
+    @param window: rolling mean window (in periods), used with freq
+    @param max_points: cap on the number of plotted points; None for no cap
+    '''
+    scores = collapse_inspections(data)
+
+    if freq is not None:
+        scores = resample_scores(scores, freq, window)
+
+    if max_points is not None:
+        scores = lttb_downsample(scores, max_points)
+
+    return scores
@@ -0,0 +1,137 @@
+# Author: Leslie Huang (lh1036)
+# Description: Per-restaurant trend features, for the most improved and most declined restaurants.
+# For every restaurant within each cuisine and zipcode: the number of inspections, the latest score,
+# the mean of the last TREND_WINDOW scores, the slope of the scores over time (points per year) and
+# the days since the last inspection. They are computed for all restaurants at once: the rows are
+# sorted by (group, restaurant, date) and every window is a difference of cumulative sums or a
+# weighted bincount over the sorted rows, with no per-restaurant loop. The features are saved with the
+# session state (see sessionstate), and queries only select from the table.
+
+import pandas as pd
+import numpy as np
+from .chartdata import factorize_sorted
+
+# number of most recent inspections in the rolling mean
+TREND_WINDOW = 5
+
+FEATURE_COLUMNS = ["count", "latest_score", "rolling_mean", "slope", "last_inspection", "days_since_last"]
+
+def build_features(data, column, window = TREND_WINDOW, reference_date = None):
+    '''
+    Returns a DF with one row per (value of column, restaurant), sorted by both, with the columns
+    group, restaurant and FEATURE_COLUMNS
+    Rows of a restaurant with the same date count as one inspection (data with one row per violation repeats
+    the inspection's score), whose score is their mean; rows without a score or date are left out
+    @param data: restaurant_data DF, indexed by restaurant name
+    @param column: "cuisine_primary" or "zipcode"
+    @param reference_date: date from which days_since_last is counted (default: the latest inspection in data)
+    '''
+    scores = data["score"].to_numpy(dtype = float)
+    dates = data["inspectiondate"].values
+    group_codes, groups = factorize_sorted(data[column])
+    name_codes, names = factorize_sorted(data.index)
+
+    keep = ~np.isnan(scores) & ~np.isnat(dates) & (group_codes >= 0) & (name_codes >= 0)
+    scores, dates = scores[keep], dates[keep]
+    pairs = group_codes[keep].astype(np.int64) * len(names) + name_codes[keep]
+
+    # sort by (group, restaurant, date) and average the rows of each inspection date
+    order = np.lexsort((dates, pairs))
+    pairs, dates, scores = pairs[order], dates[order], scores[order]
+    is_first = np.ones(len(pairs), dtype = bool)
+    is_first[1:] = (pairs[1:] != pairs[:-1]) | (dates[1:] != dates[:-1])
+    starts = np.flatnonzero(is_first)
+    if len(starts):
+        scores = np.add.reduceat(scores, starts) / np.diff(np.append(starts, len(pairs)))
+    pairs, dates = pairs[starts], dates[starts]
+
+    # the inspections of each (group, restaurant) are now contiguous
+    codes, unique_pairs = pd.factorize(pairs, sort = True)
+    counts = np.bincount(codes, minlength = len(unique_pairs))
+    ends = np.cumsum(counts)
+    lasts = ends - 1
+
+    # mean of the last window scores: difference of the cumulative sums at the window's bounds
+    cumulative = np.concatenate([[0.], np.cumsum(scores)])
+    window_starts = np.maximum(ends - counts, ends - window)
+    rolling_means = (cumulative[ends] - cumulative[window_starts]) / (ends - window_starts)
+
+    # least squares slope of score on time, with the times centred on each restaurant's mean time
+    years = (dates - dates.min()) / np.timedelta64(1, "D") / 365.25 if len(dates) else np.array([])
+    centred = years - (np.bincount(codes, years, len(unique_pairs)) / np.maximum(counts, 1))[codes]
+    variances = np.bincount(codes, centred * centred, len(unique_pairs))
+    with np.errstate(invalid = "ignore", divide = "ignore"):
+        slopes = np.where(variances > 0, np.bincount(codes, centred * scores, len(unique_pairs)) / variances, np.nan)
+
+    last_dates = dates[lasts]
+    if reference_date is None:
+        reference_date = dates.max() if len(dates) else np.datetime64("NaT")
+
+    return pd.DataFrame({
+        "group": np.asarray(groups, dtype = object)[unique_pairs // len(names)],
+        "restaurant": np.asarray(names, dtype = object)[unique_pairs % len(names)],
+        "count": counts,
+        "latest_score": scores[lasts],
+        "rolling_mean": rolling_means,
+        "slope": slopes,
+        "last_inspection": last_dates,
+        "days_since_last": ((np.datetime64(pd.Timestamp(reference_date), "ns") - last_dates) / np.timedelta64(1, "D")).astype(np.int64),
+    })
+
+class TrendFeatures(object):
+    '''
+    Trend features of every restaurant within each cuisine and zipcode, queried for the most improved and most
+    declined restaurants of a group
+    Remember, lower is better! A negative slope means fewer violations over time
+    '''
+
+    group_columns = ["cuisine_primary", "zipcode"]
+
+    def __init__(self, data, window = TREND_WINDOW):
+        '''
+        Constructor
+        @param data: restaurant_data DF to compute the features from, indexed by restaurant name
+        @param window: number of most recent inspections in the rolling mean
+        '''
+        self.window = window
+
+        # one reference date for every group, so that days_since_last is comparable across them
+        reference_date = data["inspectiondate"][data["score"].notna()].max()
+        table = pd.concat([
+            build_features(data, col, window, reference_date).assign(by = col)
+            for col in self.group_columns if col in data.columns
+        ], ignore_index = True)
+
+        self.table = table[["by", "group", "restaurant"] + FEATURE_COLUMNS]
+
+        # rows of each (column, value), so that a query is a slice of the table
+        self.positions = {key: positions for key, positions in self.table.groupby(["by", "group"], sort = False).indices.items()}
+
+    def get_features(self, column, value):
+        '''
+        Returns a DF (index: restaurant; columns: FEATURE_COLUMNS) of the restaurants where column equals value
+        e.g. get_features("cuisine_primary", "thai")
+        '''
+        positions = self.positions.get((column, value), [])
+        return self.table.iloc[positions].set_index("restaurant")[FEATURE_COLUMNS]
+
+    def top_movers(self, k, minimum_obs, improved = True, column = None, value = None):
+        '''
+        Returns a DF (index: restaurant; columns: FEATURE_COLUMNS) of the k restaurants of the group whose scores fell
+        (improved) or rose (declined) the fastest, fastest first; ties keep alphabetical order
+        @param minimum_obs: restrict to restaurants with at least this many inspections
+        '''
+        features = self.get_features(column, value)
+        slopes = features["slope"]
+        features = features[(features["count"] >= minimum_obs) & ((slopes < 0) if improved else (slopes > 0))]
+
+        return features.nsmallest(k, "slope") if improved else features.nlargest(k, "slope")
+
+    def improved_and_declined(self, k, minimum_obs, column = None, value = None):
+        '''
+        Returns a tuple (DF of the k most improved restaurants, DF of the k most declined restaurants)
+        '''
+        return (
+            self.top_movers(k, minimum_obs, True, column, value),
+            self.top_movers(k, minimum_obs, False, column, value)
+        )
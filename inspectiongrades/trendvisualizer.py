@@ -0,0 +1,105 @@
+# Author: Leslie Huang (lh1036)
+# Attributes and methods for the trend visualizer: a citywide dashboard of monthly mean scores
+# and grade mix by borough and by the top cuisine categories, drawn from the monthly time cube
+
+import pandas as pd
+import numpy as np
+from .visualizer import Visualizer
+from .precomputed import get_derived
+from .timecube import TimeCube
+from .chartdata import VALID_BOROS
+
+class TrendGrades(Visualizer):
+    __slots__ = ("top_cuisines",)
+
+    def __init__(self, data, top_cuisines = 6, renderer = None):
+        '''
+        Constructor
+        @param top_cuisines: number of cuisine categories (those with the most inspection rows) shown in the dashboard
+        '''
+        super(TrendGrades, self).__init__(data, renderer)
+        self.top_cuisines = top_cuisines
+
+    ### Class methods for subsetting and returning the data
+
+    def get_time_cube(self):
+        '''
+        Returns the TimeCube of the full dataset (built once and shared by every query on it,
+        or loaded from disk with timecube.load_time_cube)
+        '''
+        return get_derived(self.data, "time_cube", TimeCube)
+
+    def get_groups(self, by):
+        '''
+        Returns the list of values of by ("boro" or "cuisine_primary") shown in the dashboard
+        '''
+        if by == "boro":
+            # boroughs are stored in lowercase
+            return [boro.lower() for boro in VALID_BOROS]
+
+        return self.get_time_cube().top_values("cuisine_primary", self.top_cuisines)
+
+    def get_trends(self, by):
+        '''
+        Returns a tuple (DF of monthly mean scores, DF of monthly share of A grades) with one column per group of by,
+        labeled for display
+        '''
+        cube = self.get_time_cube()
+        groups = self.get_groups(by)
+        trends = cube.mean_scores(by, groups), cube.grade_shares(by, groups, "a")
+
+        for trend in trends:
+            trend.columns = self.get_display_labels(by, trend.columns)
+
+        return trends
+
+    ### Class methods for visualizing the data
+
+    def graph_trends(self, by):
+        '''
+        Line graphs of the monthly mean inspection violations score (top) and share of A grades (bottom),
+        one line per borough or per top cuisine category
+        '''
+        names = {"boro": "Borough", "cuisine_primary": "Cuisine Category"}
+        means, a_shares = self.get_trends(by)
+
+        fig, (ax_means, ax_shares) = self.renderer.new_axes(figsize = (10, 8), nrows = 2)
+        means.plot(ax = ax_means)
+        a_shares.plot(ax = ax_shares, legend = False)
+
+        ax_means.set_ylabel("Mean Inspection Violations Score")
+        ax_means.set_xlabel("")
+        ax_means.set_title("Monthly Inspection Violations and Grades by {}".format(names[by]))
+        ax_means.legend(loc = "upper left", fontsize = "small", ncol = 2)
+        ax_shares.set_ylabel("Share of A Grades")
+        ax_shares.set_xlabel("Month")
+
+        return self.renderer.save(fig, "NYC_trends_by_{}.pdf".format(names[by].lower().replace(" ", "_")))
+
+    def graph_grade_mix(self):
+        '''
+        Stacked area graph of the monthly citywide share of A, B and C grades
+        '''
+        shares = self.get_time_cube().grade_shares()
+        shares.columns = self.get_display_labels("grade", shares.columns)
+
+        fig, ax = self.renderer.new_axes()
+        shares.fillna(0).plot(kind = "area", ax = ax, stacked = True, color = ["g", "y", "r"])
+        ax.set_ylim(0, 1)
+        ax.set_ylabel("Share of Grades Awarded")
+        ax.set_xlabel("Month")
+        ax.set_title("Monthly Citywide Grade Mix")
+        ax.legend(loc = "lower left")
+
+        return self.renderer.save(fig, "NYC_grade_mix_trend.pdf")
+
+    def make_graphs(self):
+        '''
+        Calls all graphing methods for this class
+        Returns a list of the saved file names
+        '''
+        return [
+            self.graph_trends("boro"),
+            self.graph_trends("cuisine_primary"),
+            self.graph_grade_mix()
+        ]
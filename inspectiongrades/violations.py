@@ -0,0 +1,106 @@
+# Author: Leslie Huang (lh1036)
+# Description: Violation code profiles of cuisines and zipcodes.
+# The violation codes cited at each inspection are held in a sparse inspection x violation code
+# matrix, built in one pass over the violations table. The number of inspections of every cuisine
+# (or zipcode) citing each code is then one sparse product of a group indicator matrix with that
+# matrix, so the profiles of all the groups are computed in one batch, without scanning the rows of
+# each group. A code's rate is the share of a group's inspections that cited it; the citywide rates
+# are the baseline the groups are compared with.
+
+import pandas as pd
+import numpy as np
+import scipy.sparse as sparse
+
+GROUP_COLUMNS = ["cuisine_primary", "zipcode"]
+
+class ViolationProfiles(object):
+    '''
+    Rates of each violation code per cuisine and per zipcode, and citywide
+    '''
+
+    def __init__(self, data, violations = None, group_columns = GROUP_COLUMNS):
+        '''
+        Constructor
+        @param data: restaurant_data DF
+        @param violations: DF of (inspection_id, violationcode) as returned by clean_data(keep_violations = True),
+        for data with one row per inspection; if None, data must have one row per violation with a violationcode column
+        (inspections are then identified by restaurant and inspection date, and empty codes mark inspections without violations)
+        @param group_columns: columns whose groups get a profile; columns missing from data are skipped
+        '''
+        if violations is None:
+            restaurant_codes = pd.factorize(data.index)[0].astype(np.int64)
+            date_codes, dates = pd.factorize(data["inspectiondate"])
+            inspection_of_row = pd.factorize(restaurant_codes * (len(dates) + 1) + date_codes)[0]
+            cited = np.asarray(data["violationcode"].notna() & (data["violationcode"] != ""))
+            violation_inspections, violation_codes = inspection_of_row[cited], data["violationcode"].values[cited]
+        else:
+            inspection_of_row = pd.factorize(data["inspection_id"])[0]
+            ids = data["inspection_id"].values[np.unique(inspection_of_row, return_index = True)[1]]
+            violation_inspections = pd.Index(ids).get_indexer(violations["inspection_id"])
+            kept = violation_inspections >= 0
+            violation_inspections, violation_codes = violation_inspections[kept], violations["violationcode"].values[kept]
+
+        # one row per inspection (the first row of each), one column per violation code; each cell counts once
+        n_inspections = inspection_of_row.max() + 1 if len(inspection_of_row) else 0
+        first_rows = np.unique(inspection_of_row, return_index = True)[1]
+        code_columns, self.codes = pd.factorize(pd.Series(violation_codes, dtype = object), sort = True)
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(code_columns)), (violation_inspections, code_columns)), shape = (n_inspections, len(self.codes))
+        )
+        self.matrix.data[:] = 1
+
+        self.baseline = np.asarray(self.matrix.sum(axis = 0)).ravel() / max(n_inspections, 1)
+        self.groups = {}
+
+        for col in group_columns:
+            if col in data.columns:
+                self.groups[col] = self._make_profiles(data[col].values[first_rows])
+
+    def _make_profiles(self, group_values):
+        '''
+        Returns a tuple (Index of groups, array of inspections per group, sparse matrix of inspections citing each code per group)
+        @param group_values: value of the group column of each inspection
+        '''
+        group_rows, groups = pd.factorize(pd.Series(group_values, dtype = object))
+        has_group = group_rows >= 0
+        indicator = sparse.csr_matrix(
+            (np.ones(has_group.sum()), (group_rows[has_group], np.flatnonzero(has_group))), shape = (len(groups), len(group_rows))
+        )
+
+        return pd.Index(groups), np.asarray(indicator.sum(axis = 1)).ravel(), indicator @ self.matrix
+
+    def get_rates(self, column = None, value = None):
+        '''
+        Returns a Series (index: violation code) of the share of inspections citing each code,
+        citywide or within one group, e.g. get_rates("cuisine_primary", "thai")
+        '''
+        if column is None:
+            return pd.Series(self.baseline, index = self.codes)
+
+        groups, inspections, counts = self.groups[column]
+        position = groups.get_indexer([value])[0]
+
+        if position < 0 or inspections[position] == 0:
+            return pd.Series(0., index = self.codes)
+
+        return pd.Series(counts[position].toarray().ravel() / inspections[position], index = self.codes)
+
+    def get_profiles(self, column):
+        '''
+        Returns a DF (index: groups of column; columns: violation codes) of the rates of every group, in one batch
+        '''
+        groups, inspections, counts = self.groups[column]
+
+        with np.errstate(invalid = "ignore", divide = "ignore"):
+            rates = counts.toarray() / inspections[:, np.newaxis]
+
+        return pd.DataFrame(rates, index = groups, columns = self.codes)
+
+    def top_violations(self, column, value, k):
+        '''
+        Returns a DF (index: violation code; columns: rate, citywide, ratio) of the k codes most often cited
+        within the group, most frequent first; ratio is the group's rate over the citywide rate
+        '''
+        rates = pd.DataFrame({"rate": self.get_rates(column, value), "citywide": self.get_rates()})
+        top = rates[rates["rate"] > 0].sort_values(by = "rate", ascending = False, kind = "mergesort").iloc[:k]
+        return top.assign(ratio = top["rate"] / top["citywide"])
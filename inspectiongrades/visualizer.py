@@ -1,18 +1,86 @@
 # Author: Leslie Huang (lh1036)
 # Attributes and methods for the Visualizer class, a superclass of the cuisine, restaurant, and zipcode visualizers
 
-from string import capwords
+import copy
 import pandas as pd
+import numpy as np
+from string import capwords
+from .boxstats import BoxStats
+from .chartdata import VALID_GRADES
+from .labels import make_display_labels, get_display_labels
+from .precomputed import get_derived, has_derived
+from .ranking import RestaurantRanking
+from .rendering import default_context
+from .sampling import StratifiedSample
+from .trendfeatures import TrendFeatures
+from .violations import ViolationProfiles
+
+# groups with at least this many rows are previewed from the stratified sample before their exact graphs are rendered
+PREVIEW_MIN_ROWS = 20000
 
 class Visualizer(object):
-    def __init__(self, data):
+    # a visualizer is created for every query, so keep instances small
+    __slots__ = ("data", "renderer", "sample")
+    
+    # columns used by the graphs; a query on partitioned storage reads only these
+    storage_columns = ("boro", "zipcode", "cuisine_primary", "inspectiondate", "score", "grade", "swc_type", "address_id")
+    
+    def __init__(self, data, renderer = None):
+        '''
+        Constructor
+        @param data: the full restaurant_data DF
+        @param renderer: RenderContext that provides and saves the figures (default: one shared context)
+        '''
         self.data = data
+        self.renderer = renderer or default_context
+        self.sample = None
+    
+    @classmethod
+    def from_storage(cls, key, storage, years = None, max_bytes = None, **kwargs):
+        '''
+        Returns a visualizer for key (e.g. a cuisine name) whose data is read from partitioned storage
+        Only the rows of key (see storage_filter) and the storage_columns are read
+        @param storage: a storage.PartitionedData
+        @param years: iterable of inspection years to read (default: all)
+        @param max_bytes: memory budget for the rows read (default: the storage's max_bytes); MemoryError is raised
+        if the query exceeds it
+        @param kwargs: other arguments of the constructor, e.g. renderer
+        '''
+        query = cls(key, None, **kwargs)
+        column, value = query.storage_filter()
+        max_bytes = storage.max_bytes if max_bytes is None else max_bytes
+        query.data = storage.read(column, value, cls.storage_columns, years, max_bytes)
+        return query
     
     def filter_data(self, data):
         '''
         Each child class will override this method with a custom filter_data
         '''
         return data
+    
+    def get_sample(self):
+        '''
+        Returns the StratifiedSample of the full dataset (drawn once and shared by every query on it)
+        '''
+        return get_derived(self.data, "sample", StratifiedSample)
+    
+    def needs_preview(self, min_rows = PREVIEW_MIN_ROWS):
+        '''
+        Returns True if the query's group (its cuisine or zipcode) has at least min_rows rows,
+        so that an approximate preview is worth rendering before the exact graphs
+        '''
+        group = self.ranking_group()
+        return group is not None and self.get_sample().count(*group) >= min_rows
+    
+    def get_preview(self):
+        '''
+        Returns a copy of this query whose data is the stratified sample of the dataset
+        Its graphs are approximate; graphs of means are drawn with 95% confidence intervals
+        '''
+        preview = copy.copy(self)
+        preview.sample = self.get_sample()
+        preview.data = preview.sample.data
+        return preview
         
     ### Classmethods that subset, sort, and perform calculations on data to prepare for graphing
     
@@ -21,11 +89,46 @@ class Visualizer(object):
         @param data: Automatically set to the filtered base dataset for each class
         @param column_name: The column we are using to filter observations
         @param valid_values: A list of valid values for observations in column_name (others will be dropped)
-        Also formats capitalization of the values (because dataframe is all lowercase)
+        Also formats capitalization of the values (because dataframe is all lowercase): the column is returned
+        as a categorical of display labels, which are only computed for its categories
         '''
         data = self.filter_data(self.data)
-        data[column_name] = data[column_name].apply(capwords)
-        return data[data[column_name].isin(valid_values)]
+        values = data[column_name]
+        
+        # filter on the integer codes of the column's categories (missing values have code -1)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, categories = values.cat.codes.values, values.cat.categories
+        else:
+            codes, categories = pd.factorize(values, sort = True)
+        
+        labels = self.get_display_labels(column_name, categories)
+        is_valid = np.append(labels.isin(valid_values), False)[codes]
+        
+        formatted = pd.Categorical.from_codes(codes[is_valid], categories = labels).remove_unused_categories()
+        return data[is_valid].assign(**{column_name: formatted})
+    
+    def get_display_labels(self, column_name, values):
+        '''
+        Returns an Index of display labels (capitalized) for values of column_name
+        Labels of categorical columns are computed once per dataset and shared by every query on it
+        '''
+        labels = get_derived(self.data, "display_labels", make_display_labels).get(column_name)
+        return get_display_labels(values, labels)
+        
+    def grade_counts(self):
+        '''
+        Returns a Series (index: display labels of the valid grades) of the number of times each grade was awarded,
+        most frequent first
+        '''
+        data = self.filter_data_valid_values("grade", VALID_GRADES)
+        return data["grade"].value_counts()
+    
+    def get_chart_data(self):
+        '''
+        Each child class will override this method to return the numbers behind its graphs, as a dict
+        {chart name: list of records {"label": ..., "value": ...}} (see chartdata.make_records)
+        '''
+        return {}
         
     def calculate_mean_by_restaurant(self):
         '''
@@ -43,8 +146,8 @@ class Visualizer(object):
         '''
         
         data = self.filter_data(self.data)
-        grouped = data.groupby("cuisine_primary").mean()
-        grouped.index = pd.Index(capwords(cuisine) for cuisine in grouped.index)
+        grouped = self.mean_scores(data.groupby("cuisine_primary", observed = True)["score"])
+        grouped.index = self.get_display_labels("cuisine_primary", grouped.index)
         return grouped.sort_values(by = "score")
     
     def group_by_sidewalk(self):
@@ -53,7 +156,113 @@ class Visualizer(object):
         '''
         data = self.filter_data(self.data)
         
-        return data.groupby("swc_type").mean()
+        return self.mean_scores(data.groupby("swc_type", observed = True)["score"])
+    
+    def mean_scores(self, grouped):
+        '''
+        Returns a DF of the mean score of each group of grouped (a SeriesGroupBy of scores)
+        In a preview, the column error holds the half-width of the 95% confidence interval of each mean
+        '''
+        means = grouped.mean().to_frame("score")
+        
+        if self.sample is not None:
+            means["error"] = self.sample.margin_of_error(grouped)
+        
+        return means
+    
+    def get_box_stats(self, within, value, by):
+        '''
+        Returns a dict {value of by: box statistics} of the scores where column within equals value
+        The statistics are computed once for the full dataset and shared by every query on it (see boxstats.BoxStats)
+        '''
+        return get_derived(self.data, "box_stats", BoxStats).get_stats(within, value, by)
+    
+    def get_largest_boxes(self, within, value, by, max_boxes):
+        '''
+        Returns a tuple (list of values of by, list of their box statistics) of the max_boxes groups
+        with the most scores, sorted by value
+        '''
+        stats = self.get_box_stats(within, value, by)
+        largest = sorted(stats, key = lambda key: -stats[key]["count"])[:max_boxes]
+        return sorted(largest), [stats[key] for key in sorted(largest)]
+    
+    def has_violation_codes(self):
+        '''
+        Returns True if the violation codes of the dataset are available: either its violation profiles were
+        registered (data with one row per inspection, see main), or it has one row per violation with their codes
+        '''
+        return has_derived(self.data, "violation_profiles") or "violationcode" in self.data.columns
+    
+    def get_violation_profiles(self):
+        '''
+        Returns the ViolationProfiles of the full dataset (built once and shared by every query on it)
+        '''
+        return get_derived(self.data, "violation_profiles", ViolationProfiles)
+    
+    def get_top_violations(self, k):
+        '''
+        Returns a DF (index: violation code; columns: rate, citywide, ratio) of the k violation codes most often
+        cited in the ranking group (the cuisine or zipcode), with their citywide rates
+        '''
+        column, value = self.ranking_group() or (None, None)
+        return self.get_violation_profiles().top_violations(column, value, k)
+    
+    def ranking_group(self):
+        '''
+        Each child class that ranks restaurants within one group (cuisine or zipcode) overrides this
+        method to return (column, value). Returns None to rank over all restaurants.
+        '''
+        return None
+    
+    def storage_filter(self):
+        '''
+        Returns (column, value) of the rows a query reads from partitioned storage
+        Defaults to the ranking group (the cuisine or zipcode); child classes can override it
+        '''
+        return self.ranking_group() or (None, None)
+    
+    def get_name(self):
+        '''
+        Each child class overrides this method to return the formatted name of its query (e.g. "Thai" or "10011"),
+        used in titles and file names
+        '''
+        return "NYC"
+    
+    def describe_restaurants(self):
+        '''
+        Returns the restaurants of the query as worded in titles, e.g. "Restaurants in 10011"
+        '''
+        return "Restaurants in {}".format(self.get_name())
+    
+    def get_ranking(self):
+        '''
+        Returns the RestaurantRanking of the full dataset (built once and shared by every query on it)
+        '''
+        return get_derived(self.data, "ranking", RestaurantRanking)
+    
+    def get_top_restaurants(self, k, minimum_obs, tie_breaker = "count"):
+        '''
+        Returns a tuple (DF of k best restaurants, DF of k worst restaurants) with mean score and count
+        @param minimum_obs: restrict to restaurants below a certain threshold of inspections (outliers)
+        Used in zipvisualizer and cuisinevisualizer
+        '''
+        column, value = self.ranking_group() or (None, None)
+        return self.get_ranking().best_and_worst(k, minimum_obs, column, value, tie_breaker)
+    
+    def get_trend_features(self):
+        '''
+        Returns the TrendFeatures of the full dataset (computed once and shared by every query on it)
+        '''
+        return get_derived(self.data, "trend_features", TrendFeatures)
+    
+    def get_improved_and_declined(self, k, minimum_obs):
+        '''
+        Returns a tuple (DF of the k most improved restaurants, DF of the k most declined restaurants) of the ranking group,
+        with their trend features (see trendfeatures.TrendFeatures)
+        Used in zipvisualizer and cuisinevisualizer
+        '''
+        column, value = self.ranking_group() or (None, None)
+        return self.get_trend_features().improved_and_declined(k, minimum_obs, column, value)
     
     def get_best_and_worst_names(self, minimum_obs):
         '''
@@ -62,14 +271,8 @@ class Visualizer(object):
         Used in zipvisualizer and cuisinevisualizer
         Note: If there is only 1 restaurant in a zipcode or cuisine category, it will be returned as BOTH the best and worst restaurant!
         '''
-        data = self.filter_data(self.data)
-        
-        # get names of highest and lowest restaurants and filter out restaurants without enough obs
-        grouped = data.groupby(data.index).agg(["mean", "count"])["score"]
-        grouped = grouped.reset_index()
-        grouped = grouped.sort_values(by = "mean")
-        grouped = grouped[grouped["count"] >= minimum_obs]
-        return [grouped.restaurant.iloc[0], grouped.restaurant.iloc[-1]]
+        best, worst = self.get_top_restaurants(1, minimum_obs)
+        return [best.index[0], worst.index[0]]
                 
     def get_best_and_worst_data(self, minimum_obs):
         '''
@@ -81,9 +284,92 @@ class Visualizer(object):
         
         # get the best and worst restaurants' names and DF
         best_name, worst_name = self.get_best_and_worst_names(minimum_obs)
-        data = data[data.index.isin(self.get_best_and_worst_names(minimum_obs))]
+        data = data[data.index.isin([best_name, worst_name])]
         data = data.sort_values(by = "inspectiondate") # sorting needed for timeseries line graph
         
         return (data[data.index.isin([best_name])], data[data.index.isin([worst_name])])
     
-    
\ No newline at end of file
+    ### Graphs drawn the same way by the child classes, labelled with get_name and describe_restaurants
+    
+    def graph_paired_barh(self, pairs, xlabel, suptitle, note, file_name, left = 0.2):
+        '''
+        Draws two horizontal bar graphs side by side (e.g. the best and the worst restaurants) and saves the figure
+        Returns the saved file name
+        @param pairs: two tuples (Series of values indexed by bar label, color, title), each drawn with its first bar at the top
+        @param xlabel: label of both x axes
+        @param note: text at the bottom of the figure
+        @param left: left margin of the figure, for long bar labels
+        '''
+        fig, axes = self.renderer.new_axes(figsize = (12, 6), ncols = 2)
+        for ax, (values, color, title) in zip(axes, pairs):
+            # reverse so that the first bar is drawn at the top
+            values = values.iloc[::-1]
+            ax.barh(range(len(values)), values.values, color = color)
+            ax.set_yticks(range(len(values)))
+            ax.set_yticklabels(values.index)
+            ax.set_title(title)
+            ax.set_xlabel(xlabel)
+        
+        fig.suptitle(suptitle)
+        fig.text(0.02, 0.02, note)
+        fig.subplots_adjust(left = left, wspace = 0.9, bottom = 0.2)
+        
+        return self.renderer.save(fig, file_name)
+    
+    def graph_top_restaurants(self, k = 10):
+        '''
+        Horizontal bar graphs of the k best and k worst restaurants of the ranking group by mean inspection violations
+        Restricted to restaurants with at least 10 inspections (to exclude outliers)
+        '''
+        min_inspections = 10
+        
+        best, worst = self.get_top_restaurants(k, min_inspections)
+        pairs = [(top["mean"].rename(capwords), color, "Top {} {}".format(len(top), label)) for top, color, label in [(best, "g", "Best"), (worst, "r", "Worst")]]
+        
+        return self.graph_paired_barh(pairs, "Mean Inspection Violations Score",
+            "Best and Worst {}".format(self.describe_restaurants()),
+            "To exclude outliers, only restaurants that have received at least {} inspections are considered.".format(min_inspections),
+            "{}_top_restaurants.pdf".format(self.get_name()))
+    
+    def graph_improved_and_declined(self, k = 10):
+        '''
+        Horizontal bar graphs of the k restaurants of the ranking group whose inspection violations fell (most improved)
+        and rose (most declined) the fastest, by the slope of their scores over time
+        Drawn from the precomputed trend features; restricted to restaurants with at least 5 inspections
+        '''
+        min_inspections = 5
+        
+        improved, declined = self.get_improved_and_declined(k, min_inspections)
+        pairs = []
+        for top, color, label in [(improved, "g", "Most Improved"), (declined, "r", "Most Declined")]:
+            # each restaurant is labelled with its latest score and rolling mean
+            labels = ["{} ({:.0f}, {:.1f})".format(capwords(name), latest, mean) for name, latest, mean in zip(top.index, top["latest_score"], top["rolling_mean"])]
+            pairs.append((pd.Series(top["slope"].values, index = labels), color, "{} {}".format(len(top), label)))
+        
+        return self.graph_paired_barh(pairs, "Change in Inspection Violations Score per Year",
+            "Most Improved and Most Declined {}".format(self.describe_restaurants()),
+            "In parentheses: the latest score and the mean of the last {} scores. \nOnly restaurants that have received at least {} inspections are considered.".format(self.get_trend_features().window, min_inspections),
+            "{}_improved_declined_restaurants.pdf".format(self.get_name()), left = 0.25)
+    
+    def graph_top_violations(self, k = 10):
+        '''
+        Horizontal bar graph of the k violation codes most often cited in the ranking group, next to their citywide rates
+        The rate of a code is the share of inspections that cited it
+        '''
+        top = self.get_top_violations(k).iloc[::-1]
+        positions = np.arange(len(top))
+        
+        fig, ax = self.renderer.new_axes(figsize = (10, 6))
+        ax.barh(positions + 0.2, top["rate"], height = 0.4, color = "r", label = self.get_name())
+        ax.barh(positions - 0.2, top["citywide"], height = 0.4, color = "gray", label = "Citywide")
+        for position, (rate, ratio) in enumerate(zip(top["rate"], top["ratio"])):
+            ax.annotate("x{:.1f}".format(ratio), (rate, position + 0.2), xytext = (3, 0), textcoords = "offset points", va = "center", fontsize = "small")
+        
+        ax.set_yticks(positions)
+        ax.set_yticklabels([code.upper() for code in top.index])
+        ax.set_xlabel("Share of Inspections Citing the Violation")
+        ax.set_ylabel("Violation Code")
+        ax.set_title("Most Frequent Violations for {} vs Citywide".format(self.describe_restaurants()))
+        ax.legend(loc = "lower right")
+        
+        return self.renderer.save(fig, "{}_top_violations.pdf".format(self.get_name()))
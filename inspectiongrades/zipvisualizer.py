@@ -3,17 +3,17 @@
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from string import capwords
 from .visualizer import Visualizer
-plt.style.use("ggplot")
+from .chartdata import make_records
 
 class ZipGrades(Visualizer):
-    def __init__(self, zipcode, data):
+    __slots__ = ("zipcode",)
+    
+    def __init__(self, zipcode, data, renderer = None):
         '''
         Constructor
         '''
-        super(ZipGrades, self).__init__(data)
+        super(ZipGrades, self).__init__(data, renderer)
         self.zipcode = zipcode
         
     ### Methods to subset appropriate data, perform calculations and sort to prepare for graphing
@@ -23,6 +23,29 @@ class ZipGrades(Visualizer):
         Returns a DF subset of the data for the zipcode in question
         '''
         return data[data["zipcode"] == self.zipcode]
+    
+    def ranking_group(self):
+        '''
+        Restaurants are ranked within the zipcode in question
+        '''
+        return ("zipcode", self.zipcode)
+    
+    def get_name(self):
+        '''
+        Returns the formatted name of the zipcode, used in titles and file names
+        '''
+        return self.zipcode
+        
+    def get_chart_data(self):
+        '''
+        Returns the numbers behind the graphs of the letter grades, the scores by sidewalk cafe type and
+        the mean scores by cuisine category, as a dict {chart name: list of records}
+        '''
+        return {
+            "lettergrades": make_records(self.grade_counts()),
+            "scores_by_cafe_type": make_records(self.group_by_sidewalk()["score"].sort_index()),
+            "mean_score_by_cuisine": make_records(self.group_scores_by_category()["score"])
+        }
         
     ### Methods to generate different visualizations of data
     
@@ -30,14 +53,12 @@ class ZipGrades(Visualizer):
         '''
         Generates pie graph of letter grades awarded in cuisine category
         '''
-        data = self.filter_data_valid_values("grade", ["A", "B", "C", "Not Yet Graded", "Grade Pending"])
-                
-        data.grade.value_counts().plot(kind = "pie", title = "Distribution of Letter Grades in Zipcode: {}".format(self.zipcode))
-        plt.xlabel("Grade")
-        plt.ylabel("Number of Times Awarded")
+        fig, ax = self.renderer.new_axes()
+        self.grade_counts().plot(kind = "pie", ax = ax, title = "Distribution of Letter Grades in Zipcode: {}".format(self.zipcode))
+        ax.set_xlabel("Grade")
+        ax.set_ylabel("Number of Times Awarded")
         
-        plt.savefig("{}_restaurant_lettergrades.pdf".format(self.zipcode))
-        plt.close()   
+        return self.renderer.save(fig, "{}_restaurant_lettergrades.pdf".format(self.zipcode))
             
     def boxplot_zip_scores(self):
         '''
@@ -45,33 +66,77 @@ class ZipGrades(Visualizer):
         '''
         grouped = self.group_by_sidewalk()
                 
-        grouped.score.plot(kind = "bar", rot = 90)
-        plt.subplots_adjust(bottom = 0.5)
-        plt.title("Distribution of Inspection Violations by Sidewalk Cafe Type in {}".format(self.zipcode))
-        plt.ylabel("Average Inspection Violation Scores")
-        plt.xlabel("Type of Sidewalk Cafe (if any)")
+        fig, ax = self.renderer.new_axes()
+        grouped.score.plot(kind = "bar", ax = ax, rot = 90, yerr = grouped.get("error"))
+        fig.subplots_adjust(bottom = 0.5)
+        ax.set_title("Distribution of Inspection Violations by Sidewalk Cafe Type in {}".format(self.zipcode))
+        ax.set_ylabel("Average Inspection Violation Scores")
+        ax.set_xlabel("Type of Sidewalk Cafe (if any)")
+        
+        return self.renderer.save(fig, "{}_restaurant_scores_by_cafe_type.pdf".format(self.zipcode))
         
-        plt.savefig("{}_restaurant_scores_by_cafe_type.pdf".format(self.zipcode))
-        plt.close()           
+    def boxplot_by_cuisine(self, max_cuisines = 20):
+        '''
+        Boxplot of scores in this zipcode, grouped by cuisine category
+        Only the max_cuisines categories with the most inspections are shown
+        Drawn from the precomputed box statistics of each (zipcode, cuisine)
+        '''
+        cuisines, stats = self.get_largest_boxes("zipcode", self.zipcode, "cuisine_primary", max_cuisines)
+        
+        fig, ax = self.renderer.new_axes(figsize = (10, 6))
+        self.renderer.draw_boxes(ax, stats, self.get_display_labels("cuisine_primary", cuisines))
+        ax.set_xlabel("Cuisine (the {} with the most inspections)".format(len(cuisines)))
+        ax.set_ylabel("Inspection Violations")
+        fig.subplots_adjust(bottom = 0.3)
+        ax.set_title("Spread of Violations by Cuisine in {}".format(self.zipcode))
+        
+        return self.renderer.save(fig, "{}_restaurant_violations_by_cuisine.pdf".format(self.zipcode))
         
     def violations_by_category(self):
         '''
         Generates a bar graph of inspection violations by category in this zipcode
         '''
         grouped = self.group_scores_by_category()
-        grouped.score.plot(kind = "barh")
-        plt.xlabel("Inspection Violation Scores")
-        plt.ylabel("Cuisine")
-        plt.title("Mean Inspection Violations for Cuisine Categories in {}".format(self.zipcode))
+        fig, ax = self.renderer.new_axes()
+        grouped.score.plot(kind = "barh", ax = ax, xerr = grouped.get("error"))
+        ax.set_xlabel("Inspection Violation Scores")
+        ax.set_ylabel("Cuisine")
+        ax.set_title("Mean Inspection Violations for Cuisine Categories in {}".format(self.zipcode))
         
-        plt.savefig("{}_restaurant_violations_by_category.pdf".format(self.zipcode))
-        plt.close()   
-                
+        return self.renderer.save(fig, "{}_restaurant_violations_by_category.pdf".format(self.zipcode))
+    
     def make_graphs(self):
         '''
         Calls all graphing methods for this class
+        Returns a list of the saved file names
         '''
-        self.graph_lettergrade_frequency()
-        self.boxplot_zip_scores()
-        self.violations_by_category()
-        
\ No newline at end of file
+        filenames = [
+            self.graph_lettergrade_frequency(),
+            self.boxplot_zip_scores(),
+            self.violations_by_category(),
+            self.boxplot_by_cuisine(),
+            self.graph_top_restaurants(),
+            self.graph_improved_and_declined()
+        ]
+        
+        # the violation codes are not kept in partitioned storage
+        if self.has_violation_codes():
+            filenames.append(self.graph_top_violations())
+        
+        return filenames
+    
+    def make_preview(self):
+        '''
+        Calls the graphing methods that can be drawn from the stratified sample, with an "approximate" annotation
+        They save the same file names as make_graphs, whose exact graphs replace them
+        Returns a list of the saved file names
+        '''
+        preview = self.get_preview()
+        
+        with self.renderer.annotate(preview.sample.describe()):
+            return [
+                preview.graph_lettergrade_frequency(),
+                preview.boxplot_zip_scores(),
+                preview.violations_by_category(),
+                preview.boxplot_by_cuisine()
+            ]
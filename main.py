@@ -4,21 +4,97 @@
 # prompts to allow the user to search by restaurant name, cuisine 
 # category, or zip code. The program will generate data visualizations 
 # based on the user's request.  
+# Graphs are rendered in the background while the user enters the next query.
+#
+# Usage: python main.py [--arrow-strings] [--session-info] [--max-query-mb=MB] [--format=FORMAT] [--dpi=DPI] [--rasterize] [--max-bars=N]
+#     [directory of the partitioned history written by datacleaning.py]
+# Graphs are saved in FORMAT (pdf, svg, png or webp; default pdf) at DPI, with dense artists rasterized, and graphs
+# of more than N bars aggregated (see rendering.RenderContext).
+# In history mode, only the catalog of the history is loaded at startup, and each query may read at most
+# MB megabytes of rows (default: storage.QUERY_MAX_BYTES).
+# Without a directory, the cleaned snapshot is loaded into memory; with --arrow-strings its string
+# columns are stored in Arrow instead of as Python objects (requires pyarrow).
+# The structures derived from the data are saved in a session state file (in the working directory,
+# or in the history directory) and loaded by the next session on the same data instead of being rebuilt;
+# --session-info prints the contents and build time of the file and exits.
 
+import os
+import sys
 import pandas as pd
 import numpy as np
 from userinput import *
+from renderqueue import RenderQueue
+from inspectiongrades.rendering import parse_render_options
 from datacleaning import clean_data
-
-### Set up the DF for analysis
-restaurant_data = clean_data()
-restaurant_data = restaurant_data.set_index(["restaurant"])
+from inspectiongrades.precomputed import set_derived
+from inspectiongrades.timecube import TimeCube, TIME_CUBE_FILE, load_time_cube
+from inspectiongrades.violations import ViolationProfiles
+from inspectiongrades.nearby import get_zip_index
+from inspectiongrades.querylookups import QueryLookups
+from inspectiongrades.sessionstate import SESSION_BUILDERS, SESSION_STATE_FILE, load_session_state, describe_session_state
 
 if __name__ == "__main__":
+    
+    arrow_strings = "--arrow-strings" in sys.argv
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    max_query_mb = [float(arg.split("=", 1)[1]) for arg in sys.argv[1:] if arg.startswith("--max-query-mb=")]
+    session_file = os.path.join(args[0], SESSION_STATE_FILE) if args else SESSION_STATE_FILE
+    
+    # options of the output files, checked before the data is loaded
+    try:
+        render_options = parse_render_options(sys.argv[1:])
+    except ValueError as e:
+        sys.exit(str(e))
+    
+    if "--session-info" in sys.argv:
+        sys.exit(describe_session_state(session_file) if os.path.exists(session_file) else "No session state in {}".format(session_file))
+    
+    ### Set up the DF for analysis
+    if args:
+        # history mode: each query reads only its partitions and columns
+        from inspectiongrades.storage import PartitionedData, QUERY_MAX_BYTES
+        storage = PartitionedData(args[0], max_bytes = int(max_query_mb[-1] * 1024 ** 2) if max_query_mb else QUERY_MAX_BYTES)
+        
+        # the distinct restaurants, zipcodes and cuisines of the history, with their number of rows
+        restaurant_data = storage.read_catalog()
+        
+        # the time cube of the history is written with it by datacleaning.py
+        set_derived(restaurant_data, "time_cube", TimeCube.load(os.path.join(args[0], TIME_CUBE_FILE)))
+        
+        # queries build their own structures from the rows they read; only the input lookups are kept
+        session_state, loaded = load_session_state(restaurant_data, session_file, {"query_lookups": QueryLookups})
+    else:
+        storage = None
+        restaurant_data, violations = clean_data(keep_violations = True, string_storage = "pyarrow" if arrow_strings else None)
+        restaurant_data = restaurant_data.set_index(["restaurant"])
+        
+        # the structures derived from the data (input lookups, rankings, aggregates, the stratified sample from
+        # which large cuisines and zipcodes are previewed, and the violation code rates of every cuisine and zipcode)
+        # are loaded from the last session's state if it was saved from the same data
+        builders = dict(SESSION_BUILDERS, violation_profiles = lambda data: ViolationProfiles(data, violations))
+        session_state, loaded = load_session_state(restaurant_data, session_file, builders, related_data = (violations,))
+        
+        # refresh the saved time cube with the months it doesn't have yet
+        load_time_cube(restaurant_data, TIME_CUBE_FILE)
+
+    if loaded:
+        print("Loaded the session state built {} from {}".format(session_state.built, session_file))
+    else:
+        print("Built the session state in {:.1f} s and saved it to {}".format(sum(session_state.build_seconds.values()), session_file))
+
+    # the spatial index of the zipcode centroids for 'near' queries is built once, before the first prompt
+    get_zip_index()
+
+    # graphs are rendered in the background while the user enters the next query
+    render_queue = RenderQueue(**render_options)
 
     try:
         while True:
-            prompt_for_browsechoice(restaurant_data)
+            prompt_for_browsechoice(restaurant_data, storage = storage, render_queue = render_queue)
 
     except (QuitError, KeyboardInterrupt):
-        pass
\ No newline at end of file
+        pass
+    
+    finally:
+        # finish the queries already entered before exiting
+        render_queue.close()
\ No newline at end of file
@@ -0,0 +1,117 @@
+# Author: Leslie Huang (lh1036)
+# Description: Background rendering of queries for the interactive loop in main.
+# Validated queries are handed to a worker thread, which renders their graphs while the user keeps
+# entering queries, and a notification with the saved files is printed as each query completes.
+# A query of a large group can first be previewed from the stratified sample: its approximate graphs are
+# notified right away, and the exact graphs overwrite the same files when they are done.
+# At most max_pending queries are queued or rendering at once: submitting more waits for one to finish.
+# On quitting, close() drains the queue so that queries already entered are not abandoned.
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from inspectiongrades.rendering import RenderContext
+
+MAX_PENDING = 4
+
+class RenderQueue(object):
+    '''
+    Renders queries on a background thread, each with the worker's own RenderContext
+    '''
+
+    def __init__(self, max_pending = MAX_PENDING, notify = print, **render_options):
+        '''
+        Constructor
+        @param max_pending: maximum number of queries queued or rendering at once
+        @param notify: function called with a message when a query completes or fails
+        @param render_options: arguments of the worker's RenderContext (e.g. output_format)
+        '''
+        self.notify = notify
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.worker = threading.local()
+        self.render_options = render_options
+
+        # one worker: graphs of a query are rendered one after the other on the worker's figure
+        self.executor = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = "render")
+
+    def get_renderer(self):
+        '''
+        Returns the RenderContext of the current worker thread (figures are not shared across threads)
+        '''
+        if not hasattr(self.worker, "renderer"):
+            self.worker.renderer = RenderContext(**self.render_options)
+
+        return self.worker.renderer
+
+    def submit(self, label, render, preview = None):
+        '''
+        Queues a query and returns its Future; waits first if max_pending queries are already queued or rendering
+        @param label: describes the query in notifications, e.g. "cuisine thai"
+        @param render: function that takes a RenderContext, renders the query's graphs and returns their file names
+        @param preview: optional function like render that renders approximate graphs first
+        '''
+        if not self.slots.acquire(blocking = False):
+            print("Waiting for a query to finish rendering before queueing {}...".format(label))
+            self.slots.acquire()
+
+        future = self.executor.submit(self.run, label, render, preview)
+
+        with self.lock:
+            self.pending.add(future)
+        future.add_done_callback(self.release)
+
+        return future
+
+    def run(self, label, render, preview = None):
+        '''
+        Renders one query on the worker thread and notifies its files (or its error)
+        Returns the list of file names
+        '''
+        if preview is not None:
+            # a failed preview is reported, but the exact graphs are still rendered
+            try:
+                filenames = preview(self.get_renderer())
+                self.notify("\nApproximate graphs for {} are ready (exact graphs to follow):\n{}".format(label, "\n".join(os.path.abspath(filename) for filename in filenames)))
+            except Exception as e:
+                self.notify("\nPreview for {} failed: {}".format(label, e))
+
+        try:
+            filenames = render(self.get_renderer())
+        except Exception as e:
+            self.notify("\nGraphs for {} failed: {}".format(label, e))
+            raise
+
+        self.notify("\nGraphs for {} are ready:\n{}".format(label, "\n".join(os.path.abspath(filename) for filename in filenames)))
+        return filenames
+
+    def release(self, future):
+        '''
+        Frees the queue slot of a completed (or cancelled) query
+        '''
+        with self.lock:
+            self.pending.discard(future)
+        self.slots.release()
+
+    def count_pending(self):
+        '''
+        Returns the number of queries queued or rendering
+        '''
+        with self.lock:
+            return len(self.pending)
+
+    def close(self):
+        '''
+        Waits for the queued queries to finish rendering, then stops the worker
+        A KeyboardInterrupt while waiting cancels the queries that haven't started; the one rendering still finishes
+        '''
+        pending = self.count_pending()
+        if pending:
+            print("Waiting for {} queries to finish rendering (Ctrl-C to skip the ones that haven't started)...".format(pending))
+
+        try:
+            self.executor.shutdown(wait = True)
+        except KeyboardInterrupt:
+            print("Finishing the graphs being rendered...")
+            self.executor.shutdown(wait = True, cancel_futures = True)
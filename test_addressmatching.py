@@ -0,0 +1,104 @@
+# Author: Leslie Huang (lh1036)
+# Description: unit tests for address normalization and blocked matching
+
+import unittest
+from addressmatching import *
+import pandas as pd
+import numpy.testing as npt
+
+class NormalizeTests(unittest.TestCase):
+
+    def test_normalize_street(self):
+        '''
+        Check that abbreviated and spelled-out forms of a street normalize to the same string
+        '''
+        self.assertEqual(normalize_street("W 44th St."), "west 44 street")
+        self.assertEqual(normalize_street("west 44 street"), "west 44 street")
+        self.assertEqual(normalize_street("fifth ave"), "5 avenue")
+        self.assertEqual(normalize_street("ave of the americas"), "6 avenue")
+
+    def test_normalize_saint(self):
+        '''
+        Check that a leading "st" is read as "saint" and a trailing one as "street"
+        '''
+        self.assertEqual(normalize_street("st marks pl"), "saint marks place")
+        self.assertEqual(normalize_street("bleecker st"), "bleecker street")
+
+    def test_normalize_building(self):
+        '''
+        Check that hyphenated (Queens-style) building numbers match unhyphenated ones
+        '''
+        self.assertEqual(normalize_building("37-11"), normalize_building("3711"))
+
+class MatchAddressesTests(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Create dummy restaurant and sidewalk cafe addresses
+        '''
+        self.restaurants = pd.DataFrame({
+            "address_id": ["1 west 44 street 10036", "1 west 44 street 10036", "37-11 30 avenue 11103", "5 broadway 10004", "9 bleecker street 10012"],
+            "building": ["1", "1", "37-11", "5", "9"],
+            "street": ["west 44 street", "west 44 street", "30 avenue", "broadway", "bleecker street"],
+            "zipcode": ["10036", "10036", "11103", "10004", "10012"]
+            })
+        self.licenses = pd.DataFrame({
+            "address_id": ["1 w 44th st 10036", "3711 30th ave 11103", "5 broadway 10005", "9 bleecker st 10012", "9 elizabeth st 10012"],
+            "building": ["1", "3711", "5", "9", "9"],
+            "street": ["w 44th st", "30th ave", "broadway", "bleecker st", "elizabeth st"],
+            "zipcode": ["10036", "11103", "10005", "10012", "10012"]
+            })
+
+    def test_match_addresses(self):
+        '''
+        Check that each restaurant address is linked once, to the right license, and that other zipcodes are not compared
+        '''
+        matches = match_addresses(self.restaurants, self.licenses).set_index("address_id")
+
+        self.assertEqual(sorted(matches.index), ["1 west 44 street 10036", "37-11 30 avenue 11103", "9 bleecker street 10012"])
+        self.assertEqual(matches.loc["1 west 44 street 10036", "match_address_id"], "1 w 44th st 10036")
+        self.assertEqual(matches.loc["9 bleecker street 10012", "match_address_id"], "9 bleecker st 10012")
+        npt.assert_array_equal(matches["match_score"], [1.0, 1.0, 1.0])
+
+    def test_min_score(self):
+        '''
+        Check that a candidate in the same block is dropped if the streets are too different
+        '''
+        licenses = self.licenses[self.licenses["street"] != "bleecker st"]
+        matches = match_addresses(self.restaurants, licenses)
+
+        self.assertNotIn("9 bleecker street 10012", list(matches["address_id"]))
+
+    def test_near_miss_streets(self):
+        '''
+        Check that streets in the same block that differ by a number or by a direction are not matched
+        '''
+        restaurants = pd.DataFrame({
+            "address_id": ["1 west 4 street 10012", "2 broadway 10012"],
+            "building": ["1", "2"],
+            "street": ["west 4 street", "broadway"],
+            "zipcode": ["10012", "10012"]
+            })
+        licenses = pd.DataFrame({
+            "address_id": ["1 w 44th st 10012", "2 west broadway 10012"],
+            "building": ["1", "2"],
+            "street": ["w 44th st", "west broadway"],
+            "zipcode": ["10012", "10012"]
+            })
+        
+        npt.assert_array_equal(score_streets(["west 4 street", "broadway"], ["west 44 street", "west broadway"]), [0., 0.5])
+        self.assertEqual(len(match_addresses(restaurants, licenses)), 0)
+
+    def test_one_match_per_address(self):
+        '''
+        Check that an address with several equally good candidates is linked to only one of them
+        '''
+        licenses = pd.concat([self.licenses, pd.DataFrame({
+            "address_id": ["1 west 44th street 10036"], "building": ["1"], "street": ["west 44th street"], "zipcode": ["10036"]
+            })])
+        matches = match_addresses(self.restaurants, licenses)
+
+        self.assertTrue(matches["address_id"].is_unique)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+# Author: Leslie Huang (lh1036)
+# Description: unit tests for the bulk rendering scheduler
+
+import os
+import queue
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+import numpy as np
+import bulkrender
+from bulkrender import Job, make_jobs, fit_cost_model, work, warm_up, BulkRenderer, rss_bytes, virtual_bytes
+
+class BulkRenderTestCase(unittest.TestCase):
+    '''
+    Base class for unittesting functions that require a restaurant_data dataset
+    '''
+
+    def setUp(self):
+        '''
+        Create a dummy dataset for testing, and a temporary working directory for the graphs
+        '''
+        data = {
+            "restaurant": ["thai garden", "thai garden", "'za for days", "'za for days", "senor frog", "thai palace"],
+            "boro": ["manhattan", "manhattan", "brooklyn", "manhattan", "brooklyn", "queens"],
+            "zipcode": ["10011", "10011", "11211", "10011", "11211", "11101"],
+            "cuisine_primary": ["thai", "thai", "pizza", "pizza", "mexican", "thai"],
+            "swc_type": ["no cafe", "no cafe", "enclosed", "enclosed", "no cafe", "no cafe"],
+            "inspectiondate": pd.to_datetime(["2014-01-02", "2014-02-03", "2014-01-05", "2014-01-20", "2014-02-11", "2014-01-09"]),
+            "score": [12., 20., 30., 8., 9., 5.],
+            "grade": ["a", "b", "c", "a", "a", "a"],
+            "address_id": ["1 west 4 street 10011", "1 west 4 street 10011", "2 bedford avenue 11211", "3 broadway 10011", "4 grand street 11211", "5 main street 11101"],
+        }
+        dummy_data = pd.DataFrame(data).set_index("restaurant")
+        for col in ["boro", "cuisine_primary", "swc_type", "grade"]:
+            dummy_data[col] = dummy_data[col].astype("category")
+        self.dummy_data = dummy_data
+
+        self.directory = os.getcwd()
+        self.temporary_directory = tempfile.mkdtemp()
+        os.chdir(self.temporary_directory)
+
+    def tearDown(self):
+        os.chdir(self.directory)
+        shutil.rmtree(self.temporary_directory)
+
+class BulkRenderTests(BulkRenderTestCase):
+
+    def test_make_jobs(self):
+        '''
+        Test that jobs are made for every group with rows, largest estimated cost first
+        '''
+        jobs = make_jobs(self.dummy_data, ["cuisine", "zipcode"], {"cuisine": (1., 1.), "zipcode": (0., 1.)})
+
+        self.assertEqual([(job.kind, job.key) for job in jobs], [
+            ("cuisine", "thai"), ("cuisine", "pizza"), ("zipcode", "10011"), ("cuisine", "mexican"), ("zipcode", "11211"), ("zipcode", "11101")
+        ])
+        self.assertEqual([job.estimate for job in jobs], [4., 3., 3., 2., 2., 1.])
+
+    def test_fit_cost_model(self):
+        '''
+        Test that the cost model is fitted to the timings of completed jobs, and kinds without enough timings are left out
+        '''
+        timings = pd.DataFrame({
+            "kind": ["cuisine", "cuisine", "cuisine", "zipcode", "cuisine"],
+            "rows": [100, 200, 300, 50, 1000],
+            "seconds": [1.5, 2.5, 3.5, 9., 0.],
+            "error": [None, None, None, None, "MemoryError: "],
+        })
+        cost_model = fit_cost_model(timings)
+
+        self.assertEqual(list(cost_model), ["cuisine"])
+        fixed, per_row = cost_model["cuisine"]
+        self.assertAlmostEqual(fixed, 0.5)
+        self.assertAlmostEqual(per_row, 0.01)
+
+    def test_work_memory_ceiling(self):
+        '''
+        Test that a worker over its memory ceiling stops after its current job and signals its exit
+        '''
+        jobs, results = queue.Queue(), queue.Queue()
+        for job in [Job("restaurant", "thai garden", 2, 1.), Job("restaurant", "senor frog", 1, 1.)]:
+            jobs.put(job)
+
+        work(self.dummy_data, 0, jobs, results, 1, {"output_format": "png"})
+
+        timing = results.get_nowait()
+        self.assertEqual((timing.key, timing.error, timing.files), ("thai garden", None, 2))
+        self.assertIsNone(results.get_nowait())
+        self.assertEqual(jobs.qsize(), 1)
+
+    def test_warm_up_violations(self):
+        '''
+        Test that the violation profiles are registered from the violations table, so that the top violations graphs are drawn
+        '''
+        data = self.dummy_data.assign(inspection_id = range(len(self.dummy_data)))
+        violations = pd.DataFrame({"inspection_id": [0, 0, 1, 5], "violationcode": ["04l", "10f", "04l", "02g"]})
+        warm_up(data, violations)
+
+        jobs, results = queue.Queue(), queue.Queue()
+        for job in [Job("zipcode", "10011", 3, 1.), None]:
+            jobs.put(job)
+        work(data, 0, jobs, results, None, {"output_format": "png"})
+
+        timing = results.get_nowait()
+        self.assertIsNone(timing.error)
+        self.assertTrue(os.path.exists("10011_top_violations.png"))
+
+    def test_run(self):
+        '''
+        Test that every job is rendered by the worker processes, and that a failed job is reported
+        '''
+        jobs = make_jobs(self.dummy_data, ["zipcode", "restaurant"]) + [Job("restaurant", "no such restaurant", 0, 0.)]
+        messages = []
+        timings = BulkRenderer(self.dummy_data, workers = 2, max_worker_bytes = None, notify = messages.append, output_format = "png").run(jobs)
+
+        self.assertEqual(sorted(timings["key"]), sorted(job.key for job in jobs))
+        self.assertEqual(timings["error"].notna().sum(), 1)
+        self.assertIn("no such restaurant", timings.loc[timings["error"].notna(), "key"].values)
+        self.assertEqual(len(messages), len(jobs))
+        self.assertTrue(all(os.path.exists(name) for name in ["10011_restaurant_lettergrades.png", "Thai Garden_timeseries.png"]))
+
+    @unittest.skipIf(virtual_bytes() is None, "the memory limit needs /proc")
+    def test_memory_limit(self):
+        '''
+        Test that a job allocating beyond the memory ceiling fails with MemoryError in its worker, which is replaced
+        '''
+        class Allocating(object):
+            def __init__(self, key, data, renderer = None):
+                self.key = key
+
+            def make_graphs(self):
+                # "huge" allocates 4 GB, far above the ceiling
+                return [] if self.key != "huge" else list(np.ones(2 ** 29))
+
+        jobs = [Job("restaurant", "huge", 2, 2.), Job("restaurant", "small", 1, 1.)]
+        messages = []
+        with mock.patch.dict(bulkrender.JOB_KINDS, {"restaurant": (Allocating, None)}):
+            timings = BulkRenderer(self.dummy_data, workers = 1, max_worker_bytes = rss_bytes() + 256 * 1024 ** 2, notify = messages.append).run(jobs)
+
+        errors = timings.set_index("key")["error"]
+        self.assertTrue(errors["huge"].startswith("MemoryError"))
+        self.assertTrue(pd.isnull(errors["small"]))
+        self.assertTrue(any("replaced" in message for message in messages))
+
+    def test_memory_ceiling_below_data(self):
+        '''
+        Test that a memory ceiling below the memory of the loaded data is refused
+        '''
+        with self.assertRaises(ValueError):
+            BulkRenderer(self.dummy_data, max_worker_bytes = 1).run(make_jobs(self.dummy_data, ["zipcode"]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -73,6 +73,231 @@ class DataCleaningTests(RestaurantTestCase):
             pd.Series({0: "Italian", 1: "Pizza", 2: "Sandwiches", 3: "Soup", 4: ""})
         )
 
+class MakeCategoricalTests(unittest.TestCase):
+    
+    def test_make_categorical(self):
+        '''
+        Check that the columns become categoricals with sorted categories and unchanged values
+        '''
+        dummy_data = pd.DataFrame({"grade": ["b", "a", "grade pending", "a"], "score": [20, 3, 0, 5]})
+        result = make_categorical(dummy_data, ["grade"])
+        
+        self.assertIsInstance(result["grade"].dtype, pd.CategoricalDtype)
+        npt.assert_array_equal(result["grade"].cat.categories, ["a", "b", "grade pending"])
+        npt.assert_array_equal(result["grade"], ["b", "a", "grade pending", "a"])
+
+class DropDuplicatesTests(unittest.TestCase):
+    '''
+    Tests for the hash-based deduplication, which must keep the same rows as drop_duplicates
+    '''
+    
+    def setUp(self):
+        '''
+        Create a dummy dataset with repeated rows, including rows that differ in only one column and rows with missing values
+        '''
+        data = {
+            "restaurant": ["thai garden", "thai garden", "senor frog", "thai garden", np.nan, np.nan, "senor frog"],
+            "street": ["44 street", "44 street", "bleecker street", "45 street", "broadway", "broadway", "bleecker street"],
+            "score": ["12", "12", "0", "12", "7", "7", "0"]
+            }
+        self.dummy_data = pd.DataFrame(data, columns = ["restaurant", "street", "score"], index = [10, 11, 12, 13, 14, 15, 16])
+    
+    def test_drop_duplicate_rows(self):
+        '''
+        Check that the same rows (and index) survive as with drop_duplicates
+        '''
+        result = drop_duplicate_rows(self.dummy_data)
+        pd.testing.assert_frame_equal(result, self.dummy_data.drop_duplicates())
+    
+    def test_hash_collision(self):
+        '''
+        Check that rows with the same hash but different values are both kept
+        '''
+        import datacleaning
+        hash_multipliers = datacleaning.hash_multipliers
+        datacleaning.hash_multipliers = lambda n: np.zeros(n, dtype = np.uint64)
+        try:
+            result = drop_duplicate_rows(self.dummy_data)
+        finally:
+            datacleaning.hash_multipliers = hash_multipliers
+        
+        pd.testing.assert_frame_equal(result, self.dummy_data.drop_duplicates())
+
+class InspectionTableTests(unittest.TestCase):
+    '''
+    Tests for collapsing violation-level rows into one row per inspection
+    '''
+    
+    def setUp(self):
+        '''
+        Create a dummy dataset for testing: the first inspection has two violations, the second has none
+        '''
+        data = {
+            "restaurant": ["thai garden", "thai garden", "senor frog", "thai garden"],
+            "inspectiondate": ["1/2/2014", "1/2/2014", "1/2/2014", "3/7/2015"],
+            "score": [12, 12, 0, 20],
+            "violationcode": ["04l", "10f", "", "04l"],
+            "criticalflag": ["critical", "not critical", "not applicable", "critical"]
+            }
+        self.dummy_data = pd.DataFrame(data, columns = ["restaurant", "inspectiondate", "score", "violationcode", "criticalflag"])
+    
+    def test_make_inspection_table(self):
+        '''
+        Check that each inspection appears once, with its number of violations
+        '''
+        inspections, _ = make_inspection_table(self.dummy_data, ["violationcode", "criticalflag"], "inspection_id")
+        
+        npt.assert_array_equal(inspections["restaurant"], ["thai garden", "senor frog", "thai garden"])
+        npt.assert_array_equal(inspections["violation_count"], [2, 0, 1])
+    
+    def test_make_inspection_table_violations(self):
+        '''
+        Check that the side table links each violation code to its inspection
+        '''
+        inspections, violations = make_inspection_table(self.dummy_data, ["violationcode", "criticalflag"], "inspection_id")
+        
+        first_inspection = inspections["inspection_id"].iloc[0]
+        npt.assert_array_equal(violations.loc[violations["inspection_id"] == first_inspection, "violationcode"], ["04l", "10f"])
+
+class SidewalkLicenseMergeTests(unittest.TestCase):
+    '''
+    Tests for linking inspections to the sidewalk cafe licenses of their addresses
+    '''
+    
+    def setUp(self):
+        '''
+        Create a dummy dataset for testing: 3 violation rows (2 inspections) at an address whose
+        license address has 3 license rows, and an inspection at an address without a license
+        '''
+        violation_rows = pd.DataFrame({
+            "restaurant": ["thai garden", "thai garden", "thai garden", "senor frog"],
+            "address_id": ["1 broadway 10004", "1 broadway 10004", "1 broadway 10004", "2 bleecker street 10012"],
+            "inspectiondate": ["1/2/2014", "1/2/2014", "3/7/2015", "1/2/2014"],
+            "score": [12, 12, 20, 0],
+            "violationcode": ["04l", "10f", "04l", ""],
+            "criticalflag": ["critical", "not critical", "critical", "not applicable"]
+            })
+        self.inspections, _ = make_inspection_table(violation_rows, ["violationcode", "criticalflag"], "inspection_id")
+        
+        self.sidewalk_licenses = pd.DataFrame({
+            "swc_address_id": ["1 broadway 10004"] * 3,
+            "swc_type": ["unenclosed", "enclosed", "unenclosed"],
+            "issuance_dd": ["11/02/2015", "05/03/2016", ""]
+            })
+        self.address_matches = pd.DataFrame({"address_id": ["1 broadway 10004"], "swc_address_id": ["1 broadway 10004"], "swc_match_score": [1.]})
+    
+    def test_merge_keeps_one_row_per_inspection(self):
+        '''
+        Check that repeated license rows of an address don't repeat its inspections
+        '''
+        merged = merge_sidewalk_licenses(self.inspections, self.sidewalk_licenses, self.address_matches)
+        
+        self.assertEqual(len(merged), 3)
+        self.assertTrue(merged["inspection_id"].is_unique)
+    
+    def test_latest_license(self):
+        '''
+        Check that the latest issued license of the address is kept
+        '''
+        merged = merge_sidewalk_licenses(self.inspections, self.sidewalk_licenses, self.address_matches)
+        
+        npt.assert_array_equal(merged["swc_type"].fillna(""), ["enclosed", "enclosed", ""])
+
+class ValidateRowsTests(unittest.TestCase):
+    
+    def setUp(self):
+        '''
+        Create a dummy raw extract with one valid row and one row breaking each rule
+        '''
+        self.raw_data = pd.DataFrame({
+            "restaurant": ["olive garden", None, "pizza farm", "soup waterpark", "bagel world", "taco world"],
+            "street": ["west 4th", "west 3rd", "bleecker", "broadway", "houston", "prince"],
+            "cuisinedescription": ["italian", "pizza", "pizza", "soup", "bagels", "mexican"],
+            "score": ["12", "", "n/a", "-3", "7", None],
+            "grade": ["a", "a", "", "", "a", "a"],
+            }, index = [0, 1, 2, 3, 5, 8])
+    
+    def test_parse_numbers(self):
+        '''
+        Check that parse_numbers gives the same numbers as pd.to_numeric, with NaN for empty, non-numeric and missing strings
+        '''
+        npt.assert_array_equal(parse_numbers(self.raw_data["score"]), pd.to_numeric(self.raw_data["score"], errors = "coerce").values)
+        self.assertEqual(parse_numbers(pd.Series(["12", "7", "12"]), errors = "raise").dtype, np.int64)
+    
+    def test_validate_rows(self):
+        '''
+        Check that only the rows breaking no rule are accepted, and that the others are rejected with the rules they break
+        '''
+        accepted, quarantine, rule_counts = validate_rows(self.raw_data)
+        
+        pd.testing.assert_frame_equal(accepted, self.raw_data.loc[[0, 5]])
+        npt.assert_array_equal(quarantine.index, [1, 2, 3, 8])
+        npt.assert_array_equal(quarantine["reason"], ["missing_restaurant;missing_score", "invalid_score", "negative_score", "missing_score"])
+        self.assertEqual(rule_counts.to_dict(), {
+            "missing_restaurant": 1, "missing_street": 0, "missing_cuisine": 0, "missing_score": 2, "invalid_score": 1, "negative_score": 1
+        })
+    
+    def test_validate_rows_all_valid(self):
+        '''
+        Check that nothing is rejected when every row is valid
+        '''
+        accepted, quarantine, rule_counts = validate_rows(self.raw_data.loc[[0, 5]])
+        
+        self.assertEqual(len(accepted), 2)
+        self.assertEqual(len(quarantine), 0)
+        self.assertEqual(rule_counts.sum(), 0)
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class ArrowStringTests(RestaurantTestCase):
+    '''
+    Tests that the cleaning steps give the same values for Arrow-backed strings as for object strings, and keep them in Arrow
+    '''
+    
+    def setUp(self):
+        super(ArrowStringTests, self).setUp()
+        self.arrow_data = self.dummy_data.astype(pd.StringDtype("pyarrow"))
+    
+    def assert_same_column(self, arrow_column, object_column):
+        self.assertTrue(is_arrow_string(arrow_column))
+        npt.assert_array_equal(arrow_column.astype(object), object_column)
+    
+    def test_strip_whitespace(self):
+        '''
+        Check that excess whitespace is removed from Arrow-backed strings
+        '''
+        result = strip_whitespace(self.arrow_data, ["NAME", "STREET"])
+        self.assert_same_column(result["NAME"], ["Olive Garden", "Pizza Farm", "Sandwich WORLD", "Soup Waterpark", ""])
+        self.assert_same_column(result["STREET"], ["West 4th", "", "West 3rd", "Bleecker", "Broadway"])
+    
+    def test_concat_cols(self):
+        '''
+        Check that Arrow-backed strings are concatenated like object strings
+        '''
+        self.assert_same_column(
+            concat_cols(self.arrow_data, ["BUILDING", "STREET"], "address")["address"],
+            concat_cols(self.dummy_data, ["BUILDING", "STREET"], "address")["address"]
+        )
+    
+    def test_make_primary_cuisine(self):
+        '''
+        Check that the first listed cuisine is extracted from Arrow-backed strings like from object strings
+        '''
+        self.assert_same_column(
+            make_primary_cuisine(self.arrow_data, "CUISINE DESCRIPTION", "primary")["primary"],
+            make_primary_cuisine(self.dummy_data, "CUISINE DESCRIPTION", "primary")["primary"]
+        )
+    
+    def test_convert_dates(self):
+        '''
+        Check that Arrow-backed dates are parsed like object strings, with NaT for empty and invalid dates
+        '''
+        dates = ["01/02/2014", "", "13/45/2015", "10/11/2015"]
+        
+        pd.testing.assert_series_equal(
+            convert_dates(pd.Series(dates, dtype = pd.StringDtype("pyarrow")), "%m/%d/%Y"),
+            convert_dates(pd.Series(dates), "%m/%d/%Y")
+        )
+
 if __name__ == "__main__":        
     unittest.main()
     
@@ -0,0 +1,65 @@
+# Author: Leslie Huang (lh1036)
+# Description: Unit testing for the precomputed box plot statistics
+# The statistics are compared with those matplotlib computes from the raw scores of each group
+
+from inspectiongrades.boxstats import BoxStats
+from matplotlib import cbook
+import unittest
+import pandas as pd
+import numpy as np
+import numpy.testing as npt
+
+class BoxStatsTests(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Create a dummy dataset for testing, with an outlier in thai restaurants in manhattan
+        '''
+        data = {
+            "restaurant": ["thai garden"] * 6 + ["senor frog"] * 3 + ["'za for days"] * 2,
+            "cuisine_primary": ["thai"] * 6 + ["mexican"] * 3 + ["pizza"] * 2,
+            "boro": ["manhattan"] * 5 + ["queens"] + ["manhattan"] * 3 + ["brooklyn"] * 2,
+            "zipcode": ["10011"] * 5 + ["11101"] + ["10011"] * 3 + ["11201"] * 2,
+            "score": [10, 12, 13, 11, 90, 7, 20, 21, np.nan, 5, 9]
+            }
+        self.dummy_data = pd.DataFrame(data).set_index("restaurant")
+        self.box_stats = BoxStats(self.dummy_data)
+
+    def test_matches_matplotlib(self):
+        '''
+        Test that quartiles, whiskers, mean and outliers match matplotlib's statistics of the raw scores
+        '''
+        expected = cbook.boxplot_stats(np.array([10, 12, 13, 11, 90]))[0]
+        stats = self.box_stats.get_stats("cuisine_primary", "thai", "boro")["manhattan"]
+
+        for key in ["med", "q1", "q3", "whislo", "whishi", "mean"]:
+            self.assertAlmostEqual(stats[key], expected[key])
+
+        npt.assert_array_equal(stats["fliers"], [90])
+        self.assertEqual(stats["count"], 5)
+
+    def test_missing_scores_ignored(self):
+        '''
+        Test that missing scores are left out of a group
+        '''
+        stats = self.box_stats.get_stats("cuisine_primary", "mexican", "boro")["manhattan"]
+        self.assertEqual(stats["count"], 2)
+        self.assertAlmostEqual(stats["med"], 20.5)
+
+    def test_both_directions(self):
+        '''
+        Test that a grouping can be queried in either direction
+        '''
+        self.assertEqual(sorted(self.box_stats.get_stats("zipcode", "10011", "cuisine_primary")), ["mexican", "thai"])
+        self.assertEqual(sorted(self.box_stats.get_stats("cuisine_primary", "thai", "zipcode")), ["10011", "11101"])
+        self.assertEqual(self.box_stats.get_stats("cuisine_primary", "french", "boro"), {})
+
+    def test_unknown_grouping(self):
+        '''
+        Test that a pair of columns that was not summarized raises KeyError
+        '''
+        with self.assertRaises(KeyError):
+            self.box_stats.get_stats("boro", "queens", "zipcode")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+# Author: Leslie Huang (lh1036)
+# Description: Unit testing for the chart data records and their bulk export
+
+from inspectiongrades import CuisineGrades, ZipGrades, RestaurantGrades
+from inspectiongrades.chartdata import make_records, iter_chart_records, write_chart_records
+import csv
+import io
+import json
+import unittest
+import pandas as pd
+import numpy as np
+
+class ChartDataTestCase(unittest.TestCase):
+    '''
+    Base class for unittesting functions that require a restaurant_data dataset
+    '''
+
+    def setUp(self):
+        '''
+        Create a dummy dataset for testing
+        '''
+        data = {
+            "restaurant": ["thai garden", "thai garden", "'za for days", "'za for days", "senor frog", "onion soup waterpark", "thai palace"],
+            "zipcode": ["10011", "10011", "11211", "10011", "11211", "11101", "10011"],
+            "cuisine_primary": ["thai", "thai", "pizza", "pizza", "mexican", "french", "thai"],
+            "swc_type": ["no cafe", "no cafe", "enclosed", "enclosed", "no cafe", "no cafe", "enclosed"],
+            "inspectiondate": pd.to_datetime(["2014-02-03", "2014-01-02", "2014-01-05", "2014-01-20", "2014-02-11", "2014-01-09", "2014-03-01"]),
+            "score": [20., 12., 30., None, 9., 5., 7.],
+            "grade": ["b", "a", "c", None, "a", "a", "z"],
+        }
+        dummy_data = pd.DataFrame(data).set_index("restaurant")
+        for col in ["cuisine_primary", "swc_type", "grade"]:
+            dummy_data[col] = dummy_data[col].astype("category")
+        self.dummy_data = dummy_data
+
+    def exported(self, kind):
+        '''
+        Returns a dict {group: {chart: list of records}} of the bulk export of kind
+        '''
+        exported = {}
+        for record in iter_chart_records(self.dummy_data, kind):
+            charts = exported.setdefault(record["group"], {})
+            charts.setdefault(record["chart"], []).append({"label": record["label"], "value": record["value"]})
+
+        return exported
+
+class ChartDataTests(ChartDataTestCase):
+
+    def test_make_records(self):
+        '''
+        Test that records hold plain Python values, with dates as strings and None for missing values
+        '''
+        records = make_records(pd.Series([1.5, np.nan], index = pd.to_datetime(["2014-01-02", "2014-02-03"])))
+
+        self.assertEqual(records, [{"label": "2014-01-02", "value": 1.5}, {"label": "2014-02-03", "value": None}])
+        self.assertIs(type(make_records(pd.Series([3], index = ["A"]))[0]["value"]), int)
+
+    def test_cuisine_chart_data(self):
+        '''
+        Test the chart data of a cuisine: valid grades only, and mean scores without the missing ones
+        '''
+        chart_data = CuisineGrades("thai", self.dummy_data).get_chart_data()
+
+        self.assertEqual(chart_data["lettergrades"], [{"label": "A", "value": 1}, {"label": "B", "value": 1}])
+        self.assertEqual(chart_data["scores_by_cafe_type"], [{"label": "enclosed", "value": 7.}, {"label": "no cafe", "value": 16.}])
+        self.assertEqual(chart_data["mean_score_by_restaurant"], [{"label": "thai palace", "value": 7.}, {"label": "thai garden", "value": 16.}])
+
+    def test_export_matches_visualizers(self):
+        '''
+        Test that the bulk export has the same records as the chart data of each group's visualizer
+        '''
+        for kind, cls in [("cuisine", CuisineGrades), ("zipcode", ZipGrades), ("restaurant", RestaurantGrades)]:
+            exported = self.exported(kind)
+            groups = self.dummy_data.index.unique() if kind == "restaurant" else self.dummy_data[{"cuisine": "cuisine_primary"}.get(kind, kind)].unique()
+
+            self.assertEqual(sorted(exported), sorted(groups))
+            for group in groups:
+                expected = {chart: records for chart, records in cls(group, self.dummy_data).get_chart_data().items() if records}
+                self.assertEqual(exported[group], expected, (kind, group))
+
+    def test_export_matches_visualizer_types(self):
+        '''
+        Test that the bulk export of integer scores has records of the same types as get_chart_data
+        '''
+        self.dummy_data = self.dummy_data.dropna(subset = ["score"]).astype({"score": np.int64})
+
+        for group in self.dummy_data.index.unique():
+            chart_data = RestaurantGrades(group, self.dummy_data).get_chart_data()
+            exported = self.exported("restaurant")[group]
+
+            for chart, records in chart_data.items():
+                if not records:
+                    continue
+
+                self.assertEqual(exported[chart], records, (group, chart))
+                self.assertEqual([type(record["value"]) for record in exported[chart]],
+                                 [type(record["value"]) for record in records], (group, chart))
+
+            self.assertIs(type(exported["timeseries"][0]["value"]), int)
+
+    def test_write_chart_records(self):
+        '''
+        Test that records are written one per line as JSON, or as CSV rows with a header
+        '''
+        records = list(iter_chart_records(self.dummy_data, "zipcode"))
+
+        ndjson = io.StringIO()
+        self.assertEqual(write_chart_records(iter(records), ndjson), len(records))
+        self.assertEqual([json.loads(line) for line in ndjson.getvalue().splitlines()], records)
+
+        csv_file = io.StringIO()
+        write_chart_records(iter(records), csv_file, "csv")
+        rows = list(csv.DictReader(io.StringIO(csv_file.getvalue())))
+        self.assertEqual(len(rows), len(records))
+        self.assertEqual(rows[0], {key: str(value) for key, value in records[0].items()})
+
+        with self.assertRaises(ValueError):
+            write_chart_records(records, io.StringIO(), "xml")
+
+if __name__ == "__main__":
+    unittest.main()
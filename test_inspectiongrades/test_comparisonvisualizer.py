@@ -0,0 +1,70 @@
+# Author: Leslie Huang (lh1036)
+# Description: Unit testing for the comparison visualizers
+# I do not include unit tests for methods that only generate graphs
+
+from inspectiongrades.comparisonvisualizer import CuisineComparison, ZipComparison
+import unittest
+import pandas as pd
+import numpy as np
+import numpy.testing as npt
+
+class ComparisonTestCase(unittest.TestCase):
+    '''
+    Base class for unittesting functions that require a restaurant_data dataset
+    '''
+
+    def setUp(self):
+        '''
+        Create a dummy dataset for testing
+        '''
+        data = {
+            "restaurant": ["thai garden", "thai garden", "'za for days", "'za for days", "senor frog", "onion soup waterpark"],
+            "boro": ["manhattan", "manhattan", "brooklyn", "manhattan", "brooklyn", "queens"],
+            "zipcode": ["10011", "10011", "11211", "10011", "11211", "11101"],
+            "cuisine_primary": ["thai", "thai", "pizza", "pizza", "mexican", "french"],
+            "swc_type": ["no cafe", "no cafe", "enclosed", "enclosed", "no cafe", "no cafe"],
+            "inspectiondate": pd.to_datetime(["2014-01-02", "2014-02-03", "2014-01-05", "2014-01-20", "2014-02-11", "2014-01-09"]),
+            "score": [12., 20., 30., None, 9., 5.],
+            "grade": ["a", "b", "c", None, "a", "a"],
+        }
+        dummy_data = pd.DataFrame(data).set_index("restaurant")
+        for col in ["boro", "cuisine_primary", "swc_type", "grade"]:
+            dummy_data[col] = dummy_data[col].astype("category")
+        self.dummy_data = dummy_data
+
+class ComparisonTests(ComparisonTestCase):
+
+    def test_filter_data(self):
+        '''
+        Test that filter_data returns the rows of all the compared cuisines
+        '''
+        query = CuisineComparison(["thai", "pizza"], self.dummy_data)
+        npt.assert_array_equal(query.filter_data(self.dummy_data).index, ["thai garden", "thai garden", "'za for days", "'za for days"])
+        npt.assert_array_equal(query.get_group_data().index, query.filter_data(self.dummy_data).index)
+
+    def test_aggregate(self):
+        '''
+        Test the mean score and number of rows per compared cuisine and borough, in the order of the keys
+        '''
+        query = CuisineComparison(["thai", "pizza"], self.dummy_data)
+        means = query.aggregate("boro")
+
+        self.assertEqual(list(means.columns), ["Thai", "Pizza"])
+        self.assertAlmostEqual(means.loc["manhattan", "Thai"], 16.)
+        self.assertAlmostEqual(means.loc["brooklyn", "Pizza"], 30.)
+        self.assertTrue(np.isnan(means.loc["manhattan", "Pizza"]))
+        self.assertEqual(query.aggregate("swc_type", "rows").loc["enclosed", "Pizza"], 2)
+
+    def test_zip_comparison(self):
+        '''
+        Test the monthly mean scores of compared zipcodes
+        '''
+        query = ZipComparison(["11211", "10011"], self.dummy_data)
+        means = query.aggregate("month")
+
+        self.assertEqual(query.get_name(), "11211 vs 10011")
+        npt.assert_array_almost_equal(means["11211"], [30., 9.])
+        npt.assert_array_almost_equal(means["10011"], [12., 20.])
+
+if __name__ == "__main__":
+    unittest.main()
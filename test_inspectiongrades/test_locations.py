@@ -0,0 +1,58 @@
+# Author: Leslie Huang (lh1036)
+# Description: Unit testing for the LocationIndex methods
+
+from inspectiongrades.locations import LocationIndex
+import unittest
+import pandas as pd
+import numpy as np
+import numpy.testing as npt
+
+class LocationIndexTestCase(unittest.TestCase):
+    '''
+    Base class for unittesting functions that require a restaurant_data dataset
+    '''
+
+    def setUp(self):
+        '''
+        Create a dummy dataset for testing: "thai garden" has two locations, and its
+        second location shares an address with "senor frog"
+        '''
+        data = {
+            "restaurant": ["thai garden", "senor frog", "thai garden", "thai garden", "thai garden"],
+            "address_id": ["1 broadway 10011", "2 bleecker 10014", "2 bleecker 10014", "1 broadway 10011", "1 broadway 10011"],
+            "inspectiondate": ["4/8/2016", "1/2/2014", "3/7/2012", "1/2/2014", "10/11/2015"],
+            "score": [10, 20, 30, 40, 60]
+        }
+
+        dummy_restaurants = pd.DataFrame(data, columns = ["restaurant", "address_id", "inspectiondate", "score"])
+        dummy_restaurants["inspectiondate"] = pd.to_datetime(dummy_restaurants["inspectiondate"], format = "%m/%d/%Y")
+        self.dummy_data = dummy_restaurants.set_index("restaurant")
+
+class LocationIndexTests(LocationIndexTestCase):
+
+    def test_get_locations(self):
+        '''
+        Test that get_locations returns every location of a restaurant with its row count and mean score
+        '''
+        locations = LocationIndex(self.dummy_data).get_locations("thai garden").sort_index()
+
+        self.assertEqual(list(locations.index), ["1 broadway 10011", "2 bleecker 10014"])
+        npt.assert_array_equal(locations["rows"], [3, 1])
+        npt.assert_array_equal(locations["mean_score"], [110 / 3, 30])
+
+    def test_get_data(self):
+        '''
+        Test that get_data returns only the rows of one location, sorted by inspection date
+        '''
+        data = LocationIndex(self.dummy_data).get_data(self.dummy_data, "thai garden", "1 broadway 10011")
+        npt.assert_array_equal(data["score"], [40, 60, 10])
+
+    def test_get_rows_unknown_location(self):
+        '''
+        Test that a restaurant without a location at the address raises KeyError
+        '''
+        with self.assertRaises(KeyError):
+            LocationIndex(self.dummy_data).get_rows("senor frog", "1 broadway 10011")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+# Author: Leslie Huang (lh1036)
+# Description: Unit testing for the zipcode spatial index and the nearby visualizer
+# I do not include unit tests for methods that only generate graphs
+
+from inspectiongrades import NearbyGrades
+from inspectiongrades.nearby import ZipIndex, ZipRadius, get_zip_index
+import unittest
+import pandas as pd
+import numpy as np
+import numpy.testing as npt
+
+class ZipIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Create a dummy table of centroids: zipcodes 1 and 2 miles north of 10011's, and one far away
+        '''
+        miles = 1 / 69.05
+        centroids = {
+            "zipcode": ["10011", "10001", "10018", "10314"],
+            "latitude": [40.74, 40.74 + miles, 40.74 + 2 * miles, 40.6],
+            "longitude": [-74., -74., -74., -74.16],
+        }
+        self.zip_index = ZipIndex(pd.DataFrame(centroids))
+
+    def test_neighbors(self):
+        '''
+        Test that neighbors returns the zipcodes within the radius, nearest first, starting with the zipcode itself
+        '''
+        self.assertEqual(self.zip_index.neighbors("10011", 1.5), ["10011", "10001"])
+        self.assertEqual(self.zip_index.neighbors("10018", 2.5), ["10018", "10001", "10011"])
+        self.assertEqual(self.zip_index.neighbors("10314", 0.1), ["10314"])
+
+    def test_distances(self):
+        '''
+        Test the distances in miles between centroids
+        '''
+        npt.assert_array_almost_equal(self.zip_index.distances("10011", ["10001", "10018"]), [1., 2.])
+
+    def test_unknown_zip(self):
+        '''
+        Test that a zipcode without a centroid raises KeyError
+        '''
+        self.assertFalse("foo" in self.zip_index)
+        with self.assertRaises(KeyError):
+            self.zip_index.neighbors("foo", 1)
+
+    def test_zip_radius_name(self):
+        '''
+        Test that the name of a radius search pluralises the unit
+        '''
+        self.assertEqual(str(ZipRadius("10011", 1)), "within 1 mile of 10011")
+        self.assertEqual(str(ZipRadius("10011", 2)), "within 2 miles of 10011")
+        self.assertEqual(str(ZipRadius("10011", 0.5)), "within 0.5 miles of 10011")
+
+    def test_bundled_centroids(self):
+        '''
+        Test that the bundled table covers the five boroughs, e.g. Chelsea's neighbors include the Flatiron
+        but not Staten Island
+        '''
+        neighbors = get_zip_index().neighbors("10011", 1)
+        self.assertIn("10010", neighbors)
+        self.assertNotIn("10314", neighbors)
+
+class NearbyGradesTests(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Create a dummy dataset for testing
+        '''
+        data = {
+            "restaurant": ["thai garden", "thai garden", "'za for days", "senor frog", "onion soup waterpark"],
+            "zipcode": ["10011", "10011", "10001", "10001", "10314"],
+            "cuisine_primary": ["thai", "thai", "pizza", "mexican", "french"],
+            "inspectiondate": pd.to_datetime(["2014-01-02", "2014-02-03", "2014-01-05", "2014-02-11", "2014-01-09"]),
+            "score": [12., 20., 30., None, 5.],
+            "grade": ["a", "b", "c", None, "a"],
+        }
+        dummy_data = pd.DataFrame(data).set_index("restaurant")
+        for col in ["cuisine_primary", "grade"]:
+            dummy_data[col] = dummy_data[col].astype("category")
+        self.dummy_data = dummy_data
+
+    def test_keys(self):
+        '''
+        Test that the query compares the zipcodes within the radius, and reads only their rows
+        '''
+        query = NearbyGrades(("10011", 1), self.dummy_data)
+
+        self.assertEqual(query.keys[0], "10011")
+        self.assertIn("10001", query.keys)
+        npt.assert_array_equal(query.get_group_data().index, ["thai garden", "thai garden", "'za for days", "senor frog"])
+
+    def test_injected_zip_index(self):
+        '''
+        Test that the query searches and measures distances in the zip_index it is given
+        '''
+        zip_index = ZipIndex(pd.DataFrame({"zipcode": ["10011", "10314"], "latitude": [40.74, 40.74], "longitude": [-74., -74. + 1 / 52.3]}))
+        query = NearbyGrades(("10011", 1.5), self.dummy_data, zip_index = zip_index)
+
+        self.assertIs(query.zip_index, zip_index)
+        self.assertEqual(query.keys, ["10011", "10314"])
+        npt.assert_array_almost_equal(query.zip_index.distances("10011", ["10314"]), [1.], decimal = 2)
+
+    def test_aggregate_area(self):
+        '''
+        Test the mean scores per zipcode (nearest first, without the zipcodes that have no rows) and pooled over the area
+        '''
+        query = NearbyGrades(("10011", 1), self.dummy_data)
+
+        by_zip = query.aggregate_area("group")
+        self.assertEqual(list(by_zip.index), ["10011", "10001"])
+        npt.assert_array_almost_equal(by_zip, [16., 30.])
+
+        self.assertEqual(query.aggregate_area("grade", "rows").loc["a"], 1)
+        npt.assert_array_almost_equal(query.aggregate_area("month"), [21., 20.])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+# Author: Leslie Huang (lh1036)
+# Description: Unit testing for the RestaurantRanking methods
+
+from inspectiongrades.ranking import RestaurantRanking
+import unittest
+import pandas as pd
+import numpy as np
+import numpy.testing as npt
+
+class RankingTestCase(unittest.TestCase):
+    '''
+    Base class for unittesting functions that require a restaurant_data dataset
+    '''
+
+    def setUp(self):
+        '''
+        Create a dummy dataset for testing
+        Note: In the cleaned dataset, all strings are lowercased for case-insensitive
+        matching to user input. I preserve the same convention here.
+        '''
+        data = {
+            "restaurant": ["thai garden", "thai garden", "'za for days", "'za for days", "sandwich world", "senor frog", "senor frog", "onion soup waterpark"],
+            "cuisine_primary": ["thai", "thai", "pizza", "pizza", "sandwiches", "sandwiches", "sandwiches", "french"],
+            "zipcode": ["10011", "10011", "10003", "10003", "10011", "11211", "11211", "10024"],
+            "score": [2, 6, 100, 80, 3, 3, 3, 57]
+        }
+
+        dummy_restaurants = pd.DataFrame(data, columns = ["restaurant", "cuisine_primary", "zipcode", "score"])
+        self.dummy_data = dummy_restaurants.set_index("restaurant")
+
+class RestaurantRankingTests(RankingTestCase):
+    '''
+    Unit tests for methods from the RestaurantRanking class
+    '''
+
+    def test_top_k_best(self):
+        '''
+        Test that top_k returns the k restaurants with the lowest mean scores, breaking ties by inspection count
+        '''
+        best = RestaurantRanking(self.dummy_data).top_k(2, 1)
+        self.assertEqual(list(best.index), ["senor frog", "sandwich world"])
+        npt.assert_array_equal(best["mean"], [3., 3.])
+
+    def test_top_k_worst(self):
+        '''
+        Test that top_k returns the restaurants with the highest mean scores, worst first
+        '''
+        worst = RestaurantRanking(self.dummy_data).top_k(3, 1, best = False)
+        self.assertEqual(list(worst.index), ["'za for days", "onion soup waterpark", "thai garden"])
+
+    def test_top_k_minimum_obs(self):
+        '''
+        Test that restaurants with fewer than minimum_obs inspections are excluded
+        '''
+        best = RestaurantRanking(self.dummy_data).top_k(10, 2)
+        self.assertEqual(list(best.index), ["senor frog", "thai garden", "'za for days"])
+
+    def test_top_k_name_tie_breaker(self):
+        '''
+        Test that restaurants with equal means are ordered alphabetically with the "name" tie breaker
+        '''
+        best = RestaurantRanking(self.dummy_data).top_k(1, 1, tie_breaker = "name")
+        self.assertEqual(list(best.index), ["sandwich world"])
+
+    def test_top_k_within_group(self):
+        '''
+        Test that top_k ranks only the restaurants in the requested zipcode
+        '''
+        ranking = RestaurantRanking(self.dummy_data)
+        best, worst = ranking.best_and_worst(1, 1, "zipcode", "10011")
+        self.assertEqual([best.index[0], worst.index[0]], ["sandwich world", "thai garden"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+# Author: Leslie Huang (lh1036)
+# Description: Unit testing for the RenderContext output modes
+# I do not test the appearance of graphs, only the files and decisions of the output modes
+
+from inspectiongrades.rendering import RenderContext, parse_render_options
+import unittest
+import os
+import tempfile
+import numpy as np
+import numpy.testing as npt
+
+class RenderContextTests(unittest.TestCase):
+
+    def test_save_output_format(self):
+        '''
+        Test that save writes the file with the extension of the output format and returns its name
+        '''
+        renderer = RenderContext(output_format = "png", dpi = 50)
+        fig, ax = renderer.new_axes()
+        ax.plot([1, 2, 3])
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = renderer.save(fig, os.path.join(directory, "Thai_restaurants_lettergrades.pdf"))
+
+            self.assertEqual(os.path.basename(filename), "Thai_restaurants_lettergrades.png")
+            self.assertTrue(os.path.exists(filename))
+
+    def test_new_figure_per_graph(self):
+        '''
+        Test that each graph gets a new figure by default, and the same cleared figure with reuse_figures
+        '''
+        renderer = RenderContext()
+        self.assertIsNot(renderer.new_figure(), renderer.new_figure())
+
+        renderer = RenderContext(reuse_figures = True)
+        fig, ax = renderer.new_axes()
+        self.assertIs(renderer.new_figure(), fig)
+        self.assertEqual(len(fig.axes), 0)
+
+    def test_reused_figure_reset(self):
+        '''
+        Test that a reused figure draws a graph like a new figure after a graph that changed the figure-level state
+        '''
+        def draw(renderer):
+            fig, ax = renderer.new_axes(figsize = (4, 3))
+            ax.bar(range(3), [1, 3, 2])
+            fig.canvas.draw()
+            return np.asarray(fig.canvas.buffer_rgba()).copy()
+
+        renderer = RenderContext(reuse_figures = True)
+        fig, ax = renderer.new_axes(figsize = (8, 2))
+        fig.suptitle("Previous Graph")
+        fig.subplots_adjust(left = 0.4, bottom = 0.3)
+        fig.set_facecolor("k")
+        fig.set_dpi(50)
+        fig.set_layout_engine("constrained")
+
+        npt.assert_array_equal(draw(renderer), draw(RenderContext()))
+
+    def test_invalid_output_format(self):
+        '''
+        Test that an unsupported output format raises ValueError
+        '''
+        with self.assertRaises(ValueError):
+            RenderContext(output_format = "gif")
+
+    def test_too_many_bars(self):
+        '''
+        Test that graphs switch to an aggregated representation only above max_bars
+        '''
+        self.assertFalse(RenderContext().too_many_bars(10000))
+        self.assertFalse(RenderContext(max_bars = 500).too_many_bars(500))
+        self.assertTrue(RenderContext(max_bars = 500).too_many_bars(501))
+
+    def test_parse_render_options(self):
+        '''
+        Test that the output options of a command line are parsed into RenderContext arguments, ignoring other arguments
+        '''
+        options = parse_render_options(["--format=png", "--dpi=72", "--rasterize", "--max-bars=500", "--workers=2", "cuisine"])
+        self.assertEqual(options, {"output_format": "png", "dpi": 72., "rasterize": True, "max_bars": 500})
+        self.assertEqual(RenderContext(**options).output_format, "png")
+        self.assertEqual(parse_render_options(["cuisine"]), {})
+
+        with self.assertRaises(ValueError):
+            parse_render_options(["--format=gif"])
+        with self.assertRaises(ValueError):
+            parse_render_options(["--max-bars=many"])
+
+    def test_annotate(self):
+        '''
+        Test that graphs are annotated only inside the annotate context
+        '''
+        renderer = RenderContext()
+
+        with renderer.annotate("Approximate") as annotated:
+            self.assertIs(annotated, renderer)
+            self.assertEqual(renderer.annotation, "Approximate")
+
+        self.assertIsNone(renderer.annotation)
+
+if __name__ == "__main__":
+    unittest.main()
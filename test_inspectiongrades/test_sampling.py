@@ -0,0 +1,90 @@
+# Author: Leslie Huang (lh1036)
+# Description: Unit testing for the stratified sample and the approximate previews drawn from it
+# I do not include unit tests for methods that only generate graphs
+
+from inspectiongrades import CuisineGrades, ZipGrades
+from inspectiongrades.sampling import StratifiedSample
+import unittest
+import pandas as pd
+import numpy as np
+import numpy.testing as npt
+
+class StratifiedSampleTests(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Create a dummy dataset of 1000 rows in 3 strata of different sizes
+        '''
+        n = 1000
+        data = {
+            "restaurant": ["restaurant {}".format(i % 50) for i in range(n)],
+            "boro": ["manhattan"] * 600 + ["brooklyn"] * 400,
+            "cuisine_primary": ["american"] * 600 + ["american"] * 250 + ["thai"] * 150,
+            "zipcode": ["10011"] * 600 + ["11211"] * 400,
+            "swc_type": ["no cafe", "enclosed"] * (n // 2),
+            "score": np.arange(n) % 30,
+            "grade": ["a"] * n,
+        }
+        dummy_data = pd.DataFrame(data).set_index("restaurant")
+        for col in ["boro", "cuisine_primary", "swc_type", "grade"]:
+            dummy_data[col] = dummy_data[col].astype("category")
+        self.dummy_data = dummy_data
+
+    def test_proportional(self):
+        '''
+        Test that the same fraction of each stratum is drawn (rounded up or down), without repeating rows
+        '''
+        sample = StratifiedSample(self.dummy_data, fraction = 0.1)
+        counts = sample.data.groupby(["boro", "cuisine_primary"], observed = True).size()
+
+        self.assertEqual(counts.loc[("manhattan", "american")], 60)
+        self.assertEqual(counts.loc[("brooklyn", "american")], 25)
+        self.assertEqual(counts.loc[("brooklyn", "thai")], 15)
+        self.assertEqual(len(np.unique(sample.rows)), len(sample.rows))
+
+    def test_seed(self):
+        '''
+        Test that the draw is reproducible
+        '''
+        npt.assert_array_equal(StratifiedSample(self.dummy_data).rows, StratifiedSample(self.dummy_data).rows)
+
+    def test_count(self):
+        '''
+        Test that count returns the number of rows of the full dataset, not of the sample
+        '''
+        sample = StratifiedSample(self.dummy_data, fraction = 0.1)
+
+        self.assertEqual(sample.count("cuisine_primary", "american"), 850)
+        self.assertEqual(sample.count("zipcode", "11211"), 400)
+        self.assertEqual(sample.count("zipcode", "99999"), 0)
+
+    def test_margin_of_error(self):
+        '''
+        Test the half-width of the 95% confidence interval of a mean, with the finite population correction
+        '''
+        sample = StratifiedSample(self.dummy_data, fraction = 0.2)
+        grouped = pd.Series([1., 3., 1., 3.]).groupby([0, 0, 0, 0])
+
+        npt.assert_array_almost_equal(sample.margin_of_error(grouped), [1.96 * np.sqrt(4 / 3) / 2 * np.sqrt(0.8)])
+
+    def test_preview(self):
+        '''
+        Test that a preview is a copy of the query on the sample, whose means carry error bars
+        '''
+        query = ZipGrades("10011", self.dummy_data)
+        preview = query.get_preview()
+
+        self.assertEqual(preview.zipcode, "10011")
+        self.assertIs(preview.data, query.get_sample().data)
+        self.assertEqual(list(preview.group_by_sidewalk().columns), ["score", "error"])
+        self.assertEqual(list(query.group_by_sidewalk().columns), ["score"])
+
+    def test_needs_preview(self):
+        '''
+        Test that only groups with at least min_rows rows are previewed
+        '''
+        self.assertTrue(CuisineGrades("american", self.dummy_data).needs_preview(800))
+        self.assertFalse(CuisineGrades("thai", self.dummy_data).needs_preview(800))
+
+if __name__ == "__main__":
+    unittest.main()
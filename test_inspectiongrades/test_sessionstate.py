@@ -0,0 +1,106 @@
+# Author: Leslie Huang (lh1036)
+# Description: Unit testing for the session state and the query lookups
+
+from inspectiongrades.precomputed import get_derived, has_derived, clear_derived
+from inspectiongrades.querylookups import QueryLookups
+from inspectiongrades.sessionstate import SessionState, dataset_fingerprint, load_session_state, describe_session_state
+import os
+import tempfile
+import unittest
+import pandas as pd
+
+class SessionStateTestCase(unittest.TestCase):
+    '''
+    Base class for unittesting functions that require a restaurant_data dataset
+    '''
+
+    def setUp(self):
+        '''
+        Create a dummy dataset for testing, and builders that count their calls
+        '''
+        data = {
+            "restaurant": ["thai garden", "thai garden", "'za for days", "'za for days", "senor frog", "senor frog", "thai palace"],
+            "zipcode": ["10011", "10011", "10011", "10011", "11211", "11211", "11211"],
+            "cuisine_primary": ["thai", "thai", "pizza", "pizza", "mexican", "mexican", "thai"],
+            "score": [20., 12., 30., 25., 9., 5., 7.],
+        }
+        self.dummy_data = pd.DataFrame(data).set_index("restaurant")
+
+        self.calls = []
+        self.builders = {
+            "query_lookups": lambda data: self.calls.append("query_lookups") or QueryLookups(data),
+            "mean_score": lambda data: self.calls.append("mean_score") or data["score"].mean(),
+        }
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "session_state.pkl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+class QueryLookupsTests(SessionStateTestCase):
+
+    def test_query_lookups(self):
+        '''
+        Test that only zipcodes with 2 restaurants that have 2 rows each are eligible
+        '''
+        lookups = QueryLookups(self.dummy_data)
+
+        self.assertEqual(lookups.cuisines, {"thai", "pizza", "mexican"})
+        self.assertEqual(lookups.zipcodes, {"10011", "11211"})
+        self.assertEqual(lookups.eligible_zipcodes, {"10011"})
+        self.assertEqual((lookups.restaurant_rows("thai garden"), lookups.restaurant_rows("qi")), (2, 0))
+
+class SessionStateTests(SessionStateTestCase):
+
+    def test_load_without_building(self):
+        '''
+        Test that a session on the same data loads and registers the saved structures without building them
+        '''
+        state, loaded = load_session_state(self.dummy_data, self.path, self.builders)
+        self.assertFalse(loaded)
+        self.assertEqual(self.calls, ["query_lookups", "mean_score"])
+
+        data = self.dummy_data.copy()
+        state, loaded = load_session_state(data, self.path, self.builders)
+        self.assertTrue(loaded)
+        self.assertEqual(self.calls, ["query_lookups", "mean_score"])
+        self.assertTrue(has_derived(data, "query_lookups"))
+        self.assertEqual(get_derived(data, "mean_score", None), self.dummy_data["score"].mean())
+
+    def test_rebuild_when_stale(self):
+        '''
+        Test that the state is rebuilt when the data changes, and when the file is of another version or unreadable
+        '''
+        load_session_state(self.dummy_data, self.path, self.builders)
+
+        changed = self.dummy_data.assign(score = self.dummy_data["score"] + 1)
+        self.assertNotEqual(dataset_fingerprint(changed), dataset_fingerprint(self.dummy_data))
+        state, loaded = load_session_state(changed, self.path, self.builders)
+        self.assertFalse(loaded)
+        self.assertEqual(get_derived(changed, "mean_score", None), changed["score"].mean())
+
+        SessionState(dataset_fingerprint(changed), {}, {}, len(changed), version = 0).save(self.path)
+        self.assertIsNone(SessionState.load(self.path))
+
+        with open(self.path, "wb") as file:
+            file.write(b"not a session state")
+        clear_derived(changed)
+        state, loaded = load_session_state(changed, self.path, self.builders)
+        self.assertFalse(loaded)
+        self.assertTrue(load_session_state(changed, self.path, self.builders)[1])
+
+    def test_describe(self):
+        '''
+        Test that the description lists every structure of the file
+        '''
+        load_session_state(self.dummy_data, self.path, self.builders)
+        description = describe_session_state(self.path)
+
+        self.assertIn("version 1", description)
+        self.assertIn("from 7 rows", description)
+        for name in self.builders:
+            self.assertIn(name, description)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+# Author: Leslie Huang (lh1036)
+# Description: Unit testing for the snapshot store and the change visualizer
+
+from inspectiongrades.snapshots import SnapshotStore
+from inspectiongrades.changevisualizer import ChangeGrades
+from inspectiongrades import CuisineGrades
+import unittest
+import tempfile
+import pandas as pd
+import numpy.testing as npt
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+def make_dummy_snapshots():
+    '''
+    Returns two dummy snapshots: the second adds one inspection and one restaurant to the first
+    '''
+    data = {
+        "restaurant": ["thai garden", "thai garden", "senor frog", "senor frog"],
+        "boro": ["manhattan", "manhattan", "manhattan", "manhattan"],
+        "zipcode": ["10011", "10011", "10012", "10012"],
+        "cuisine_primary": ["thai", "thai", "mexican", "mexican"],
+        "inspectiondate": ["1/2/2014", "3/7/2015", "4/8/2014", "10/11/2015"],
+        "score": [12., 20., 7., 9.],
+        "grade": ["a", "b", "a", "a"],
+        }
+    first = pd.DataFrame(data)
+    first["inspectiondate"] = pd.to_datetime(first["inspectiondate"], format = "%m/%d/%Y")
+    for col in ["boro", "cuisine_primary", "grade"]:
+        first[col] = first[col].astype("category")
+    first = first.set_index("restaurant")
+
+    new_rows = pd.DataFrame({
+        "restaurant": ["thai garden", "'za for days"],
+        "boro": ["manhattan", "brooklyn"],
+        "zipcode": ["10011", "11201"],
+        "cuisine_primary": ["thai", "pizza"],
+        "inspectiondate": pd.to_datetime(["2016-06-01", "2016-07-01"]),
+        "score": [30., None],
+        "grade": ["c", None],
+        }).set_index("restaurant")
+    second = pd.concat([first.astype(object), new_rows])
+    second["inspectiondate"] = pd.to_datetime(second["inspectiondate"])
+    second["score"] = second["score"].astype(float)
+    return first, second
+
+class SnapshotStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Store the first of two dummy snapshots
+        '''
+        self.first, self.second = make_dummy_snapshots()
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = SnapshotStore(self.directory.name)
+        self.store.save("2016-01", self.first)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        '''
+        Test that a snapshot reopened from disk equals the saved data, with categoricals for the categorical columns
+        '''
+        loaded = SnapshotStore(self.directory.name).load("2016-01")
+        pd.testing.assert_frame_equal(loaded, self.first)
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_round_trip_arrow_strings(self):
+        '''
+        Test that a snapshot of Arrow-backed strings (as read by clean_data(string_storage = "pyarrow")) is encoded
+        in the shared dictionaries and loads like the same snapshot of Python strings
+        '''
+        arrow = self.second.astype({col: "string[pyarrow]" for col in ["zipcode", "boro", "cuisine_primary", "grade"]})
+        arrow.index = arrow.index.astype("string[pyarrow]")
+        self.store.save("2016-07-arrow", arrow)
+        self.store.save("2016-07", self.second)
+
+        store = SnapshotStore(self.directory.name)
+        self.assertEqual(list(store.dictionaries["names"]), ["thai garden", "senor frog", "'za for days"])
+        pd.testing.assert_frame_equal(store.load("2016-07-arrow"), store.load("2016-07"))
+
+    def test_shared_dictionaries(self):
+        '''
+        Test that new values are appended to the shared dictionaries and that earlier snapshots still decode
+        '''
+        names = list(self.store.dictionaries["names"])
+        self.store.save("2016-07", self.second)
+
+        store = SnapshotStore(self.directory.name)
+        self.assertEqual(list(store.dictionaries["names"]), names + ["'za for days"])
+        self.assertEqual(list(store.dictionaries["cuisines"]), ["thai", "mexican", "pizza"])
+        pd.testing.assert_frame_equal(store.load("2016-01"), self.first)
+
+        second = store.load("2016-07")
+        npt.assert_array_equal(second["cuisine_primary"].cat.categories, ["mexican", "pizza", "thai"])
+        self.assertTrue(pd.isnull(second.loc["'za for days", "grade"]))
+
+    def test_previous(self):
+        '''
+        Test that snapshots are ordered by name
+        '''
+        self.store.save("2016-07", self.second)
+        self.assertEqual(self.store.names(), ["2016-01", "2016-07"])
+        self.assertEqual(self.store.previous("2016-07"), "2016-01")
+        self.assertIsNone(self.store.previous("2016-01"))
+
+    def test_visualizer_on_snapshot(self):
+        '''
+        Test that a visualizer can be built on a stored snapshot
+        '''
+        query = CuisineGrades("thai", self.store.load("2016-01"))
+        self.assertEqual(list(query.get_best_and_worst_names(1)), ["thai garden", "thai garden"])
+
+class ChangeGradesTests(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Store two dummy snapshots
+        '''
+        first, second = make_dummy_snapshots()
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = SnapshotStore(self.directory.name)
+        self.store.save("2016-01", first)
+        self.store.save("2016-07", second)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_from_store(self):
+        '''
+        Test that from_store compares the latest snapshot with the one before it
+        '''
+        query = ChangeGrades.from_store("cuisine_primary", "thai", self.store)
+        self.assertEqual(len(query.filter_data(query.data)), 3)
+        self.assertEqual(len(query.filter_data(query.previous_data)), 2)
+        self.assertEqual(query.label, "since 2016-01")
+
+    def test_no_previous_snapshot(self):
+        '''
+        Test that the first snapshot can't be compared
+        '''
+        with self.assertRaises(ValueError):
+            ChangeGrades.from_store(None, None, self.store, "2016-01")
+
+    def test_restaurant_changes(self):
+        '''
+        Test the change in mean score of restaurants in both snapshots
+        '''
+        query = ChangeGrades.from_store(None, None, self.store)
+        changes = query.get_restaurant_changes(1)
+        self.assertEqual(sorted(changes.index), ["senor frog", "thai garden"])
+        self.assertAlmostEqual(changes["thai garden"], (12. + 20. + 30.) / 3 - 16.)
+        self.assertAlmostEqual(changes["senor frog"], 0.)
+
+if __name__ == "__main__":
+    unittest.main()
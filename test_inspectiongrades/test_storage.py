@@ -0,0 +1,117 @@
+# Author: Leslie Huang (lh1036)
+# Description: Unit testing for the partitioned history storage
+# The storage mode requires pyarrow, so these tests are skipped without it
+
+from inspectiongrades import ZipGrades
+from inspectiongrades.querylookups import QueryLookups
+import unittest
+import tempfile
+import pandas as pd
+import numpy.testing as npt
+
+try:
+    from inspectiongrades.storage import write_partitioned, PartitionedData
+except ImportError:
+    PartitionedData = None
+
+@unittest.skipIf(PartitionedData is None, "pyarrow is not installed")
+class PartitionedDataTests(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Write a dummy dataset spanning two years and two boroughs to a temporary directory
+        '''
+        data = {
+            "restaurant": ["thai garden", "thai garden", "senor frog", "senor frog", "'za for days"],
+            "boro": ["manhattan", "manhattan", "manhattan", "manhattan", "brooklyn"],
+            "zipcode": ["10011", "10011", "10012", "10012", "11201"],
+            "cuisine_primary": ["thai", "thai", "mexican", "mexican", "pizza"],
+            "inspectiondate": ["1/2/2014", "3/7/2015", "4/8/2014", "10/11/2015", "9/27/2014"],
+            "score": [12., 20., 7., 9., 30.],
+            "grade": ["a", "b", "a", "a", "c"],
+            }
+        dummy_data = pd.DataFrame(data)
+        dummy_data["inspectiondate"] = pd.to_datetime(dummy_data["inspectiondate"], format = "%m/%d/%Y")
+
+        self.dummy_data = dummy_data.set_index("restaurant")
+
+        self.directory = tempfile.TemporaryDirectory()
+        write_partitioned(self.dummy_data, self.directory.name)
+        self.storage = PartitionedData(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_filter(self):
+        '''
+        Test that read returns only the rows of the value, with only the requested columns
+        '''
+        data = self.storage.read("zipcode", "10011", ["score", "inspectiondate"])
+
+        self.assertEqual(list(data.columns), ["score", "inspectiondate"])
+        npt.assert_array_equal(data.index, ["thai garden", "thai garden"])
+        npt.assert_array_equal(data["score"], [12., 20.])
+
+    def test_read_list(self):
+        '''
+        Test that read returns the rows of every value in a list (as read by comparison queries)
+        '''
+        data = self.storage.read("zipcode", ["10011", "11201"], ["score"])
+        self.assertEqual(sorted(data["score"]), [12., 20., 30.])
+
+    def test_read_years(self):
+        '''
+        Test that read returns only the rows of the requested years
+        '''
+        data = self.storage.read("boro", "manhattan", ["score"], years = [2015])
+        self.assertEqual(sorted(data["score"]), [9., 20.])
+
+    def test_memory_budget(self):
+        '''
+        Test that a query over the memory budget raises MemoryError
+        '''
+        with self.assertRaises(MemoryError):
+            self.storage.read(max_bytes = 10)
+
+    def test_from_storage(self):
+        '''
+        Test that a visualizer built from storage holds only the rows of its query
+        '''
+        query = ZipGrades.from_storage("10012", self.storage)
+        npt.assert_array_equal(query.data.index, ["senor frog", "senor frog"])
+        self.assertEqual(query.get_best_and_worst_names(1), ["senor frog", "senor frog"])
+
+    def test_from_storage_budget(self):
+        '''
+        Test that a visualizer built from storage is held to the storage's memory budget
+        '''
+        with self.assertRaises(MemoryError):
+            ZipGrades.from_storage("10012", PartitionedData(self.directory.name, max_bytes = 10))
+
+    def test_catalog(self):
+        '''
+        Test that the catalog has one row per restaurant, zipcode and cuisine, and validates input like the full data
+        '''
+        catalog = self.storage.read_catalog()
+
+        self.assertEqual(len(catalog), 3)
+        self.assertEqual(catalog.loc["thai garden", "rows"], 2)
+
+        lookups, full_lookups = QueryLookups(catalog), QueryLookups(self.dummy_data)
+        self.assertEqual(lookups.restaurant_counts, full_lookups.restaurant_counts)
+        self.assertEqual((lookups.cuisines, lookups.zipcodes), (full_lookups.cuisines, full_lookups.zipcodes))
+        self.assertEqual(lookups.eligible_zipcodes, full_lookups.eligible_zipcodes)
+
+    def test_catalog_rewrite(self):
+        '''
+        Test that rewriting a partition replaces its rows of the catalog and keeps those of the others
+        '''
+        brooklyn = self.dummy_data[self.dummy_data["boro"] == "brooklyn"]
+        write_partitioned(pd.concat([brooklyn, brooklyn]), self.directory.name)
+        catalog = self.storage.read_catalog()
+
+        self.assertEqual(catalog.loc["'za for days", "rows"], 2)
+        self.assertEqual(catalog.loc["thai garden", "rows"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
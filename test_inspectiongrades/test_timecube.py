@@ -0,0 +1,100 @@
+# Author: Leslie Huang (lh1036)
+# Description: Unit testing for the monthly time cube and the trend visualizer
+
+from inspectiongrades.timecube import TimeCube, load_time_cube
+from inspectiongrades import TrendGrades
+import unittest
+import os
+import tempfile
+import pandas as pd
+import numpy as np
+import numpy.testing as npt
+
+class TimeCubeTests(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Create a dummy dataset spanning three months
+        '''
+        data = {
+            "restaurant": ["thai garden", "thai garden", "senor frog", "senor frog", "'za for days", "'za for days"],
+            "boro": ["manhattan", "manhattan", "manhattan", "manhattan", "brooklyn", "brooklyn"],
+            "cuisine_primary": ["thai", "thai", "mexican", "mexican", "pizza", "pizza"],
+            "inspectiondate": ["1/2/2014", "1/20/2014", "1/8/2014", "2/11/2014", "2/27/2014", "3/3/2014"],
+            "score": [12., 20., 7., None, 30., 10.],
+            "grade": ["a", "b", "a", None, "c", "a"],
+            }
+        self.dummy_data = pd.DataFrame(data).set_index("restaurant")
+        self.dummy_data["inspectiondate"] = pd.to_datetime(self.dummy_data["inspectiondate"], format = "%m/%d/%Y")
+        self.cube = TimeCube(self.dummy_data)
+
+    def test_cells(self):
+        '''
+        Test that the cube has one cell per month, borough and cuisine, with the counts and sums of its rows
+        '''
+        self.assertEqual(len(self.cube.cells), 5)
+        self.assertEqual(list(self.cube.months()), list(pd.to_datetime(["2014-01-01", "2014-02-01", "2014-03-01"])))
+        self.assertEqual(self.cube.cells["rows"].sum(), 6)
+        self.assertEqual(self.cube.cells["score_count"].sum(), 5)
+
+    def test_mean_scores(self):
+        '''
+        Test the monthly mean scores by borough and citywide, with rows without a score left out
+        '''
+        means = self.cube.mean_scores("boro")
+        self.assertAlmostEqual(means.loc["2014-01-01", "manhattan"], 13.)
+        self.assertTrue(np.isnan(means.loc["2014-02-01", "manhattan"]))
+        npt.assert_array_almost_equal(self.cube.mean_scores()["score"], [13., 30., 10.])
+
+    def test_grade_shares(self):
+        '''
+        Test the monthly share of each grade among the A, B and C grades
+        '''
+        shares = self.cube.grade_shares()
+        npt.assert_array_almost_equal(shares.loc["2014-01-01"], [2 / 3, 1 / 3, 0])
+        self.assertAlmostEqual(self.cube.grade_shares("cuisine_primary", ["pizza"], "a").loc["2014-03-01", "pizza"], 1.)
+
+    def test_incremental_refresh(self):
+        '''
+        Test that a saved cube refreshed with newer data equals a cube built from all the data
+        '''
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "time_cube.csv")
+            load_time_cube(self.dummy_data[self.dummy_data["inspectiondate"] < "2014-02-15"], path)
+            refreshed = load_time_cube(self.dummy_data, path)
+
+        self.assertEqual(list(refreshed.months()), list(self.cube.months()))
+        pd.testing.assert_frame_equal(refreshed.cells, self.cube.cells, check_dtype = False)
+
+    def test_rebuild_when_stale(self):
+        '''
+        Test that a saved cube is rebuilt when rows before its last month changed, and refreshed when only their order did
+        '''
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "time_cube.csv")
+            load_time_cube(self.dummy_data, path)
+
+            self.assertTrue(TimeCube.load(path).matches(self.dummy_data.iloc[::-1]))
+
+            changed = self.dummy_data.copy()
+            changed.iloc[0, changed.columns.get_loc("score")] = 40.
+            self.assertFalse(TimeCube.load(path).matches(changed))
+
+            rebuilt = load_time_cube(changed, path)
+
+        pd.testing.assert_frame_equal(rebuilt.cells, TimeCube(changed).cells, check_dtype = False)
+        self.assertAlmostEqual(rebuilt.mean_scores()["score"].iloc[0], (40. + 20. + 7.) / 3)
+
+    def test_trend_visualizer(self):
+        '''
+        Test that the dashboard's groups and trends come from the cube
+        '''
+        dashboard = TrendGrades(self.dummy_data, top_cuisines = 2)
+        self.assertEqual(dashboard.get_groups("cuisine_primary"), ["mexican", "pizza"])
+
+        means, a_shares = dashboard.get_trends("cuisine_primary")
+        self.assertEqual(list(means.columns), ["Mexican", "Pizza"])
+        self.assertAlmostEqual(a_shares.loc["2014-01-01", "Mexican"], 1.)
+
+if __name__ == "__main__":
+    unittest.main()
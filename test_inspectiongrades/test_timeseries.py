@@ -0,0 +1,59 @@
+# Author: Leslie Huang (lh1036)
+# Description: Unit testing for the timeseries preparation functions
+
+from inspectiongrades.timeseries import *
+import unittest
+import pandas as pd
+import numpy as np
+import numpy.testing as npt
+
+class TimeseriesTestCase(unittest.TestCase):
+    '''
+    Base class for unittesting functions that require inspection rows
+    '''
+
+    def setUp(self):
+        '''
+        Create a dummy dataset for testing: the 1/2/2014 inspection has two violation rows
+        '''
+        data = {
+            "restaurant": ["thai garden", "thai garden", "thai garden", "thai garden"],
+            "inspectiondate": ["1/2/2014", "1/2/2014", "1/20/2014", "3/7/2014"],
+            "score": [12, 12, 20, 7]
+        }
+
+        dummy_restaurants = pd.DataFrame(data, columns = ["restaurant", "inspectiondate", "score"])
+        dummy_restaurants["inspectiondate"] = pd.to_datetime(dummy_restaurants["inspectiondate"], format = "%m/%d/%Y")
+        self.dummy_data = dummy_restaurants.set_index("restaurant")
+
+class TimeseriesTests(TimeseriesTestCase):
+
+    def test_collapse_inspections(self):
+        '''
+        Test that duplicated violation rows are collapsed to one point per inspection date
+        '''
+        npt.assert_array_equal(collapse_inspections(self.dummy_data), [12, 20, 7])
+
+    def test_resample_scores(self):
+        '''
+        Test that resampling returns monthly means and drops months without inspections
+        '''
+        npt.assert_array_equal(resample_scores(collapse_inspections(self.dummy_data), "M"), [16, 7])
+
+    def test_lttb_downsample(self):
+        '''
+        Test that downsampling caps the number of points, keeps the endpoints and keeps the spike
+        '''
+        dates = pd.date_range("1/1/2010", periods = 1000, freq = "D")
+        scores = pd.Series(np.zeros(1000), index = dates)
+        scores.iloc[500] = 100
+
+        downsampled = lttb_downsample(scores, 50)
+
+        self.assertEqual(len(downsampled), 50)
+        self.assertEqual(downsampled.index[0], dates[0])
+        self.assertEqual(downsampled.index[-1], dates[-1])
+        self.assertEqual(downsampled.max(), 100)
+
+if __name__ == "__main__":
+    unittest.main()
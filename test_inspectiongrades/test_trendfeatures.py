@@ -0,0 +1,105 @@
+# Author: Leslie Huang (lh1036)
+# Description: Unit testing for the per-restaurant trend features and the most improved and declined restaurants
+
+from inspectiongrades import CuisineGrades, ZipGrades
+from inspectiongrades.trendfeatures import TrendFeatures, build_features
+import unittest
+import pandas as pd
+import numpy as np
+import numpy.testing as npt
+
+class TrendFeaturesTestCase(unittest.TestCase):
+    '''
+    Base class for unittesting functions that require a restaurant_data dataset
+    '''
+
+    def setUp(self):
+        '''
+        Create a dummy dataset for testing: thai garden improves, thai palace declines, and the
+        two rows of 'za for days on 2014-03-01 are one inspection
+        '''
+        data = {
+            "restaurant": ["thai garden"] * 5 + ["thai palace"] * 5 + ["'za for days"] * 4 + ["senor frog"],
+            "zipcode": ["10011"] * 10 + ["11211"] * 5,
+            "cuisine_primary": ["thai"] * 10 + ["pizza"] * 4 + ["mexican"],
+            "inspectiondate": pd.to_datetime(
+                ["2014-01-01", "2015-01-01", "2016-01-01", "2017-01-01", "2018-01-01"] * 2 +
+                ["2014-01-01", "2014-03-01", "2014-03-01", "2014-06-01"] + ["2014-01-01"]
+            ),
+            "score": [40., 30., 20., 10., 0.] + [5., 10., 15., 20., 25.] + [10., 20., 20., None] + [12.],
+        }
+        self.dummy_data = pd.DataFrame(data).set_index("restaurant")
+
+class TrendFeaturesTests(TrendFeaturesTestCase):
+
+    def test_build_features(self):
+        '''
+        Test the features of each restaurant within its zipcode
+        '''
+        features = build_features(self.dummy_data, "zipcode", window = 3).set_index("restaurant")
+
+        self.assertEqual(list(features.index), ["thai garden", "thai palace", "'za for days", "senor frog"])
+        npt.assert_array_equal(features["count"], [5, 5, 2, 1])
+        npt.assert_array_equal(features["latest_score"], [0., 25., 20., 12.])
+        npt.assert_array_equal(features["rolling_mean"], [10., 20., 15., 12.])
+        npt.assert_allclose(features["slope"][:2], [-10., 5.], rtol = 1e-3)
+        self.assertTrue(np.isnan(features.loc["senor frog", "slope"]))
+        npt.assert_array_equal(features["days_since_last"], [0, 0, 1402, 1461])
+
+    def test_matches_groupby(self):
+        '''
+        Test that the vectorized features equal those computed restaurant by restaurant on random data
+        '''
+        rng = np.random.RandomState(0)
+        n = 2000
+        data = pd.DataFrame({
+            "restaurant": rng.randint(0, 150, n).astype(str),
+            "zipcode": rng.choice(["10011", "11211", "10003"], n),
+            "inspectiondate": pd.Timestamp("2014-01-01") + pd.to_timedelta(rng.randint(0, 1000, n), unit = "D"),
+            "score": rng.randint(0, 60, n).astype(float),
+        }).set_index("restaurant")
+
+        features = build_features(data, "zipcode", window = 4).set_index(["group", "restaurant"])
+
+        for (zipcode, restaurant), rows in data.groupby(["zipcode", data.index]):
+            scores = rows.groupby("inspectiondate")["score"].mean()
+            years = (scores.index - data["inspectiondate"].min()).days / 365.25
+            row = features.loc[(zipcode, restaurant)]
+
+            self.assertEqual(row["count"], len(scores))
+            self.assertEqual(row["latest_score"], scores.iloc[-1])
+            self.assertAlmostEqual(row["rolling_mean"], scores.iloc[-4:].mean())
+            if len(scores) > 1:
+                self.assertAlmostEqual(row["slope"], np.polyfit(years, scores.values, 1)[0])
+
+    def test_top_movers(self):
+        '''
+        Test that the most improved restaurants have falling scores, and restaurants with fewer than minimum_obs inspections are excluded
+        '''
+        improved, declined = TrendFeatures(self.dummy_data).improved_and_declined(10, 2, "zipcode", "10011")
+        self.assertEqual(list(improved.index), ["thai garden"])
+        self.assertEqual(list(declined.index), ["thai palace"])
+
+        improved, declined = TrendFeatures(self.dummy_data).improved_and_declined(10, 3, "zipcode", "11211")
+        self.assertEqual(len(improved) + len(declined), 0)
+
+    def test_visualizers(self):
+        '''
+        Test that the cuisine and zipcode visualizers rank the restaurants of their own group
+        '''
+        improved, declined = CuisineGrades("thai", self.dummy_data).get_improved_and_declined(10, 5)
+        self.assertEqual((list(improved.index), list(declined.index)), (["thai garden"], ["thai palace"]))
+
+        improved, declined = ZipGrades("11211", self.dummy_data).get_improved_and_declined(10, 2)
+        self.assertEqual((list(improved.index), list(declined.index)), ([], ["'za for days"]))
+
+    def test_graph_labels(self):
+        '''
+        Test the names the shared graphs of the cuisine and zipcode visualizers are labelled with
+        '''
+        cuisine, zipcode = CuisineGrades("thai", self.dummy_data), ZipGrades("11211", self.dummy_data)
+        self.assertEqual((cuisine.get_name(), cuisine.describe_restaurants()), ("Thai", "Thai Restaurants"))
+        self.assertEqual((zipcode.get_name(), zipcode.describe_restaurants()), ("11211", "Restaurants in 11211"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+# Author: Leslie Huang (lh1036)
+# Description: Unit testing for the violation code profiles
+# I do not include unit tests for methods that only generate graphs
+
+from inspectiongrades import CuisineGrades, ZipGrades
+from inspectiongrades.precomputed import set_derived
+from inspectiongrades.violations import ViolationProfiles
+import unittest
+import pandas as pd
+import numpy as np
+import numpy.testing as npt
+
+class ViolationProfilesTests(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Create a dummy dataset with one row per violation: 4 inspections of 3 restaurants,
+        one of which cited no violation
+        '''
+        data = {
+            "restaurant": ["thai garden", "thai garden", "thai garden", "thai garden", "senor frog", "senor frog", "'za for days"],
+            "zipcode": ["10011", "10011", "10011", "10011", "10012", "10012", "10011"],
+            "cuisine_primary": ["thai", "thai", "thai", "thai", "mexican", "mexican", "pizza"],
+            "inspectiondate": pd.to_datetime(["2014-01-02", "2014-01-02", "2014-01-02", "2015-03-07", "2014-04-08", "2014-04-08", "2014-09-27"]),
+            "score": [12., 12., 12., 20., 7., 7., 0.],
+            "grade": ["a", "a", "a", "b", "a", "a", "a"],
+            "violationcode": ["04l", "10f", "04l", "04l", "10f", "02g", ""],
+        }
+        self.dummy_data = pd.DataFrame(data).set_index("restaurant")
+
+        # the same inspections, one row each, and their violation codes
+        inspections = self.dummy_data.drop("violationcode", axis = 1).drop_duplicates()
+        self.inspection_data = inspections.assign(inspection_id = np.arange(len(inspections)))
+        self.violations = pd.DataFrame({"inspection_id": [0, 0, 1, 2, 2], "violationcode": ["04l", "10f", "04l", "10f", "02g"]})
+
+    def test_rates_from_rows(self):
+        '''
+        Test the citywide and per group rates of data with one row per violation
+        A code cited twice at one inspection counts once; the inspection without violations counts in the denominators
+        '''
+        profiles = ViolationProfiles(self.dummy_data)
+
+        self.assertEqual(list(profiles.codes), ["02g", "04l", "10f"])
+        npt.assert_array_almost_equal(profiles.get_rates(), [0.25, 0.5, 0.5])
+        npt.assert_array_almost_equal(profiles.get_rates("cuisine_primary", "thai"), [0., 1., 0.5])
+        npt.assert_array_almost_equal(profiles.get_rates("zipcode", "10011"), [0., 2 / 3, 1 / 3])
+        npt.assert_array_almost_equal(profiles.get_rates("zipcode", "99999"), [0., 0., 0.])
+
+    def test_rates_from_table(self):
+        '''
+        Test that profiles built from data with one row per inspection and its violations table are the same
+        '''
+        from_rows = ViolationProfiles(self.dummy_data)
+        from_table = ViolationProfiles(self.inspection_data, self.violations)
+
+        pd.testing.assert_frame_equal(from_table.get_profiles("cuisine_primary"), from_rows.get_profiles("cuisine_primary"))
+        pd.testing.assert_series_equal(from_table.get_rates(), from_rows.get_rates())
+
+    def test_get_profiles(self):
+        '''
+        Test that the batch of profiles has the rates of each group
+        '''
+        profiles = ViolationProfiles(self.dummy_data)
+        batch = profiles.get_profiles("cuisine_primary")
+
+        self.assertEqual(sorted(batch.index), ["mexican", "pizza", "thai"])
+        for cuisine in batch.index:
+            npt.assert_array_almost_equal(batch.loc[cuisine], profiles.get_rates("cuisine_primary", cuisine))
+
+    def test_top_violations(self):
+        '''
+        Test that top_violations returns the most cited codes of the group with their ratio to the citywide rate
+        '''
+        top = ViolationProfiles(self.dummy_data).top_violations("cuisine_primary", "thai", 5)
+
+        self.assertEqual(list(top.index), ["04l", "10f"])
+        npt.assert_array_almost_equal(top["ratio"], [2., 1.])
+
+    def test_visualizer_profiles(self):
+        '''
+        Test that visualizers find the profiles registered for data with one row per inspection,
+        and that the violation graph is only made when the codes are available
+        '''
+        self.assertTrue(ZipGrades("10011", self.dummy_data).has_violation_codes())
+        self.assertFalse(ZipGrades("10011", self.inspection_data).has_violation_codes())
+
+        set_derived(self.inspection_data, "violation_profiles", ViolationProfiles(self.inspection_data, self.violations))
+        query = CuisineGrades("thai", self.inspection_data)
+
+        self.assertTrue(query.has_violation_codes())
+        self.assertEqual(list(query.get_top_violations(1).index), ["04l"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -89,6 +89,26 @@ class VisualizerTests(VisualizerTestCase):
         
         npt.assert_array_equal(Visualizer(self.dummy_data).group_scores_by_category(), test_restaurants.sort_values(by = "score"))
 
+    def test_filter_data_valid_values_categorical(self):
+        '''
+        Test that a categorical column is filtered on its display labels and returned with the labels as values
+        '''
+        self.dummy_data["grade"] = self.dummy_data["grade"].astype("category")
+        data = Visualizer(self.dummy_data).filter_data_valid_values("grade", ["A", "B", "Grade Pending"])
+        
+        npt.assert_array_equal(data.index, ["thai garden", "sandwich world", "onion soup waterpark", "senor frog"])
+        npt.assert_array_equal(data["grade"], ["A", "A", "Grade Pending", "B"])
+        self.assertEqual(list(data["grade"].cat.categories), ["A", "B", "Grade Pending"])
+    
+    def test_group_scores_by_category_labels(self):
+        '''
+        Test that the cuisine categories of group_scores_by_category are capitalized, for object and categorical columns
+        '''
+        self.assertEqual(list(Visualizer(self.dummy_data).group_scores_by_category().index), ["Thai", "Sandwiches", "French", "Pizza"])
+        
+        self.dummy_data["cuisine_primary"] = self.dummy_data["cuisine_primary"].astype("category")
+        self.assertEqual(list(Visualizer(self.dummy_data).group_scores_by_category().index), ["Thai", "Sandwiches", "French", "Pizza"])
+
 class GetBestAndWorstDataTests(VisualizerTestCase):
     '''
     Check that get_best_and_worst_data returns the DataFrames of the best and worst restaurants
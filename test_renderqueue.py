@@ -0,0 +1,113 @@
+# Author: Leslie Huang (lh1036)
+# Description: unit tests for the background render queue
+
+import unittest
+import threading
+from renderqueue import RenderQueue
+from inspectiongrades.rendering import default_context
+
+class RenderQueueTests(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Create a render queue that collects its notifications
+        '''
+        self.notifications = []
+        self.queue = RenderQueue(max_pending = 1, notify = self.notifications.append)
+
+    def tearDown(self):
+        self.queue.close()
+
+    def test_notify_files(self):
+        '''
+        Test that a rendered query's files are returned and notified
+        '''
+        future = self.queue.submit("cuisine thai", lambda renderer: ["thai.pdf"])
+
+        self.assertEqual(future.result(), ["thai.pdf"])
+        self.queue.close()
+        self.assertIn("cuisine thai", self.notifications[0])
+        self.assertIn("thai.pdf", self.notifications[0])
+
+    def test_notify_error(self):
+        '''
+        Test that a failed query is notified and the queue keeps rendering the next ones
+        '''
+        def fail(renderer):
+            raise ValueError("no data")
+
+        self.queue.submit("cuisine soup", fail)
+        self.queue.submit("cuisine thai", lambda renderer: ["thai.pdf"])
+        self.queue.close()
+
+        self.assertIn("no data", self.notifications[0])
+        self.assertIn("thai.pdf", self.notifications[1])
+
+    def test_preview(self):
+        '''
+        Test that a query's preview is rendered and notified before its exact graphs, and that a failed preview
+        does not stop the exact graphs
+        '''
+        def fail(renderer):
+            raise ValueError("no sample")
+
+        self.queue.submit("cuisine thai", lambda renderer: ["thai.pdf"], lambda renderer: ["thai.pdf"])
+        self.queue.submit("cuisine pizza", lambda renderer: ["pizza.pdf"], fail)
+        self.queue.close()
+
+        self.assertIn("Approximate graphs for cuisine thai", self.notifications[0])
+        self.assertIn("Graphs for cuisine thai are ready", self.notifications[1])
+        self.assertIn("no sample", self.notifications[2])
+        self.assertIn("pizza.pdf", self.notifications[3])
+
+    def test_bounded_queue(self):
+        '''
+        Test that submitting more than max_pending queries waits for one to finish
+        '''
+        started, finish = threading.Event(), threading.Event()
+
+        def render(renderer):
+            started.set()
+            finish.wait()
+            return []
+
+        self.queue.submit("first", render)
+        started.wait()
+        second = threading.Thread(target = self.queue.submit, args = ("second", lambda renderer: []))
+        second.start()
+        second.join(0.2)
+
+        # the second query is still waiting for a slot
+        self.assertTrue(second.is_alive())
+        self.assertEqual(self.queue.count_pending(), 1)
+
+        finish.set()
+        second.join()
+        self.queue.close()
+        self.assertEqual(len(self.notifications), 2)
+
+    def test_close_drains(self):
+        '''
+        Test that close waits for the queued queries
+        '''
+        queue = RenderQueue(max_pending = 3, notify = self.notifications.append)
+        for label in ["first", "second", "third"]:
+            queue.submit(label, lambda renderer: [])
+        queue.close()
+
+        self.assertEqual(queue.count_pending(), 0)
+        self.assertEqual(len(self.notifications), 3)
+
+    def test_renderer_per_worker(self):
+        '''
+        Test that queries get the worker's own renderer, reused across queries
+        '''
+        renderers = []
+        for label in ["first", "second"]:
+            self.queue.submit(label, lambda renderer: renderers.append(renderer) or []).result()
+
+        self.assertIs(renderers[0], renderers[1])
+        self.assertIsNot(renderers[0], default_context)
+
+if __name__ == "__main__":
+    unittest.main()
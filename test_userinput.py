@@ -113,6 +113,20 @@ class ValidateZipTests(ZipTestCase):
         '''
         with self.assertRaises(InvalidZipError):
             validate_zip("foo", self.dummy_data)
+    
+    def test_valid_nearby(self):
+        '''
+        Test that validate_nearby returns the zipcode and the radius as a float
+        '''
+        self.assertEqual(validate_nearby("10011, 1.5", self.dummy_data), ("10011", 1.5))
+    
+    def test_invalid_radius(self):
+        '''
+        Test that validate_nearby raises exception when the radius is missing, not a number, or out of range
+        '''
+        for userinput in ["10011", "10011, one", "10011, 0", "10011, 100"]:
+            with self.assertRaises(InvalidRadiusError):
+                validate_nearby(userinput, self.dummy_data)
 
 ### Unit testing of the prompt functions for cuisine, restaurant, and zipcode
 
@@ -123,6 +137,12 @@ class PromptForCuisineTests(RestaurantDataTestCase):
         '''
         self.assertEqual(prompt_for_cuisine(self.dummy_data, lambda _: "Thai"), "thai")
     
+    def test_prompt_cuisine_comparison(self):
+        '''
+        takes a comma-separated list of valid strings and passes a list of valid (lowercased) strings
+        '''
+        self.assertEqual(prompt_for_cuisine_comparison(self.dummy_data, lambda _: "Thai, pizza,French"), ["thai", "pizza", "french"])
+    
 class PromptForRestaurantTests(RestaurantDataTestCase):
     def test_prompt_valid_restaurant(self):
         '''
@@ -136,6 +156,18 @@ class PromptForZipTests(ZipTestCase):
         takes valid zipcode (as string from userinput) and passes valid zipcode
         '''        
         self.assertEqual(prompt_for_zip(self.dummy_data, lambda _: "10011"), "10011")
+    
+    def test_prompt_zip_comparison(self):
+        '''
+        takes a comma-separated list of valid zipcodes and passes a list of valid zipcodes
+        '''
+        self.assertEqual(prompt_for_zip_comparison(self.dummy_data, lambda _: "10011, 10011"), ["10011", "10011"])
+    
+    def test_prompt_nearby(self):
+        '''
+        takes a valid zipcode and radius and passes them, formatted for the query's label
+        '''
+        self.assertEqual(str(prompt_for_nearby(self.dummy_data, lambda _: "10011, 2")), "within 2 miles of 10011")
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,17 @@
 # Author: Leslie Huang (lh1036)
 # Description: Helper functions to prompt and handle userinput of year in the "main"
 
-from inspectiongrades import CuisineGrades, RestaurantGrades, ZipGrades
+from inspectiongrades import CuisineGrades, RestaurantGrades, ZipGrades, TrendGrades, CuisineComparison, ZipComparison, NearbyGrades
+from inspectiongrades.nearby import ZipRadius, MAX_RADIUS, get_zip_index
+from inspectiongrades.precomputed import get_derived
+from inspectiongrades.querylookups import QueryLookups
 from exceptions import *
-from collections import Counter
+
+def get_query_lookups(restaurant_data):
+    '''
+    Returns the QueryLookups of restaurant_data (built once and shared by every prompt, or loaded with the session state)
+    '''
+    return get_derived(restaurant_data, "query_lookups", QueryLookups)
 
 def quitting_input(prompt, input_function = input):
     '''
@@ -16,27 +24,68 @@ def quitting_input(prompt, input_function = input):
     
     return userinput
     
-def prompt_for_browsechoice(restaurant_data, input_function = input):
+def prompt_for_browsechoice(restaurant_data, input_function = input, storage = None, render_queue = None):
     '''
     Prompt user to choose how they want to browse the data, 
     and executes appropriate program
+    @param storage: if given, a storage.PartitionedData from which each query reads only its own rows,
+    and restaurant_data is only used to validate user input
+    @param render_queue: if given, a renderqueue.RenderQueue that renders each query in the background
+    while the user is prompted for the next one; otherwise each query is rendered before prompting again
     '''
     choices = {
         "restaurant": (prompt_for_restaurant_name, RestaurantGrades), 
         "cuisine": (prompt_for_cuisine, CuisineGrades), 
-        "zipcode": (prompt_for_zip, ZipGrades)
+        "zipcode": (prompt_for_zip, ZipGrades),
+        "compare cuisines": (prompt_for_cuisine_comparison, CuisineComparison),
+        "compare zipcodes": (prompt_for_zip_comparison, ZipComparison),
+        "near": (prompt_for_nearby, NearbyGrades)
     }
         
     while True:
         try:
-            userinput = quitting_input("Enter 'restaurant' to search for a specific restaurant by name, 'zipcode' to visualize grades by zipcode, or 'cuisine' to visualize grades by cuisine category, or 'finish' when you're done.\n", input_function)
+            userinput = quitting_input("Enter 'restaurant' to search for a specific restaurant by name, 'zipcode' to visualize grades by zipcode, 'cuisine' to visualize grades by cuisine category, 'compare cuisines' or 'compare zipcodes' to compare several side by side, 'near' to visualize grades of all the zipcodes near one, 'trends' to visualize citywide monthly trends, or 'finish' when you're done.\n", input_function)
+            
+            # the trend dashboard is drawn from the time cube, not from a query's rows
+            if userinput == "trends":
+                label, render = "citywide trends", lambda renderer: TrendGrades(restaurant_data, renderer = renderer).make_graphs()
+                preview = None
+            else:
+                prompt, cls = choices[userinput]
+                key = prompt(restaurant_data, input_function)
+                label, render = make_render_function(cls, key, restaurant_data, storage)
+                preview = make_preview_function(cls, key, restaurant_data, storage)
             
-            prompt, cls = choices[userinput]
-            cls(prompt(restaurant_data, input_function), restaurant_data).make_graphs()
+            if render_queue is None:
+                render(None)
+            else:
+                render_queue.submit(label, render, preview)
         
         except KeyError:
             print("Try again.\n")
 
+def make_render_function(cls, key, restaurant_data, storage = None):
+    '''
+    Returns a tuple (label of the query, function that takes a RenderContext and returns the query's saved file names)
+    for the visualizer class cls and key (e.g. a cuisine name, or a list of them for a comparison)
+    '''
+    label = "{} {}".format(cls.__name__, ", ".join(key) if isinstance(key, list) else key)
+    
+    if storage is None:
+        return label, lambda renderer: cls(key, restaurant_data, renderer = renderer).make_graphs()
+    
+    return label, lambda renderer: cls.from_storage(key, storage, renderer = renderer).make_graphs()
+
+def make_preview_function(cls, key, restaurant_data, storage = None):
+    '''
+    Returns a function that takes a RenderContext and renders approximate graphs of the query from the stratified sample,
+    or None if the query has no preview (the class has no make_preview, its group is small, or it reads from storage)
+    '''
+    if storage is not None or not hasattr(cls, "make_preview") or not cls(key, restaurant_data).needs_preview():
+        return None
+    
+    return lambda renderer: cls(key, restaurant_data, renderer = renderer).make_preview()
+
 def prompt_for_cuisine(restaurant_data, input_function = input):
     '''
     Prompt user for year. Repeats prompt until "finish" is entered.
@@ -61,7 +110,7 @@ def validate_cuisine(input_cuisine, restaurant_data):
     try:
         cuisine = input_cuisine.lower()
         
-        if cuisine not in restaurant_data.cuisine_primary.unique():
+        if cuisine not in get_query_lookups(restaurant_data).cuisines:
             raise InvalidCuisineError()
         
         else:
@@ -70,6 +119,21 @@ def validate_cuisine(input_cuisine, restaurant_data):
     except AttributeError:
         raise InvalidCuisineError()
 
+def prompt_for_cuisine_comparison(restaurant_data, input_function = input):
+    '''
+    Prompt user for a comma-separated list of cuisine categories to compare. Repeats prompt until "finish" is entered.
+    @param restaurant_data: restaurant_data DF
+    @param input_function: default is the Python input method; this is to allow for unittesting
+    '''
+    
+    while True:
+        try:
+            userinput = quitting_input("Please enter cuisine categories separated by commas (e.g. pizza, chinese, thai) or 'finish' if you are done.\n", input_function)
+            return [validate_cuisine(cuisine.strip(), restaurant_data) for cuisine in userinput.split(",")]
+            
+        except InvalidCuisineError as e:
+            print(e)
+
 def prompt_for_zip(restaurant_data, input_function = input):
     '''
     Prompt user for zipcode. Repeats prompt until "finish" is entered.
@@ -93,19 +157,64 @@ def validate_zip(input_zip, restaurant_data):
     Note: to handle outliers, zipcodes must have at least 2 restaurants, each of which must have at least 2 inspection records
     '''
 
-    if input_zip not in restaurant_data.zipcode.unique():
-        raise InvalidZipError()
+    # the eligible zipcodes are those in the data that pass the outlier rule
+    if input_zip in get_query_lookups(restaurant_data).eligible_zipcodes:
+        return input_zip
     
     else:
+        raise InvalidZipError()
+
+def prompt_for_zip_comparison(restaurant_data, input_function = input):
+    '''
+    Prompt user for a comma-separated list of zipcodes to compare. Repeats prompt until "finish" is entered.
+    @param restaurant_data: restaurant_data DF
+    @param input_function: default is the Python input method; this is to allow for unittesting
+    '''
+    
+    while True:
+        try:
+            userinput = quitting_input("Please enter zipcodes separated by commas (e.g. 10011, 11211) or 'finish' if you are done.\n", input_function)
+            return [validate_zip(zipcode.strip(), restaurant_data) for zipcode in userinput.split(",")]
+            
+        except InvalidZipError as e:
+            print(e)
+
+def prompt_for_nearby(restaurant_data, input_function = input):
+    '''
+    Prompt user for a zipcode and a radius in miles. Repeats prompt until "finish" is entered.
+    @param restaurant_data: restaurant_data DF
+    @param input_function: default is the Python input method; this is to allow for unittesting
+    '''
+    
+    while True:
+        try:
+            userinput = quitting_input("Please enter a zipcode and a radius in miles (e.g. 10011, 1) or 'finish' if you are done.\n", input_function)
+            return validate_nearby(userinput, restaurant_data)
+            
+        except (InvalidZipError, InvalidRadiusError) as e:
+            print(e)
+
+def validate_nearby(input_nearby, restaurant_data):
+    '''
+    Validate that user input is a zipcode that appears in the data and has a known location,
+    followed by a radius in miles between 0 and MAX_RADIUS
+    Returns a ZipRadius; raises InvalidZipError or InvalidRadiusError
+    '''
+    
+    try:
+        zipcode, radius = [value.strip() for value in input_nearby.split(",")]
+        radius = float(radius)
         
-        this_zipcode = restaurant_data[restaurant_data.zipcode == input_zip]
-        restaurant_records_counts = Counter(this_zipcode.index).items()
-        
-        if len(list(() for _, count in restaurant_records_counts if count >= 2)) >= 2:
-            return input_zip
-        
-        else: 
-            raise InvalidZipError()
+    except ValueError:
+        raise InvalidRadiusError()
+    
+    if not 0 < radius <= MAX_RADIUS:
+        raise InvalidRadiusError()
+    
+    if zipcode not in get_zip_index():
+        raise InvalidZipError()
+    
+    return ZipRadius(validate_zip(zipcode, restaurant_data), radius)
 
 def prompt_for_restaurant_name(restaurant_data, input_function = input, min_rows = 2):
     '''
@@ -135,18 +244,13 @@ def validate_restaurant_name(input_name, restaurant_data, min_rows = 2):
     try:
         restaurant_name = input_name.lower()
         
-        if restaurant_name not in restaurant_data.index.unique():
-            raise InvalidRestaurantNameError()
+        lookups = get_query_lookups(restaurant_data)
         
+        # only restaurants that have had at least min_rows inspections are included
+        if restaurant_name in lookups.restaurant_counts and lookups.restaurant_rows(restaurant_name) >= min_rows:
+            return restaurant_name
         else:
-            # get names of restaurants that have had > 1 inspection
-            restaurant_counts = restaurant_data.index.value_counts()
-            included_restaurant_names = restaurant_counts[restaurant_counts >= min_rows].index.values
-            
-            if restaurant_name in included_restaurant_names:
-                return restaurant_name
-            else:
-                raise InvalidRestaurantNameError()
+            raise InvalidRestaurantNameError()
 
     except AttributeError:
         raise InvalidRestaurantNameError()
\ No newline at end of file